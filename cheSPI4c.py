@@ -5,8 +5,10 @@ import numpy
 import sys
 import time
 import os
+import multiprocessing
 from numpy import *
 import operator
+import hashlib
 from pylab import *
 ##from jakob_util import *
 from random import choice as randchoice
@@ -14,13 +16,16 @@ from random import lognormvariate, normalvariate, randint, uniform, random
 from numpy.random import rand
 from numpy.random import random_integers
 from scipy.special import erfc
-from scipy.optimize import curve_fit
 from scipy.interpolate import RectBivariateSpline
 import numpy as np
 ##from scipy.stats.distributions import norm as normstat
 ##from scipy.stats.distributions import geom as geomstat
 import matplotlib.patches as mpatches
 import matplotlib.pyplot as plt
+try:
+  from numba import njit #optional - compiles the mutation scoring kernel
+except ImportError:
+  njit=None
 
 VERB=False #change this to True for verbose logfile POTENCI
 PLOT12=True
@@ -39,6 +44,69 @@ def initfil(filename):
   fil.close()
   return buf
 
+class LRUCache:
+    #bounded mapping that drops the least recently used entries, counting hits and misses.
+    #Entries carry the tick of their last use and the older half is dropped when maxsize is exceeded
+    #(cheaper per lookup than reordering an OrderedDict)
+
+    def __init__(self,maxsize):
+	self.maxsize=maxsize
+	self.data={}
+	self.used={}
+	self.tick=0
+	self.hits=0
+	self.misses=0
+
+    def get(self,key):
+	#returns None if key is not cached
+	self.tick+=1
+	if key in self.data:
+	  self.hits+=1
+	  self.used[key]=self.tick
+	  return self.data[key]
+	self.misses+=1
+	return None
+
+    def put(self,key,val):
+	self.tick+=1
+	self.data[key]=val
+	self.used[key]=self.tick
+	if len(self.data)>self.maxsize:
+	  keys=sorted(self.used,key=self.used.get)
+	  for k in keys[:len(keys)-max(self.maxsize//2,1)]:
+	    del self.data[k]
+	    del self.used[k]
+
+    def clear(self):
+	self.data.clear()
+	self.used.clear()
+	self.hits=0
+	self.misses=0
+
+    def __len__(self):
+	return len(self.data)
+
+    def __str__(self):
+	return '%d entries, %d hits, %d misses'%(len(self.data),self.hits,self.misses)
+
+class FrozenDict(dict):
+    #read-only dict for the constant tables parsed at import
+
+    def _readonly(self,*args,**kwargs):
+	raise TypeError('constant table is read-only')
+
+    __setitem__=__delitem__=clear=update=setdefault=pop=popitem=_readonly
+
+    def __reduce__(self):
+	return FrozenDict,(dict(self),)
+
+def freezetable(obj):
+  #nested dicts and lists of a parsed table as FrozenDicts and tuples, arrays made read-only
+  if isinstance(obj,dict):return FrozenDict([(k,freezetable(v)) for k,v in obj.items()])
+  if isinstance(obj,list):return tuple([freezetable(v) for v in obj])
+  if isinstance(obj,ndarray):obj.flags.writeable=False
+  return obj
+
 aa13dict={'A': 'ALA', 'C': 'CYS', 'E': 'GLU', 'D': 'ASP', 'G': 'GLY', 'F': 'PHE', 'I': 'ILE', 'H': 'HIS', 'K': 'LYS', 'M': 'MET', 'L': 'LEU', 'N': 'ASN', 'Q': 'GLN', 'P': 'PRO', 'S': 'SER', 'R': 'ARG', 'T': 'THR', 'W': 'TRP', 'V': 'VAL', 'Y': 'TYR'}
 aa31dict={'CYS': 'C', 'GLN': 'Q', 'ILE': 'I', 'SER': 'S', 'VAL': 'V', 'MET': 'M', 'ASN': 'N', 'PRO': 'P', 'LYS': 'K', 'THR': 'T', 'PHE': 'F', 'ALA': 'A', 'HIS': 'H', 'GLY': 'G', 'ASP': 'D', 'LEU': 'L', 'ARG': 'R', 'TRP': 'W', 'GLU': 'E', 'TYR': 'Y'}
 aa3s=aa31dict.keys();aa3s.sort()#introduce ordering
@@ -91,6 +159,7 @@ class Population(list):
     def __init__(self):
         list.__init__(self)
 	print 'initializing population'
+	self.rng=numpy.random
 	self.splitlib=[]
 
     def append(self,val):
@@ -118,10 +187,10 @@ class Population(list):
 	return obj.clone(self)
 	
     def selectNormal(self,selrat,size):
-	if selrat>1.0:return randint(0,size-1)
+	if selrat>1.0:return self.rng.randint(size)
 	i=99999
 	while i>size-1:
-	  i=int(abs(normalvariate(0,selrat))*size)
+	  i=int(abs(self.rng.normal(0,selrat))*size)
 	return i
 
     def mergewith_FAIL(self,other):#dont use!
@@ -182,7 +251,7 @@ class Population(list):
 	  obji=self[i]
 	  ##print 'breeding object',i##,onum
 	  #find breeding operation - and breed mates
-	  rn=uniform(0.0,1.0)
+	  rn=self.rng.uniform(0.0,1.0)
 	  psum=0.0;onum=None
 	  for j in range(len(probs)):
 	    psum+=probs[j]
@@ -218,7 +287,7 @@ class Population(list):
 	   if childener>prevener:
 	    ptest=exp(-(childener-prevener)/temperature)
 	    if repi==0:ptest=-999#to ensure that very best individual survives!
-           if ptest>uniform(0.0,1.0):
+           if ptest>self.rng.uniform(0.0,1.0):
 	    print 'breedinfo: using',j,i,onum,childener,prevener,ptest
 	    print child,childener
 	    dct[childid]=child
@@ -363,13 +432,13 @@ debug=False
 
 CORVALS6={'S3': ([0.019297, -0.094793, -0.083282, -0.068386, 0.090053, -0.104272, -0.085991, 0.005078, -0.013203, 0.104949, 0.092084, -0.131694, 0.063985, 0.105626, -0.019636, -0.03724, -0.022005, 0.063985, 0.026745, 0.089376, -0.102352, -0.049893, 0.087213, 0.19717, 0.154051, -0.080507, 0.023307, 0.381334, 0.078355, -0.1202, -0.242098, -0.043727, -0.013698, -0.078256, -0.10214, 0.026768, 0.024173, -0.021797, 0.003835, -0.121151, 0.230337, -0.03542, 0.038242, 0.085508, -0.479109, 0.058991, -0.199417, 0.755504, -0.28204, 0.001946, 0.459819, 0.091298, -0.155048, 0.051129, -0.09531, -0.091634, -0.102752, -0.251163, -0.154145, 0.070728, -0.845705, -0.145957, -0.204061, 0.340223, -0.867145, 0.162739, 0.109487, 0.235985, -0.243657, 0.273138, 0.836179, -0.191254, -0.267832, -0.705895, 0.230487, -0.818174, 1.548207, 0.544215, -0.338394, 0.347815, -1.429054, -0.055009, 0.265881, 0.741496, -0.160088, 0.275586, 0.330748, -0.924739, 0.175424, 0.580246, 0.90136, -0.082104, 0.179998, -0.57338, -0.574114, -0.975988, 1.494797, -0.3816, -0.609989, 0.824502, -1.169818, -0.443678, 0.165266, 0.461652, 0.177442, -0.230154, -0.129505, -0.07551, 0.293978, 0.42363, 0.45598, -0.487084, 0.105452, 0.146928, -0.77955, -0.156553, 0.872732, -0.012506, -0.259474, 0.644184, 0.117907, -0.002655, -0.064557, 0.006359, -0.031836, 0.123499, -0.027743, 0.283833, -0.030267, 0.030764, 0.069089, -0.048582, -0.242873, -0.176067, -0.046966, 0.153613, 0.103514, -0.253534, -0.097297, 0.132821, -0.012767, 0.062714, 0.055099, 0.045244, -0.059578, 0.068985, 0.056891, -0.00336, 0.008735, -0.069433, -0.060922, 0.087128, -0.042332, -0.069881, 0.012991, 0.024638, 0.014559, -0.042332, -0.017694, -0.05913, 0.005553, -0.027277, -0.023965, -0.019678, 0.025913, -0.030005, -0.024744, 0.001461, -0.003799, 0.030199, 0.026498, -0.037895, 0.018412, 0.030394, -0.00565, -0.010716, -0.006332, 0.018412, 0.007696, 0.025718], [-3.303419, -2.32803, -3.303419, -0.016556, 0.0, -1.264831, -1.324356, 0.844647, -0.407314, -1.139833, -0.407314, 0.815569, 0.0, -0.371819, -0.71221, 1.021171, 0.007454, 0.007454, 0.007454, 0.278549, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.813301, 4.148781, 1.813301, -0.513694, 0.0, 2.837482, -0.149075, -0.681484, -1.030215, -1.030215, -1.030215, -0.595953, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0], {'E': -1.7158476121583721}), 'H3': ([0.016902, -0.083026, -0.072945, -0.059898, 0.078875, -0.091329, -0.075317, 0.004448, -0.011564, 0.091922, 0.080654, -0.115347, 0.056043, 0.092515, -0.017198, -0.032617, -0.019274, 0.056043, 0.023425, 0.078282, 0.068276, -0.027794, 0.379696, 0.284777, -0.06832, 0.062718, 0.02146, 0.156209, -0.140892, -0.340025, 0.029414, -0.003318, -0.042999, -0.100716, -0.362916, 0.152408, -0.109102, 0.363125, -0.004845, -0.318485, 0.432229, -0.195096, 1.025242, 0.866008, -0.282587, 0.075837, -0.080095, 1.496001, -0.255277, -1.428452, 0.130298, -0.20298, -0.036936, -0.177784, -0.487258, 0.657956, -0.088554, 0.233622, -0.300204, -1.387172, -0.158365, -0.527157, 0.913767, 0.938573, -0.002197, -0.185551, -0.281133, 1.139697, -0.237475, -1.407211, -0.468014, -0.713746, -0.431746, 0.375367, -0.106703, 0.8511, 0.692366, 0.658922, 0.129892, -1.182611, -0.341706, -0.655192, 0.833114, 1.083583, 0.021501, -0.306867, -0.395378, 1.015675, -0.372099, -1.180254, -0.464843, -0.912272, -0.294979, 0.566274, -0.725341, 0.67131, 1.498849, 0.652473, 0.498861, -1.194352, -0.567007, -0.320082, 0.111328, 0.020692, -0.1444, -0.243006, -0.27593, -0.659604, 0.231462, -0.237005, -0.715649, -0.414186, -0.271575, 0.524896, 0.938853, 0.196389, 1.013458, 0.530417, 0.431615, -0.149038, 0.287626, 0.151548, -0.266745, 0.1636, 0.180682, -0.072662, 0.082173, -0.039798, 0.297714, -0.387268, -0.037008, 0.212527, 0.27661, 0.33008, -1.579739, 0.519656, 0.371394, 0.004977, 0.027079, -0.524461, 0.14927, 0.171132, -0.601497, 0.034013, 0.001475, 0.004467, 0.259549, 0.313364, 0.102029, -0.130831, -0.168214, 0.147413, 0.149936, 0.005993, -0.9716, 0.678854, 0.504068, -0.150845, -0.134087, -0.366061, 0.152295, 0.040592, -0.402998, -0.046839, 0.142796, -0.055765, 0.041138, 0.009792, 0.090214, -0.019392, 0.023735, -0.0069, 0.145085, 0.210865, -0.613031, 0.349961, 0.233031, -0.0279, -0.074266, -0.192709], [-0.169048, -1.354317, 0.332187, 1.187221, 0.0, -1.210275, -1.395698, -1.315874, -1.324041, -2.154139, -5.121323, 0.525122, 0.0, -1.256065, -0.608352, 0.616314, 0.007494, 0.007494, 0.007494, -0.367024, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.473185, 1.129782, -0.418936, -0.545882, 0.0, 0.78871, -0.134299, -0.872918, 2.020503, 1.154101, 2.859188, -0.23951, 0.0, 1.177741, -0.109159, -0.578724, 1.237389, 0.418519, -4.168514, -0.477856, 0.0, 0.660119, -0.136622, -0.570944, 0.0, -0.504011, 3.949269, 0.0, 0.0, -0.212523, -0.253022, -0.186672], {'I': -0.43578376036291577, 'H': -4.2875265599317629, 'G': -2.6039052591824543}), 'C2': ([-0.011513, 0.056555, 0.049687, 0.0408, -0.053727, 0.06221, 0.051303, -0.00303, 0.007877, -0.062614, -0.054939, 0.078571, -0.038175, -0.063018, 0.011715, 0.022218, 0.013129, -0.038175, -0.015957, -0.053323, -0.001591, 0.007817, 0.006868, 0.005639, -0.007426, 0.008599, 0.007091, -0.000419, 0.001089, -0.008655, -0.007594, 0.01086, -0.005276, -0.00871, 0.001619, 0.003071, 0.001815, -0.005276, -0.002206, -0.00737, -0.069429, -0.183587, -0.071014, -0.232471, 0.450971, -0.074927, -0.364461, 0.218651, 0.002279, -0.210438, 0.04939, -0.266197, 0.047476, 0.459647, -0.474595, -0.113231, -0.411385, 1.070877, 0.418234, -0.245402, -0.311386, -0.372702, -0.01311, -0.253133, 0.800152, -0.01685, -0.282143, 0.675802, -0.216926, -0.405474, -0.233432, -0.530627, -0.071811, 0.697198, -0.861939, -0.055011, -0.25023, 1.380601, 0.72294, -0.401629, -0.250824, -0.155861, -0.202254, -0.221995, 0.662654, 0.084564, -0.234737, 0.255738, -0.203486, -0.351441, -0.287829, -0.357467, 0.137013, 0.6444, -0.427378, -0.012925, -0.086805, 0.790734, 0.507895, -0.289044, -0.288791, -0.107123, -0.308008, -0.232845, 0.76657, 0.041008, 0.072485, -0.00094, 0.278675, -0.121536, -0.433312, -0.082689, 0.164773, 0.396109, -0.422095, -0.031069, 0.086353, 0.246503, 0.278673, -0.301115, -0.057633, 0.131847, -0.209584, -0.038489, 0.283526, -0.037604, 0.025777, -0.428691, 0.348055, 0.088627, -0.002926, 0.114242, 0.207263, 0.251996, -0.26375, -0.233412, -0.124511, -0.016152, 0.00328, -0.040446, 0.071215, -0.004993, -0.023451, -0.047435, -0.020315, 0.05808, 0.026935, -0.070755, 0.018869, 0.020112, 0.04945, 0.014315, 0.086986, 0.026531, -0.090886, -0.04637, -0.035347, 0.005809, -0.050376, 0.011298, -0.01422, 0.069855, 0.061372, 0.050395, -0.066362, 0.07684, 0.063368, -0.003742, 0.00973, -0.077339, -0.067859, 0.097048, -0.047152, -0.077838, 0.01447, 0.027443, 0.016216, -0.047152, -0.019709, -0.065863], [-0.620416, -2.218624, -4.370647, 1.370144, 0.0, -0.837909, -0.585708, 1.331203, -2.257623, -2.353085, -1.774456, 0.806094, 0.0, -1.395036, -0.612215, 0.926923, -0.841501, 0.300464, 2.576216, 0.321511, 0.0, -0.208211, -0.015878, 0.395845, -0.187998, -0.187998, -0.187998, -0.399284, 0.0, 0.0, 0.0, 0.0, 2.541123, 1.993562, 0.161946, 0.512771, 0.0, 1.300772, 0.348045, 0.582803, 0.642463, 0.464591, 4.297175, 0.177106, 0.0, 0.510622, 0.263577, -0.119125, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0], {'S': 0.043730941745910329, 'B': 1.7551649939745402, '-': 0.43127825832484107, 'T': 0.14224085606541886}), 'H2': ([0.053891, 0.210572, 0.158722, 0.005727, 0.136836, -0.116847, -0.052947, -0.077817, -0.480907, 0.56649, 0.401963, -0.055737, 0.403438, -0.515266, -0.404307, -0.12314, 0.13538, -0.488768, -0.196173, 0.440166, 0.098288, -0.002428, 0.080368, 0.070648, -0.367072, 0.117246, -0.01639, 0.011411, -0.221699, 0.153164, 0.234889, 0.083777, -0.146235, -0.06146, -0.493187, 0.058816, 0.103165, -0.01316, 0.066846, 0.241064, 0.056013, -0.295993, 0.379047, 0.112046, -0.099413, -0.011486, -0.319687, 0.452022, -0.429472, -0.329578, 0.191922, -0.218375, 0.134039, 0.712881, -0.811749, -0.169542, -0.323844, 0.997429, 0.345622, -0.373991, -0.425557, -0.500074, 0.170009, -0.077748, 0.200528, -0.208609, -0.453405, -0.170735, -0.061482, -0.392944, -0.289311, -0.723037, -0.338123, 1.446232, -1.149086, -0.165572, 0.110977, 2.324752, 1.326307, -0.623939, -0.489723, -0.556035, 0.35124, 0.486403, -0.056762, -0.313886, -0.449979, -0.152774, 0.255675, -0.520603, -0.442453, -0.768406, -0.337325, 1.462106, -1.394757, -0.19974, 0.231002, 2.397598, 1.383143, -0.885671, -0.461466, -0.101982, -0.160264, 0.005113, 0.048279, -0.253828, -0.433891, -0.609095, 0.214916, -0.267761, -0.610293, -0.385543, -0.385645, 0.837201, -0.198791, 0.139321, 0.493509, 1.7648, 0.902942, -0.536613, 0.117175, 0.056316, -0.516494, 0.049812, 0.496965, -0.065667, -0.091879, -0.009451, 0.117445, -0.255462, -0.007491, 0.074726, 0.09172, 0.749437, -1.731941, 0.335395, 0.049041, 0.698054, 0.313857, -0.472126, 0.06693, 0.062904, -0.883512, -0.120213, 0.28943, -0.111282, 0.126737, 0.376625, 0.162795, -0.017365, -0.051101, 0.062551, 0.310635, 0.419425, -1.48042, 0.482244, 0.388334, 0.173651, 0.091998, -0.351005, 0.085786, -0.107138, -0.511446, -0.081781, 0.334426, -0.170218, -0.02662, 0.090397, 0.093659, 0.076839, 0.072413, -0.059976, 0.27633, 0.484808, -0.782233, 0.136299, 0.162101, 0.040065, 0.035373, -0.148328], [-0.568022, -1.228166, -2.12798, 0.857818, 0.0, -1.039672, -1.264544, 1.222694, -1.574924, -2.726251, -3.49241, 0.518611, 0.0, -2.220848, -0.409316, 1.363355, -0.354565, -0.354565, -0.354565, 0.007024, 0.0, 0.0, 0.0, 0.0, 0.732379, 0.732379, 0.732379, 0.49283, 0.0, 0.0, 0.0, 0.0, 2.69116, 1.895308, 1.6825, -0.114174, 0.0, 1.438733, 0.389946, 1.153049, 2.351776, 1.59278, 1.034833, 0.438442, 0.0, 1.652219, 0.410843, 0.373064, 1.351246, 0.518379, -1.198268, -0.500413, 0.0, 1.051329, 0.092276, 0.234091, 0.297208, 0.297208, 0.297208, 0.16187, 0.0, 0.0, 0.0, 0.0], {'I': 3.6728441311871309, 'H': -1.4424616957371339, 'G': -0.62390277372380787}), 'S2': ([0.006481, -0.031836, -0.027971, -0.022968, 0.030245, -0.03502, -0.02888, 0.001706, -0.004434, 0.035247, 0.030927, -0.04423, 0.02149, 0.035475, -0.006595, -0.012507, -0.007391, 0.02149, 0.008982, 0.030017, -0.312594, 0.183356, -0.126925, -0.093, 0.337411, -0.444332, 0.065436, 0.092627, -0.105097, -0.222316, -0.101035, 0.01346, 0.009455, -0.007828, -0.467176, 0.203825, -0.05412, 0.848554, 0.404996, -0.222989, -0.135818, -0.104985, -0.415735, -0.105279, -0.257476, -0.324974, -0.078537, 0.065705, -0.763219, -0.191165, 0.31633, -0.279162, 0.101098, 0.740843, -0.960984, -0.018922, -0.328864, 2.005625, 0.891693, -0.156082, -0.339465, -0.297233, -0.241795, -0.14444, -0.40449, -0.49183, -0.326966, -0.361649, -0.685884, 0.240882, 0.464904, -0.445891, 0.067776, 1.046562, -1.600321, -0.732665, 0.272788, 2.977915, 1.196574, -0.194756, -0.263217, -0.112437, -0.342238, -0.537323, -0.051121, -0.435927, -0.212585, -1.719168, -0.219721, 0.606721, 0.624364, -0.057537, 0.510209, 1.314712, -2.179204, -0.953595, 0.363954, 2.317296, 1.263458, 0.084273, -0.418612, -0.055765, -0.475487, -0.45423, 0.331273, -0.573757, -0.166787, -1.413296, -0.016631, 0.634181, 0.283512, -0.086214, 0.589623, 1.031666, -1.053459, -0.379786, -0.03447, 1.103297, 0.830659, 0.328336, -0.049866, 0.219954, -0.222015, -0.230284, -0.343827, -0.30999, -0.030972, -0.68201, -0.115196, 0.249271, 0.180839, 0.183604, 0.238905, 0.315296, 0.144228, -0.112538, -0.01612, 0.2527, 0.167655, 0.161356, 0.022082, 0.22053, -0.372208, -0.216005, -0.122562, -0.215098, 0.063035, -0.317289, 0.081328, 0.180715, 0.038678, 0.1667, 0.23771, 0.129368, 0.026091, -0.092662, -0.029499, 0.061609, 0.005716, 0.132644, -0.017489, 0.085909, 0.075477, 0.061977, -0.081614, 0.0945, 0.077932, -0.004602, 0.011966, -0.095114, -0.083455, 0.119352, -0.057989, -0.095727, 0.017795, 0.03375, 0.019943, -0.057989, -0.024239, -0.081], [-1.765275, -2.111555, -1.765275, 0.838273, 0.0, -1.17632, -0.712087, 1.432711, -2.018762, -3.118377, -2.018762, 0.986857, 0.0, -1.377637, -0.99621, 0.335201, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 2.275746, 1.56442, 2.275746, 0.62496, 0.0, 1.495842, 0.480409, -0.053309, 0.994857, 0.298115, 0.994857, 0.20504, 0.0, 0.684797, 0.395525, 0.164271, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0], {'E': 1.7353469890102504}), 'S1': ([0.003759, -0.018464, -0.016222, -0.01332, 0.017541, -0.02031, -0.016749, 0.000989, -0.002572, 0.020442, 0.017936, -0.025651, 0.012463, 0.020574, -0.003825, -0.007254, -0.004286, 0.012463, 0.005209, 0.017409, 0.105833, -0.045178, 0.166537, -0.032797, -0.246479, 0.292665, 0.119152, 0.014348, 0.011552, -0.126296, -0.162307, -0.003401, 0.155428, -0.0947, 0.524113, -0.095772, -0.046766, -0.167862, -0.226083, -0.143311, 0.088698, 0.134438, 0.134746, -0.099281, -0.535256, 0.303995, 0.228167, 0.047843, -0.081847, -0.071302, -0.280127, 0.186708, 0.043792, -0.257151, 0.683348, 0.011857, 0.144857, -0.421473, -0.252415, -0.011869, -0.889206, 0.151215, 0.379658, 0.477985, -0.952623, -0.028081, 0.125162, 1.485723, 0.325688, 0.012765, -0.954942, 0.180169, -0.591743, -0.510153, 1.193146, 0.303179, 0.291762, -0.688136, -0.466673, 0.153172, -1.312293, -0.100455, 0.688891, 0.885142, -0.803266, -0.339668, -0.258984, 1.891989, 0.204246, -0.061183, -1.041934, -0.226161, -0.663249, -0.448264, 2.762249, 0.21693, 0.234071, -1.116091, -0.67858, 0.168749, -0.710279, -0.213556, 0.678281, 0.56135, -0.637422, 0.002345, -0.068983, 1.284395, 0.267971, -0.370731, -0.865081, 0.067992, -0.846238, -0.635997, 2.544875, 0.360065, 0.385211, -0.948474, -0.881541, 0.025753, 0.22377, 0.023554, 0.236927, 0.056209, -0.335044, 0.133434, 0.109227, 0.267487, -0.1418, -0.263181, -0.332164, 0.102998, -0.230919, -0.483248, 1.358206, 0.350329, 0.211525, -0.716548, -0.441824, -0.130021, 0.132466, -0.024184, 0.36998, 0.292735, -0.078496, 0.20899, 0.068264, 0.387793, -0.052279, -0.399234, -0.226062, 0.106014, -0.2938, -0.397115, 0.589402, 0.27321, 0.06433, -0.424651, -0.292476, -0.306162, -0.070979, -0.078862, -0.04565, -0.00255, 0.105987, -0.165565, -0.110549, 0.092279, -0.035241, 0.069231, 0.021315, -0.13591, -0.050435, 0.061879, 0.095062, 0.024076, 0.024079, 0.050209, 0.086453, 0.066185], [1.296443, 1.57336, 1.296443, -1.444339, 0.0, 2.201076, 1.153357, 0.290709, -0.188015, 2.103762, -0.188015, -0.386847, 0.0, 0.713608, 0.25244, -0.170405, 1.450347, 0.437104, 1.450347, -0.123811, 0.0, 0.545148, -0.144264, -0.999612, 0.20134, 0.20134, 0.20134, 0.29245, 0.0, 0.0, 0.0, 0.0, 4.794824, 5.135499, 4.794824, -1.69814, 0.0, 2.548461, 1.467883, -0.191631, 0.350998, 0.350998, 0.350998, -0.819839, 0.0, 0.0, 0.0, 0.0, -0.084472, -0.084472, -0.084472, -0.01627, 0.0, 0.0, 0.0, 0.0, 0.205896, 0.205896, 0.205896, 0.46936, 0.0, 0.0, 0.0, 0.0], {'E': -5.9219104095682722}), 'H1': ([0.017031, 0.051095, 0.072339, -0.088944, -0.035706, 0.075669, 0.022786, -0.059481, -0.02955, -0.039307, -0.074265, -0.075268, -0.022913, -0.021082, 0.047528, 0.001599, -0.025678, 0.138807, 0.014411, 0.030388, -0.075236, 0.069022, -0.159461, -0.260538, -0.112775, 0.098074, 0.1139, 0.128628, 0.074889, 0.183093, -0.057416, 0.033818, 0.140781, -0.128689, -0.0586, -0.059489, 0.130768, -0.178779, -0.037052, 0.154239, -0.210008, 0.026868, -0.73665, -0.854465, -0.073073, -0.035793, 0.020652, -0.554005, 0.040314, 0.838486, 0.045112, 0.063236, 0.142367, 0.284481, -0.082631, -0.43572, 0.148818, 0.12228, 0.404597, 0.846106, -0.349442, 0.342585, -1.20954, -1.21563, 0.93597, -0.262294, 0.240567, -2.166636, 0.353777, 1.469947, -0.190774, 0.209423, 0.086138, 0.419722, -0.293075, -0.628836, 0.215707, -0.282495, 0.581154, 1.750341, -0.463491, 0.166051, -0.886156, -1.173658, 1.176084, -0.231968, 0.129561, -2.945353, 0.021377, 1.427869, -0.227082, 0.101642, -0.258151, 0.416593, 1.017873, -0.672322, 0.313489, -0.168414, 0.510016, 1.755578, -0.197635, 0.214712, -0.38891, -0.667086, 0.845649, -0.064954, 0.205525, -2.074377, -0.110372, 0.823993, -0.230721, 0.117781, -0.308548, 0.094613, 1.21813, -0.23567, 0.314195, -0.657567, -0.002121, 1.109933, 0.009891, -0.036252, -0.187451, -0.156133, 0.361397, -0.068243, -0.101829, -0.968412, -0.210364, 0.541349, 0.455727, 0.026588, -0.072189, 0.390666, -0.38644, -0.317169, -0.246264, 0.143229, 0.197947, 0.626662, 0.170819, 0.062853, -0.171708, -0.097707, 0.161934, -0.033718, 0.032111, -0.28738, 0.042295, 0.120963, 0.244928, 0.115684, 0.05066, 0.046744, -0.699233, 0.05448, -0.002876, 0.053844, -0.012145, 0.147344, 0.087971, -0.033279, -0.051289, -0.074708, 0.002631, 0.036923, 0.006204, -0.080366, 0.017994, 0.053713, 0.083914, -0.021654, 0.119178, 0.061335, -0.11082, -0.064439, -0.047269, 0.025284, -0.050507, 0.039], [4.038058, 2.772504, 4.449804, -0.384963, 0.0, 2.663041, 1.336909, -0.190261, 0.821741, 0.415391, -1.473309, 0.49438, 0.0, 0.662561, 0.26029, 0.192578, 0.246727, 0.246727, 0.246727, -0.009358, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 2.951545, 2.348245, 1.440757, -1.721506, 0.0, 2.027398, 0.258536, -1.357026, 1.842676, 1.509158, -0.671787, -0.320621, 0.0, 1.066915, 0.190608, 0.085043, 0.939906, 0.252484, -4.649888, 0.443972, 0.0, 0.880032, 0.383249, 0.82022, 0.287387, 0.115121, 3.500917, -0.271279, 0.0, 0.416463, -0.02441, 0.181315], {'I': 1.631761050317559, 'H': -0.20266170750306003, 'G': -0.04727467326743362}), 'C1': ([-0.015394, 0.07562, 0.066438, 0.054554, -0.071839, 0.083182, 0.068598, -0.004051, 0.010533, -0.083722, -0.07346, 0.105058, -0.051044, -0.084262, 0.015664, 0.029708, 0.017555, -0.051044, -0.021336, -0.071299, -0.007596, 0.037312, 0.032781, 0.026918, -0.035447, 0.041043, 0.033847, -0.001999, 0.005197, -0.04131, -0.036246, 0.051837, -0.025186, -0.041576, 0.007729, 0.014658, 0.008662, -0.025186, -0.010527, -0.03518, -0.063036, 0.049698, -0.047798, -0.165288, 0.031789, 0.055527, 0.080633, -0.339358, 0.065787, 0.13215, -0.109262, -0.025672, 0.078777, 0.036867, 0.017689, -0.030938, 0.101907, -0.030422, 0.041158, 0.12, -0.046749, 0.244909, -0.116223, 0.03073, 0.111395, 0.093773, 0.200335, -0.579402, 0.351403, 0.168917, -0.202084, 0.344402, -0.062488, -0.133672, 0.159322, 0.108495, 0.343798, -0.878996, -0.216614, 0.079492, -0.081116, 0.148644, -0.068493, 0.046116, -0.332684, 0.174208, 0.319966, -0.744681, 0.403546, 0.147273, 0.056553, 0.262408, -0.354054, -0.014651, 0.334494, 0.036166, 0.124067, -0.475516, -0.219724, 0.237181, -0.108485, 0.205527, 0.171707, 0.121125, -0.596519, 0.260578, 0.422689, -0.295089, 0.324511, -0.234685, -0.150712, 0.236616, -0.260482, -0.247293, 0.451803, 0.183401, 0.277392, -0.537166, -0.307948, 0.080869, 0.005012, -0.011833, 0.048475, 0.078813, -0.216644, -0.006694, 0.046703, -0.185226, 0.017384, 0.051314, 0.004401, 0.06953, 0.072302, -0.104543, 0.614752, 0.082092, 0.155763, -0.449025, -0.199635, -0.072544, -0.02132, -0.020752, -0.006945, 0.005364, 0.03072, -0.045645, -0.028029, 0.033574, -0.009824, 0.01316, -0.003469, -0.03538, -0.020898, 0.008264, 0.033473, 0.013866, 0.011581, 0.006171, 0.021758, 0.014608, 0.077772, 0.096574, -0.190793, 0.054505, 0.146039, -0.257947, -0.065042, 0.002225, 0.051043, -0.022028, 0.132507, 0.113453, -0.039149, 0.023216, -0.124319, 0.098196, -0.060908, 0.014516, -0.025664, -0.02307], [2.093946, 1.198701, 2.471223, -1.849251, 0.0, 1.555381, 0.694143, -1.674472, 1.087839, 1.014636, 1.389677, -0.667612, 0.0, 0.514959, 0.116431, -0.661216, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 3.297104, 2.63113, -0.151369, -2.173729, 0.0, 1.624755, 0.800817, -1.932933, 0.110641, 0.416232, 1.301578, -0.688812, 0.0, 0.558761, 0.251317, -0.940482, -0.218471, -0.296236, 0.069338, -0.431974, 0.0, -0.343009, -0.086612, -0.539977, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0], {'S': -0.76867475295761878, 'B': -3.6800701434993641, '-': -1.7534436965186453, 'T': 0.51994034394359812}), 'C3': ([-0.01358, 0.066711, 0.05861, 0.048127, -0.063375, 0.073382, 0.060516, -0.003574, 0.009292, -0.073858, -0.064805, 0.09268, -0.04503, -0.074335, 0.013819, 0.026208, 0.015486, -0.04503, -0.018822, -0.062899, 0.157626, -0.028872, 0.024623, 0.154616, -0.122028, 0.013447, 0.126714, 0.12675, -0.059952, -0.242948, -0.029283, 0.157758, 0.12048, -0.217961, -0.008447, 0.08367, -0.156421, 0.229774, -0.102359, -0.227667, 0.193014, -0.127227, 0.268292, 0.217053, 0.179447, 0.058184, 0.113688, 0.594422, -0.140355, -0.53371, -0.072686, -0.006329, -0.042972, -0.366099, -0.210114, 0.303601, -0.142105, 0.313616, -0.157675, -0.443203, -0.066303, -0.283844, 0.343003, 0.394526, 0.173943, -0.003257, 0.05773, 1.388811, -0.152793, -0.497575, -0.271928, -0.311122, -0.124239, -0.51925, -0.233288, 0.191564, -0.13758, 0.426298, -0.017027, -0.35867, -0.057771, -0.34284, 0.196352, 0.254201, -0.475032, 0.146641, -0.124946, 1.181146, -0.061944, -0.400732, -0.204686, -0.228107, -0.01399, -0.064517, 0.158763, 0.156986, -0.411093, 0.481945, -0.155355, -0.037516, -0.232973, -0.06048, 0.011917, 0.308685, -0.052535, 0.146091, 0.162202, 0.554023, 0.102752, -0.130564, -0.510288, -0.022423, -0.169576, -0.399666, 0.130154, 0.06993, 0.097847, -0.020514, 0.093832, -0.078574, -0.085287, 0.161906, -0.033471, 0.310127, -0.054548, 0.058614, 0.153987, -0.231733, 0.112381, -0.038922, -0.223307, 0.026776, -0.050397, 0.188764, -0.173008, -0.066302, 0.082301, -0.103682, 0.026262, -0.060118, 0.007411, -0.036403, -0.031983, -0.026262, 0.034583, -0.040043, -0.033023, 0.00195, -0.00507, 0.040303, 0.035363, -0.050574, 0.024572, 0.040563, -0.007541, -0.014301, -0.008451, 0.024572, 0.010271, 0.034323, -0.010617, 0.052153, 0.04582, 0.037625, -0.049545, 0.057368, 0.04731, -0.002794, 0.007264, -0.057741, -0.050663, 0.072455, -0.035203, -0.058113, 0.010803, 0.020489, 0.012107, -0.035203, -0.014715, -0.049173], [-1.682374, -2.667147, -3.65282, 0.392675, 0.0, -1.056631, -0.820034, 0.346631, -2.090677, -1.786418, -1.264079, 0.647951, 0.0, -1.315875, -0.644846, 0.568705, -0.82573, 0.568651, 1.749435, 0.007364, 0.0, -0.226907, -0.057752, 0.352672, -0.291729, -0.291729, -0.291729, -0.567364, 0.0, 0.0, 0.0, 0.0, 1.763447, 1.359592, 0.387768, -0.880739, 0.0, 0.617453, -0.093232, -0.864193, -0.046581, -0.000491, 2.914719, -0.243511, 0.0, 0.267809, 0.080352, -0.893181, -0.186544, 0.184376, 0.635293, -0.29657, 0.0, -0.200325, 0.046413, -0.808526, -0.427351, -0.427351, -0.427351, -0.304478, 0.0, 0.0, 0.0, 0.0], {'S': -1.2711633183073912, 'B': -0.39322404566068681, '-': -0.3108707306825868, 'T': -0.88741012687103238})}
 
-def choose_random_consecutive(numelem,p=0.2):
+def choose_random_consecutive(numelem,p=0.2,rng=numpy.random):
     ##first=random.random_integers(0,1)
-    first=random_integers(0,1)
+    first=rng.randint(2)
     lst=[]
     app=lst.append
     for i in range(numelem):
-	if rand()<p:
+	if rng.random_sample()<p:
 	  other=1-first
 	  app(other)
 	  first=other
@@ -470,21 +539,11 @@ def avenscorr(params,probs,numres):
     ##print pari['H'][1][0,1,0],probs[0,5]
     #probability weighted sum of N in windows of +-4
     #TODO same prob weighted sum for A
-    X=array([[[[[[params[pc][ss][1][direc,k,j]*probs[j,n] for j in range(8)] for n in range(numres)] for k in range(4)] for direc in (0,1)] for ss in 'HSC'] for pc in (0,1)])
-    if debug:print X.shape
-    if False:
-    ##for ss in 'HSC':
-      N=pari[ss][1]
-      for n in range(numres):
-	for direc in (0,1):
-	 for k in range(4):
-	  sndk=sum([N[direc,k,j]*probs[j,n] for j in range(8)])
-    A=sum(X,axis=(2,3,5))
+    #N stacked as (pc,ss3,direction,offset,ss8), contracted with probs (ss8,numres) over direction, offset and ss8
+    NT=array([[params[pc][ss][1] for ss in 'HSC'] for pc in (0,1)])
+    A=einsum('psdkj,jn->psn',NT,asarray(probs,dtype=float)[:,:numres])
     if debug:print A.shape
     return A #returns ANS
-    imshow(A,interpolation='none',cmap=cm.RdBu,vmax=9,vmin=-9)
-    show();1/0
-    1/0
 
 def writepredout(bmrid,resis,seq,pc1s,pc2s):
   out=open('predpcsnew%s.txt'%bmrid,'w')
@@ -495,7 +554,16 @@ def writepredout(bmrid,resis,seq,pc1s,pc2s):
     out.write('%3d %1s %7.3f %7.3f\n'%(ri,aai,pc1s[i],pc2s[i]))
   out.close()
 
+_CORVALS=None#shared parameters from CORVALS6, built by the first init_corvals call
+
 def init_corvals():
+  #the parameters only depend on CORVALS6: built once per process, each caller gets its own dicts
+  #(updateparamswithseq adds the sequence dependent S8 tables to them)
+  global _CORVALS
+  if _CORVALS==None:_CORVALS=build_corvals()
+  return [dict(pari) for pari in _CORVALS]
+
+def build_corvals():
   ##corvals=eval(open('corvals6.txt','r').readline())
   corvals=CORVALS6
   ##corvals=eval(open('corvals.txt','r').readline())
@@ -560,19 +628,19 @@ def updateparamswithseq(params,seq):
      print numres
      print ''.join(seq)
     s8mats=[]
-    seq4=seq+['G','G','G','G']
+    #sequence codes padded with Gly at both ends, window (numres,9) of codes around each residue
+    seqi=array([aa1s3.index(aa) for aa in ['G']*4+list(seq)+['G']*4])
+    W=seqi[arange(numres)[:,newaxis]+arange(9)]
     for pcnum in range(3):
       S=zeros((3,numres))
       S8=zeros((8,numres))
       for i,ss in enumerate(ss3s):
        A,N=params[pcnum][ss]
-       for n in range(numres):
-	##cgn=sum([A[k+4][aa1s3.index(seq[n+k])] for k in range(-4,5)])
-	cgn=sum([A[k+4][aa1s3.index(seq4[n+k])] for k in range(-4,5)])
-	##print i,n,pcnum,ss,cgn
-	S[i,n]=cgn
-	for j in indss3[ss]:
-	  S8[j,n]=cgn+params[pcnum]['D0'][allss8[j]]
+       #9-tap correlation of the sequence with A
+       cgn=sum(A[arange(9),W],axis=1)
+       S[i]=cgn
+       for j in indss3[ss]:
+	 S8[j]=cgn+params[pcnum]['D0'][allss8[j]]
        ##if pcnum==0:##imshow(S,interpolation='none',cmap=cm.RdBu,vmax=2,vmin=-2)
        if False:
 	subplot(311+pcnum)
@@ -584,6 +652,39 @@ def updateparamswithseq(params,seq):
     ##show();1/0
     ##return s8mats
 
+# per-sequence S8 tables, optionally also kept as .npz files in S8CACHEDIR
+S8CACHE=LRUCache(64)
+S8CACHEDIR=None
+
+def seqparams(seq):
+  #init_corvals parameters with the S8 tables for seq, reusing those of earlier calls with the same sequence
+  params=init_corvals()
+  key=hashlib.sha1(''.join(seq)).hexdigest()
+  s8mats=S8CACHE.get(key)
+  if s8mats==None:
+    fname=None
+    if S8CACHEDIR!=None:
+      if not os.path.isdir(S8CACHEDIR):
+	try:os.makedirs(S8CACHEDIR)
+	except OSError:
+	  if not os.path.isdir(S8CACHEDIR):raise#not just made by a concurrent run
+      fname=os.path.join(S8CACHEDIR,'S8_%s.npz'%key)
+    if fname!=None and os.path.exists(fname):
+      npz=numpy.load(fname)
+      s8mats=[npz['S8_%d'%pcnum] for pcnum in range(3)]
+    else:
+      updateparamswithseq(params,seq)
+      s8mats=[params[pcnum]['S8'] for pcnum in range(3)]
+      if fname!=None:
+	#written under a temporary name and renamed, so that no run sees a partial file
+	tmpname='%s.%d.tmp.npz'%(fname[:-4],os.getpid())
+	numpy.savez(tmpname,**dict([('S8_%d'%pcnum,s8mats[pcnum]) for pcnum in range(3)]))
+	os.rename(tmpname,fname)
+    for S8 in s8mats:S8.flags.writeable=False#shared between entries
+    S8CACHE.put(key,s8mats)
+  for pcnum in range(3):params[pcnum]['S8']=s8mats[pcnum]
+  return params
+
 def read_priors(name):
    buf=initfil2(name)[2:]
    #probabilities are in the order of H G I E B T S L(loops), the 8 secondary structure types used in DSSP 
@@ -645,48 +746,56 @@ def evaluatess83(probs,seq,s8,s3,post0,printstrs=True):
    print 'evaluation (probs): %6.4f %6.4f %6.4f'%(Q3,Q8,trueprobs),average(post8)
    return preds8,preds3
 
-def guesss8s(params,resis,pcsobs,priors,ssigs,s8obs=None,ANS=None,dovis=False):
-  ss3s='HSC'
-  allss8='HGIE-TSB'
-  ss8to3ind={'H':0,'G':0,'I':0,'E':1,'-':2,'T':2,'S':2,'B':2}
-  ru=array(resis-1,dtype=int)
+def guess_preds(params,ANS=None):
+  #predicted shPCs (2,8,numres) using sum approx, or the neighbour averages ANS (2,3,numres)
   inds3=array([0,0,0,1,2,2,2,2])
-  sig=array([[[ssigs[pcnum,i] for n in range(len(ru))] for i in range(8)] for pcnum in (0,1)])
-  #first derive the predicted shPCs using sum approx
-  if ANS==None:preds=[array([params[pcnum]['S8'][i]+params[pcnum]['NS'][ss8to3ind[allss8[i]]] for i in range(8)]) for pcnum in (0,1)]
-  else:        preds=array([[params[pcnum]['S8'][i]+         ANS[pcnum][ss8to3ind[allss8[i]]] for i in range(8)]  for pcnum in (0,1)])
-  #keep those with observed shPCs
-  preds=[prp[:,ru] for prp in preds]
-  #derive the likelihood
-  dev=array([preds[pc]-pcsobs[pc] for pc in (0,1)])##/3.0
-  dev/=sig
-  probs=exp(-0.5*(array(dev)**2))/sig#skip the normconstant but remember prop to inv sig
+  S8=array([params[pcnum]['S8'] for pcnum in (0,1)])
+  if ANS is None:return S8+array([params[pcnum]['NS'] for pcnum in (0,1)])[:,inds3,newaxis]
+  return S8+asarray(ANS)[:,inds3]
+
+def guess_posterior(preds,ru,pcsobs,priors,ssigs):
+  #column-wise Bayes update of priors (8,numres) with the observed shPCs pcsobs (2,numobs) at ru,
+  #returns the new priors and the unnormalized posterior (8,numobs)
+  sig=asarray(ssigs)[:2,:,newaxis]
+  #keep those with observed shPCs and derive the likelihood
+  dev=(preds[:,:,ru]-asarray(pcsobs)[:,newaxis,:])/sig
+  probs=exp(-0.5*dev**2)/sig#skip the normconstant but remember prop to inv sig
   probs0=probs[0]*probs[1]
-  ##print 'testliks',list(probs0[:,6])
-  #prior probability from RaptorX
-  priors0=priors[:,ru]
-  #posterior probability using Bayes
-  if debug:print priors0.shape,probs0.shape
-  post0=priors0*probs0
-  #best (quick) guess is the maxpost selection
-  maxprobs=[post0[:,n].max() for n in range(len(post0[0]))]
-  maxlik=[probs0[:,n].max() for n in range(len(probs0[0]))]
-  maxposs=[post0[:,n].argmax() for n in range(len(post0[0]))]
-  ##pc1pred=[preds[0][maxposs[n],n] for n in range(len(probs0[0]))]
-  if False:
-   plot(ru,zeros(len(ru)),'k--')
-   plot(ru,pc1pred,'g')##;show();1/0
-  ##plot(arange(len(maxlik)),maxlik,'g')
-  ##print 'avepost:',average(maxprobs),len(maxprobs)
-  if debug:print 'avepost:',average(maxprobs),average(log(maxprobs)),len(maxprobs)
-  if debug:print 'avelik:',average(maxlik),len(maxlik)
+  #prior probability from RaptorX, posterior probability using Bayes
+  post0=ascontiguousarray(priors[:,ru]*probs0)#row order keeps the column sums below as before
+  if debug:
+    #best (quick) guess is the maxpost selection
+    maxprobs=post0.max(axis=0)
+    print 'avepost:',average(maxprobs),average(log(maxprobs)),len(maxprobs)
+    print 'avelik:',average(probs0.max(axis=0)),len(maxprobs)
   #normalize post
   post=post0/sum(post0,axis=0)
-  maxprobsnorm=[post[:,n].max() for n in range(len(post[0]))]
-  if debug:print 'avepostnorm:',average(maxprobsnorm),exp(average(log(maxprobsnorm))),len(maxprobs)
-  ##print 'test_post',list(post[:,7])
+  if debug:
+    maxprobsnorm=post.max(axis=0)
+    print 'avepostnorm:',average(maxprobsnorm),exp(average(log(maxprobsnorm))),len(maxprobs)
   newpri=priors.copy()
   newpri[:,ru]=post
+  return newpri,post0,post,probs0
+
+def guesss8s_batch(entries,ssigs,ANSs=None):
+  #guesss8s for several entries (params,resis,pcsobs,priors) at once: all columns are independent,
+  #so the entries are laid side by side along the residue axis and updated in one pass
+  if ANSs is None:ANSs=[None]*len(entries)
+  preds=[guess_preds(params,ANS) for (params,resis,pcsobs,priors),ANS in zip(entries,ANSs)]
+  lens=[len(entry[3][0]) for entry in entries]
+  offs=cumsum([0]+lens)
+  ru=concatenate([array(entry[1]-1,dtype=int)+off for entry,off in zip(entries,offs)])
+  newpri,post0,post,probs0=guess_posterior(concatenate(preds,axis=2),ru,concatenate([entry[2] for entry in entries],axis=1),
+					   concatenate([entry[3] for entry in entries],axis=1),ssigs)
+  obsoffs=cumsum([0]+[len(entry[1]) for entry in entries])
+  return [(newpri[:,offs[i]:offs[i+1]],post0[:,obsoffs[i]:obsoffs[i+1]]) for i in range(len(entries))]
+
+def guesss8s(params,resis,pcsobs,priors,ssigs,s8obs=None,ANS=None,dovis=False):
+  allss8='HGIE-TSB'
+  ru=array(resis-1,dtype=int)
+  preds=guess_preds(params,ANS)
+  newpri,post0,post,probs0=guess_posterior(preds,ru,pcsobs,priors,ssigs)
+  priors0=priors[:,ru]
   ##plot(arange(len(maxprobs)),maxprobs,'r')
   if dovis:
     ##imshow(vstack((ANS[0],ANS[1])),interpolation='none',cmap=cm.RdBu,vmax=9,vmin=-9)
@@ -720,8 +829,8 @@ def getmaxss(pri):
   ##ss8indsmax=[allss8.index(ss8m) for ss8m in ss8]
   return ss8,ss3
 
-def selector(probs):
-	prob=rand()
+def selector(probs,rng=numpy.random):
+	prob=rng.random_sample()
 	cum=0
 	for j,probj in enumerate(probs):
 	  cum+=probj
@@ -729,11 +838,11 @@ def selector(probs):
 	    break
 	return j
 
-def fastselector(probs,makecum=True):
+def fastselector(probs,makecum=True,rng=numpy.random):
     allss8='HGIE-TSB'
     if makecum:probs=cumsum(probs) 
     ##print probs
-    gt = probs>rand()
+    gt = probs>rng.random_sample()
     try:ind=list(gt).index(True)-1
     except ValueError:
 	if debug:print 'warning ValueError',probs,gt
@@ -741,6 +850,49 @@ def fastselector(probs,makecum=True):
     ##print ind,allss8[ind]
     return ind
 
+#int8 codes of the dssp8 (allss8) and dssp3 (HSC) labels, indexed by character code
+S8LUT=zeros(256,dtype=int8)
+for _i,_ss8 in enumerate('HGIE-TSB'):S8LUT[ord(_ss8)]=_i
+S3LUT=zeros(256,dtype=int8)
+for _i,_ss3 in enumerate('HSC'):S3LUT[ord(_ss3)]=_i
+S3OF8=array([0,0,0,1,2,2,2,2],dtype=int8)
+#neighbour rows of S9: direction and offset into N for the residues at n-4..n-1,n+1..n+4
+NBOFFS=array([-4,-3,-2,-1,1,2,3,4])
+NBDIRS=array([0,0,0,0,1,1,1,1])
+NBKS  =array([3,2,1,0,0,1,2,3])
+
+def _score_window(s8w,s3w,lo,k0,ru,S8tab,NT,sigtab,pritab,pcsobs,S9w,backpcs,post0):
+  #loop version of SSparameters.score_window, only used compiled (numba)
+  W=S9w.shape[2]
+  for pc in range(2):
+    for j in range(W):
+      tot=0.0
+      for r in range(9):
+        if r==4:val=S8tab[pc,s8w[j+4],lo+j]
+        else:
+          q=r-(r>4)
+          val=NT[pc,s3w[j],NBDIRS[q],NBKS[q],s8w[j+4+NBOFFS[q]]]
+        S9w[pc,r,j]=val
+        tot+=val
+      backpcs[pc,j]=tot
+  for k in range(post0.shape[0]):
+    n=ru[k0+k]
+    s=s8w[n-lo+4]
+    p=pritab[s,n]
+    for pc in range(2):
+      sig=sigtab[pc,s,n]
+      dev=(backpcs[pc,n-lo]-pcsobs[pc,k0+k])/sig
+      p*=exp(-0.5*dev*dev)/sig
+    post0[k]=p
+
+if njit!=None:_score_window_nb=njit(_score_window)
+
+
+#fractions of the 8 DSSP classes by residue type (in the order of FRACMAT8AAS), used as priors without sequence predictions
+##fmat=initfil2('fracmat8.pck')
+##fmat=eval(initfil('fracmat8.json')[0][:-1])
+FRACMAT8AAS='GPCTNSVWFHDYIMLKRQAE'
+FRACMAT8=array([[0.14211076280041798, 0.034482758620689655, 0.00052246603970741907, 0.14263322884012539, 0.20585161964472309, 0.27795193312434691, 0.18652037617554859, 0.0099268547544409617], [0.15732217573221757, 0.057740585774058578, 0.0, 0.099581589958158995, 0.40083682008368199, 0.1790794979079498, 0.092887029288702933, 0.012552301255230125], [0.21404682274247491, 0.046822742474916385, 0.0, 0.32441471571906355, 0.23076923076923078, 0.096989966555183951, 0.073578595317725759, 0.013377926421404682], [0.23194444444444445, 0.036805555555555557, 0.00069444444444444447, 0.29375000000000001, 0.2298611111111111, 0.10208333333333333, 0.089583333333333334, 0.015277777777777777], [0.22014260249554368, 0.049910873440285206, 0.0, 0.1497326203208556, 0.25311942959001782, 0.19607843137254902, 0.11853832442067737, 0.012477718360071301], [0.24803664921465968, 0.06413612565445026, 0.0, 0.21269633507853403, 0.2349476439790576, 0.12172774869109948, 0.10471204188481675, 0.0137434554973822], [0.27904391328515843, 0.019455252918287938, 0.0, 0.44024458032240132, 0.14508060033351863, 0.054474708171206226, 0.047804335742078929, 0.013896609227348526], [0.36533333333333334, 0.066666666666666666, 0.0, 0.26933333333333331, 0.13600000000000001, 0.087999999999999995, 0.053333333333333337, 0.021333333333333333], [0.33893805309734515, 0.04247787610619469, 0.0, 0.30442477876106194, 0.16371681415929204, 0.070796460176991149, 0.068141592920353988, 0.011504424778761062], [0.30161579892280072, 0.052064631956912029, 0.0, 0.20825852782764812, 0.20287253141831238, 0.13824057450628366, 0.07899461400359066, 0.017953321364452424], [0.27330374128091312, 0.062143310082435003, 0.00063411540900443881, 0.11921369689283449, 0.25618262523779328, 0.15916296766011415, 0.11921369689283449, 0.010145846544071021], [0.33054393305439328, 0.039748953974895397, 0.0010460251046025104, 0.30439330543933052, 0.14644351464435146, 0.092050209205020925, 0.064853556485355651, 0.020920502092050208], [0.3210130047912389, 0.02190280629705681, 0.0, 0.3867214236824093, 0.1567419575633128, 0.045174537987679675, 0.052703627652292952, 0.015742642026009581], [0.42247191011235957, 0.024719101123595506, 0.0, 0.26292134831460673, 0.16629213483146069, 0.053932584269662923, 0.060674157303370786, 0.008988764044943821], [0.41263782866836302, 0.037319762510602206, 0.0, 0.26463104325699743, 0.15097540288379982, 0.066157760814249358, 0.056827820186598814, 0.011450381679389313], [0.38017651052274271, 0.04684317718940937, 0.0, 0.17107942973523421, 0.15953835709436523, 0.14460285132382891, 0.086218601493550581, 0.011541072640868975], [0.38118022328548645, 0.043859649122807015, 0.0, 0.21850079744816586, 0.16267942583732056, 0.098883572567783087, 0.081339712918660281, 0.013556618819776715], [0.449438202247191, 0.048314606741573035, 0.0, 0.15842696629213482, 0.16179775280898875, 0.094382022471910118, 0.07528089887640449, 0.012359550561797753], [0.47163912460920054, 0.04644930772666369, 0.0, 0.1866904868244752, 0.13443501563197857, 0.0933452434122376, 0.06163465832961143, 0.0058061634658329612], [0.44922118380062304, 0.058566978193146414, 0.00062305295950155766, 0.15015576323987539, 0.14080996884735203, 0.11775700934579439, 0.077258566978193152, 0.0056074766355140183]])
 
 class SSparameters(Environment):
 
@@ -752,8 +904,10 @@ class SSparameters(Environment):
     ssigs*=1.1
 
 
-    def __init__(self,bmrid):
+    def __init__(self,bmrid,seed=None):
 	self.bmrid=bmrid
+	#all random draws of the GA go through this generator (reproducible when seeded)
+	self.rng=numpy.random.RandomState(seed)
 	return
 	secbuf=initfil2('rungsshits.txt')
 	secdct={}
@@ -765,16 +919,8 @@ class SSparameters(Environment):
 	self.seqdct=seqdct
 
     def init_priors_basic(self):
-	aas='GPCTNSVWFHDYIMLKRQAE'
-	##fmat=initfil2('fracmat8.pck')
-	##fmat=eval(initfil('fracmat8.json')[0][:-1])
-	fmat=[[0.14211076280041798, 0.034482758620689655, 0.00052246603970741907, 0.14263322884012539, 0.20585161964472309, 0.27795193312434691, 0.18652037617554859, 0.0099268547544409617], [0.15732217573221757, 0.057740585774058578, 0.0, 0.099581589958158995, 0.40083682008368199, 0.1790794979079498, 0.092887029288702933, 0.012552301255230125], [0.21404682274247491, 0.046822742474916385, 0.0, 0.32441471571906355, 0.23076923076923078, 0.096989966555183951, 0.073578595317725759, 0.013377926421404682], [0.23194444444444445, 0.036805555555555557, 0.00069444444444444447, 0.29375000000000001, 0.2298611111111111, 0.10208333333333333, 0.089583333333333334, 0.015277777777777777], [0.22014260249554368, 0.049910873440285206, 0.0, 0.1497326203208556, 0.25311942959001782, 0.19607843137254902, 0.11853832442067737, 0.012477718360071301], [0.24803664921465968, 0.06413612565445026, 0.0, 0.21269633507853403, 0.2349476439790576, 0.12172774869109948, 0.10471204188481675, 0.0137434554973822], [0.27904391328515843, 0.019455252918287938, 0.0, 0.44024458032240132, 0.14508060033351863, 0.054474708171206226, 0.047804335742078929, 0.013896609227348526], [0.36533333333333334, 0.066666666666666666, 0.0, 0.26933333333333331, 0.13600000000000001, 0.087999999999999995, 0.053333333333333337, 0.021333333333333333], [0.33893805309734515, 0.04247787610619469, 0.0, 0.30442477876106194, 0.16371681415929204, 0.070796460176991149, 0.068141592920353988, 0.011504424778761062], [0.30161579892280072, 0.052064631956912029, 0.0, 0.20825852782764812, 0.20287253141831238, 0.13824057450628366, 0.07899461400359066, 0.017953321364452424], [0.27330374128091312, 0.062143310082435003, 0.00063411540900443881, 0.11921369689283449, 0.25618262523779328, 0.15916296766011415, 0.11921369689283449, 0.010145846544071021], [0.33054393305439328, 0.039748953974895397, 0.0010460251046025104, 0.30439330543933052, 0.14644351464435146, 0.092050209205020925, 0.064853556485355651, 0.020920502092050208], [0.3210130047912389, 0.02190280629705681, 0.0, 0.3867214236824093, 0.1567419575633128, 0.045174537987679675, 0.052703627652292952, 0.015742642026009581], [0.42247191011235957, 0.024719101123595506, 0.0, 0.26292134831460673, 0.16629213483146069, 0.053932584269662923, 0.060674157303370786, 0.008988764044943821], [0.41263782866836302, 0.037319762510602206, 0.0, 0.26463104325699743, 0.15097540288379982, 0.066157760814249358, 0.056827820186598814, 0.011450381679389313], [0.38017651052274271, 0.04684317718940937, 0.0, 0.17107942973523421, 0.15953835709436523, 0.14460285132382891, 0.086218601493550581, 0.011541072640868975], [0.38118022328548645, 0.043859649122807015, 0.0, 0.21850079744816586, 0.16267942583732056, 0.098883572567783087, 0.081339712918660281, 0.013556618819776715], [0.449438202247191, 0.048314606741573035, 0.0, 0.15842696629213482, 0.16179775280898875, 0.094382022471910118, 0.07528089887640449, 0.012359550561797753], [0.47163912460920054, 0.04644930772666369, 0.0, 0.1866904868244752, 0.13443501563197857, 0.0933452434122376, 0.06163465832961143, 0.0058061634658329612], [0.44922118380062304, 0.058566978193146414, 0.00062305295950155766, 0.15015576323987539, 0.14080996884735203, 0.11775700934579439, 0.077258566978193152, 0.0056074766355140183]]
-	pri=[]
-	numres=len
-	for i,aa in enumerate(self.seq):
-	  fracs=[fmat[aas.index(aa)][j] for j in range(8)]
-	  pri.append(array(fracs))
-	return array(pri).transpose()
+	#class fractions of the residue types, no sequence context
+	return FRACMAT8[[FRACMAT8AAS.index(aa) for aa in self.seq]].transpose()
 
     def initparameters(self,usesimple=False,ss8pref=''):
 	if usesimple:self.priors=self.init_priors_basic()
@@ -788,8 +934,91 @@ class SSparameters(Environment):
 	  if self.disordered[i]:
 	    if debug:print 'isdisordered:',self.bmrid,ires,self.zscores[i],self.priors[-4,ires-1],self.priors[-2,ires-1]
 	    self.priors[:,ires-1]=[0,0,0,0.05,0.8,0,0.2,0]#none or bend (-/S)
-	self.params=init_corvals()
-	updateparamswithseq(self.params,self.seq)
+	self.params=seqparams(self.seq)
+	self.init_tables()
+
+    def init_tables(self):
+	#(8,numres) lookup tables used for scoring int8 state vectors by fancy indexing
+	numres=len(self.seq)
+	self.sigtab=repeat(self.ssigs[:,:,newaxis],numres,axis=2)#(2,8,numres)
+	self.pritab=array(self.priors,dtype=float)#(8,numres)
+	self.pcsobs=array(self.pcsobsref,dtype=float)#(2,numobs)
+	#stacked neighbour tensor (pc,ss3,direction,offset,ss8) and centre values (pc,ss8,numres)
+	self.NT=array([[self.params[pcnum][ss][1] for ss in 'HSC'] for pcnum in (0,1)])
+	self.S8tab=array([self.params[pcnum]['S8'] for pcnum in (0,1)])
+	#positions of the neighbours, residues outside the chain point to a padding slot (coil)
+	nbidx=arange(numres)+NBOFFS[:,newaxis]
+	nbidx[(nbidx<0)|(nbidx>=numres)]=numres
+	self.nbidx=nbidx#(8,numres)
+	#Zobrist keys for hashing states, fixed seed so that hashes agree between populations
+	self.ztab=numpy.random.RandomState(8).randint(-2**63,2**63-1,size=(8,numres),dtype=int64)
+	#same keys as python ints by residue and class letter, for updates over a few positions
+	self.zkeys=[dict(zip('HGIE-TSB',map(int,self.ztab[:,n]))) for n in range(numres)]
+
+    def hash_s8(self,s8i):
+	return int(bitwise_xor.reduce(self.ztab[s8i,arange(len(s8i))]))
+
+    def encode_s8(self,s8):
+	return S8LUT[fromstring(''.join(s8),dtype=uint8)]
+
+    def encode_s3(self,s3):
+	return S3LUT[fromstring(''.join(s3),dtype=uint8)]
+
+    def backcalc_s9(self,s8i,s3i):
+	#fills S9 for both PCs from state vectors of shape (numres,) or (K,numres)
+	#returns an array of shape (2,9,numres) or (K,2,9,numres)
+	numres=s8i.shape[-1]
+	s8pad=concatenate((s8i,4*ones(s8i.shape[:-1]+(1,),dtype=s8i.dtype)),axis=-1)
+	S9=empty(s8i.shape[:-1]+(2,9,numres))
+	S9[...,4,:]=moveaxis(self.S8tab[:,s8i,arange(numres)],0,-2)
+	nbs=self.NT[:,s3i[...,newaxis,:],NBDIRS[:,newaxis],NBKS[:,newaxis],s8pad[...,self.nbidx]]
+	nbs=moveaxis(nbs,0,-3)
+	S9[...,:4,:]=nbs[...,:4,:]
+	S9[...,5:,:]=nbs[...,4:,:]
+	return S9
+
+    def backcalc_s9_window(self,s8w,s3w,lo,hi):
+	#S9 columns lo:hi for both PCs, s8w holds the states of lo-4:hi+4 and s3w those of lo:hi
+	j=arange(hi-lo)
+	S9=empty((2,9,hi-lo))
+	S9[:,4,:]=self.S8tab[:,s8w[j+4],lo+j]
+	nbs=self.NT[:,s3w,NBDIRS[:,newaxis],NBKS[:,newaxis],s8w[j+4+NBOFFS[:,newaxis]]]
+	S9[:,:4,:]=nbs[:,:4,:]
+	S9[:,5:,:]=nbs[:,4:,:]
+	return S9
+
+    def score_window(self,s8w,s3w,lo,hi,k0,k1):
+	#S9 columns and PCs of lo:hi and the posterior terms of the observed residues k0:k1 in it
+	if njit!=None:
+	  S9w=empty((2,9,hi-lo));backpcs=empty((2,hi-lo));post0=empty(k1-k0)
+	  _score_window_nb(s8w,s3w,lo,k0,self.ru,self.S8tab,self.NT,self.sigtab,self.pritab,self.pcsobs,S9w,backpcs,post0)
+	  return S9w,backpcs,post0
+	S9w=self.backcalc_s9_window(s8w,s3w,lo,hi)
+	backpcs=S9w.sum(axis=1)
+	lru=self.ru[k0:k1]
+	obs8=s8w[lru-lo+4]
+	sig=self.sigtab[:,obs8,lru]
+	dev=(backpcs[:,lru-lo]-self.pcsobs[:,k0:k1])/sig
+	probsref=exp(-0.5*dev**2)/sig
+	return S9w,backpcs,probsref[0]*probsref[1]*self.pritab[obs8,lru]
+
+    def calc_post0(self,s8i,backpcs):
+	#posterior terms of the observed residues from state vectors (...,numres) and PCs (...,2,numres)
+	ru=self.ru
+	obs8=s8i[...,ru]
+	sig=moveaxis(self.sigtab[:,obs8,ru],0,-2)
+	dev=(backpcs[...,ru]-self.pcsobs)/sig
+	probsref=exp(-0.5*dev**2)/sig
+	return probsref[...,0,:]*probsref[...,1,:]*self.pritab[obs8,ru]
+
+    def calc_energies(self,S8I,S3I=None,full=False):
+	#energies of K individuals given as a (K,numres) matrix of int8 states
+	if S3I is None:S3I=S3OF8[S8I]
+	S9=self.backcalc_s9(S8I,S3I)
+	post0=self.calc_post0(S8I,sum(S9,axis=-2))
+	eners=-sum(log(post0),axis=-1)
+	if full:return eners,S9,post0
+	return eners
 
     def set_observed(self):
 	bmrid=self.bmrid
@@ -807,6 +1036,7 @@ class SSparameters(Environment):
 	self.maxi=self.resis[-1]
 	print 'mini and maxi:',self.mini,self.maxi
 	self.ru=array(self.resis-1,dtype=int)
+	self.init_obsindex()
 	self.pcsobsref=(pc1sobs,pc2sobs)
 	self.zscores=array(zscores)
 	self.disordered=self.zscores<8.0
@@ -820,6 +1050,7 @@ class SSparameters(Environment):
 	self.maxi=self.resis[-1]
 	print 'mini and maxi:',self.mini,self.maxi
 	self.ru=array(self.resis-1,dtype=int)
+	self.init_obsindex()
 	self.pcsobsref=(pc1sobs,pc2sobs)
 	##print zsco
 	self.zscores=array(zsco)
@@ -827,8 +1058,32 @@ class SSparameters(Environment):
 	self.s8obs=None #no observed - this is de novo prediction
 	self.s3obs=None
 
-    def make_guess(self):
+    def init_obsindex(self):
+	#observation slot of each residue (-1 if not observed) and, for window bounds,
+	#the first slot at or after each residue: slots obsstart[lo]:obsstart[hi] lie in lo:hi
+	numres=len(self.seq)
+	self.obsslot=-ones(numres,dtype=int)
+	self.obsslot[self.ru]=arange(len(self.ru))
+	self.obsstart=searchsorted(self.ru,arange(numres+1))
+
+    def make_guess(self,numrefine=0):
 	self.ss8priors,post0=guesss8s(self.params,self.resis,self.pcsobsref,self.priors,self.ssigs,self.s8obs)
+	if numrefine>0:self.refine_priors(numrefine)
+
+    def refine_priors(self,maxiter=50,convtol=None,damping=0.5):
+	#mean-field iteration: the neighbour contributions are averaged over the current posterior
+	#(avenscorr) instead of the fixed NS sums and the posterior is recomputed with them, until it
+	#moves less than convtol (mean total variation per residue) or maxiter rounds are done.
+	#Undamped updates tend to oscillate between two states, so only a fraction damping is taken
+	for it in range(maxiter):
+	  ANS=avenscorr(self.params,self.ss8priors,len(self.seq))
+	  newpri,post0=guesss8s(self.params,self.resis,self.pcsobsref,self.priors,self.ssigs,self.s8obs,ANS=ANS)
+	  newpri=(1-damping)*self.ss8priors+damping*newpri
+	  change=average(0.5*sum(abs(newpri-self.ss8priors),axis=0))
+	  self.ss8priors=newpri
+	  if debug:print 'refine_priors:',it,change
+	  if convtol!=None and change<convtol:break
+	return it+1,change
 
     def evaluate_priors(self):
 	probs=self.ss8priors
@@ -836,6 +1091,84 @@ class SSparameters(Environment):
 	print 'trueprobs (priors):',trueprobs
 	return trueprobs
 
+    def _decode_terms(self,hist,n,last):
+	#shift terms (-log, without the prior) of residue n for the hypotheses in hist (B,numres+8, coil padded)
+	#with the states at n+4 given by last (B,8) or (B,1)
+	k=self.obsslot[n]
+	if k<0:return zeros(last.shape)
+	sn=hist[:,n+4]
+	s3n=S3OF8[sn]
+	tot=self.S8tab[:,sn,n]
+	for q in range(7):tot=tot+self.NT[:,s3n,NBDIRS[q],NBKS[q],hist[:,n+4+NBOFFS[q]]]
+	tot=tot[:,:,newaxis]+self.NT[:,s3n[:,newaxis],NBDIRS[7],NBKS[7],last]
+	sig=self.sigtab[:,sn,n][:,:,newaxis]
+	dev=(tot-self.pcsobs[:,k,newaxis,newaxis])/sig
+	return (0.5*dev**2+log(sig)).sum(axis=0)
+
+    def decode_beam(self,width=64,lag=4):
+	#deterministic decoder: beam search over the s8 states from the N-terminus, keeping the width best
+	#hypotheses. The run rules of Segments.return_disallowed are tracked per hypothesis (class, length up
+	#to 4, first G stretch 0 none/1-2 open/3 done, all G) so every hypothesis is allowed. The energy term of
+	#an observed residue (with its prior) is complete when its +4 neighbour is placed; residues without shifts
+	#add their -log prior only (predicted from sequence alone), so states the prior forbids are never taken and
+	#the cost is the energy of calcpostlik plus these terms. Hypotheses that agree in the last 8 states and the run state are merged (the better one is kept).
+	#Returns the final hypotheses (K,numres) and their costs, best first, and marginals (numres,8): those of
+	#residue n from the Boltzmann weights of all extensions at step n+lag (lag>=1), before pruning, which
+	#keeps much more variety than the final beam (the last lag residues from the final beam)
+	numres=len(self.seq)
+	def closable(rcls,rlen,gst,allg):
+	  #the current run may end here: H at least 3 (a 3 residue H as GGG) without an open G stretch, S at least 2
+	  return (rcls==2)|((rcls==1)&(rlen>=2))|((rcls==0)&(rlen>=3)&((rlen>3)|allg)&(gst%3==0))
+	with errstate(divide='ignore'):nlpri=-log(self.pritab)
+	new=arange(8,dtype=int8)
+	c=S3OF8[new]
+	g=new==1
+	pow8=8**arange(7,dtype=int64)
+	hist=4*ones((1,numres+8),dtype=int8)
+	cost=zeros(1)
+	rcls=array([2],dtype=int8);rlen=array([4],dtype=int8);gst=zeros(1,dtype=int8);allg=zeros(1,dtype=bool)
+	marg=zeros((numres,8))
+	for t in range(numres):
+	  closeok=closable(rcls,rlen,gst,allg)
+	  same=c==rcls[:,newaxis]
+	  #an open first G stretch of an H run must go on as G
+	  ok=where(same,~((gst[:,newaxis]==1)|(gst[:,newaxis]==2))|g,closeok[:,newaxis])
+	  nrcls=repeat(c[newaxis,:],len(cost),axis=0)
+	  nrlen=where(same,minimum(rlen+1,4)[:,newaxis],1)
+	  nrlen=where(nrcls==2,4,where(nrcls==1,minimum(nrlen,2),nrlen))#only these lengths matter
+	  ngst=where(same,where(gst[:,newaxis]==0,g,minimum(gst+1,3)[:,newaxis]),g)
+	  nallg=where(same,allg[:,newaxis]&g,g)
+	  total=cost[:,newaxis]+nlpri[new,t]
+	  if t>=4:total=total+self._decode_terms(hist,t-4,new[newaxis,:])
+	  if t==numres-1:ok&=closable(nrcls,nrlen,ngst,nallg)#the last run ends with the chain
+	  total[~ok]=inf
+	  if t>=lag:
+	    #marginal of residue t-lag over all extensions before pruning (all its own terms are in by now)
+	    w=exp(-(total-total.min()))
+	    marg[t-lag]=bincount(hist[:,t-lag+4],weights=w.sum(axis=1),minlength=8)
+	  #merge hypotheses that can only continue alike, then keep the best
+	  keys=(hist[:,maximum(arange(t-3,t+4),0)].astype(int64)*pow8).sum(axis=1)[:,newaxis]*8+new
+	  keys=(((keys*3+nrcls)*5+nrlen)*4+ngst)*2+nallg
+	  flat=total.ravel()
+	  order=argsort(flat,kind='mergesort')
+	  fin=isfinite(flat[order])
+	  if any(fin):order=order[fin]
+	  first=unique(keys.ravel()[order],return_index=True)[1]
+	  order=order[sort(first)][:width]
+	  par=order//8
+	  hist=hist[par]
+	  hist[:,t+4]=order%8
+	  cost=flat[order]
+	  rcls,rlen,gst,allg=nrcls.ravel()[order],nrlen.ravel()[order],ngst.ravel()[order],nallg.ravel()[order]
+	for n in range(max(0,numres-4),numres):cost+=self._decode_terms(hist,n,hist[:,n+8,newaxis])[:,0]
+	order=argsort(cost,kind='mergesort')
+	S8I=hist[order,4:numres+4]
+	cost=cost[order]
+	w=exp(-(cost-cost[0]))
+	for n in range(max(0,numres-lag),numres):marg[n]=bincount(S8I[:,n],weights=w,minlength=8)
+	marg/=marg.sum(axis=1)[:,newaxis]
+	return S8I,cost,marg
+
 class SSopt(GenericIndividual):
 
     def __init__(self,ssp,s8,s3=None):
@@ -846,7 +1179,7 @@ class SSopt(GenericIndividual):
 	  ss8to3ind={'H':0,'G':0,'I':0,'E':1,'-':2,'T':2,'S':2,'B':2}
 	  s3=[ss3s[ss8to3ind[s8i]] for s8i in s8]
 	self.s3=s3
-	self.ss8inds=[self.ssp.allss8.index(ss8) for ss8 in (self.s8+['-','-','-','-'])]
+	self.s8i=self.ssp.encode_s8(self.s8)
 
     def get_clone(self,need_segments=False):
 	s8=self.s8[:]
@@ -854,162 +1187,74 @@ class SSopt(GenericIndividual):
 	new=SSopt(self.ssp,s8,s3)
         ##new.init_segments()
 	##new.segments=Segments(s8,s3)
-	if need_segments:new.segments=self.segments.get_clone()
-	new.S9s=[s9.copy() for s9 in self.S9s]
-	self.backpcs=[None,None]#must be updated #TJEK OK?
-	#new.ss8inds=self.ss8inds[:]
-	new.post0ref=self.post0ref.copy()
+	if need_segments:
+	  new.segments=self.segments.get_clone()
+	  #share the lists so that mutations executed on the segments also update the clone
+	  new.s8=new.segments.s8
+	  new.s3=new.segments.s3
+	#the arrays are shared with the parent until written (see apply_mutation)
+	new.S9s=self.S9s
+	new.backpcs=self.backpcs
+	new.post0ref=self.post0ref
 	return new
 
     def backcalcPCs(self,pcnum):
-	subss8={'H':'HGI','S':'E','C':'-TSB'}
-	indss3={'H':[0,1,2],'S':[3],'C':[4,5,6,7]}
-	indss8={'G':1,'I':2,'T':5,'S':6,'B':7}
-	allss8='HGIE-TSB'
-	numres=len(self.ssp.seq)##-4
-	pari=self.ssp.params[pcnum]
-	S8=pari['S8']
-	self.ss8inds=[self.ssp.allss8.index(ss8) for ss8 in (self.s8+['-','-','-','-'])]
-	ss8inds=self.ss8inds
-	s8vals=[S8[ss8inds[n],n] for n in range(numres)]
-	S9=zeros((9,numres))
-	S9[4]=s8vals
-	for n in range(numres):
-	  gssn=self.s3[n]
-	  N=pari[gssn][1]
-	  bck=[N[0,k,ss8inds[n-1-k]] for k in range(4-1,-1,-1)]
-	  fwd=[N[1,k,ss8inds[n+1+k]] for k in range(4)]
-	  S9[:4,n]=bck
-	  S9[5:,n]=fwd
+	S9=self.backcalcS9s()[pcnum]
 	subtot=sum(S9,axis=0)
 	return subtot,S9
 
-    def backcalcmut(self,n0,ss8m):##,isnew8=True):
+    def backcalcS9s(self):
+	ssp=self.ssp
+	self.s8i=ssp.encode_s8(self.s8)
+	return ssp.backcalc_s9(self.s8i,ssp.encode_s3(self.s3))
+
+    def backcalcmut(self,n0,ss8m):
+	#encoded states of the window lo:hi (the S9 columns that change) after writing ss8m at n0:
+	#s8w covers lo-4:hi+4 (coil outside the chain), s3w covers lo:hi
 	M=len(ss8m)
 	if M>1:
 	  if debug:print 'NOTE: block-mutation',ss8m,M,n0
-	subss8={'H':'HGI','S':'E','C':'-TSB'}
-	indss3={'H':[0,1,2],'S':[3],'C':[4,5,6,7]}
-	indss8={'G':1,'I':2,'T':5,'S':6,'B':7}
-	allss8='HGIE-TSB'
-	conv8to3={'G':'H', 'H':'H', 'I':'H', 'E':'S', 'B':'C','T':'C', 'S':'C', '-':'C','U':'U'}
-	ss8inds=[allss8.index(ss8) for ss8 in (self.s8+['-','-','-','-'])]#generate fresh local
-	##s3=self.s3
-	s3new=self.s3[:]
-	for k in range(M):
-	  ss8ind=allss8.index(ss8m[k])
-	  if debug:print M,k,n0,n0+k,len(ss8inds),ss8ind
-	  ss8inds[n0+k]=ss8ind#modify only the local ss8inds
-	  s3new[n0+k]=conv8to3[ss8m[k]]
-	numres=len(self.ssp.seq)
-	newS9s=[s9i.copy() for s9i in self.S9s]
-	for n in range(n0,n0+M):
-	 ##isnew8=conv8to3[ss8m[n-n0]]!=s3[n]
-	 for pcnum in (0,1):
-	  pari=self.ssp.params[pcnum]
-	  s8m=pari['S8'][ss8ind,n]
-	  ##S9=self.S9s[pcnum]
-	  S9=newS9s[pcnum]
-	  S9[4,n]=s8m
-	  if True:##isnew8: #in case of block-mutation we need this always...
-	    ##gssn=s3[n]
-	    gssn=s3new[n]
-	    N=pari[gssn][1]
-	    bck=[N[0,k,ss8inds[n-1-k]] for k in range(4-1,-1,-1)]
-	    fwd=[N[1,k,ss8inds[n+1+k]] for k in range(4)]
-	    S9[:4,n]=bck
-	    S9[5:,n]=fwd
-	  #now because ss8m is a new dssp8 class
-	  for k in range(4):
-           if n+1+k<numres:
-	    ##S9[3-k,n+1+k]=pari[s3[n+1+k]][1][0,k,ss8ind]
-	    S9[3-k,n+1+k]=pari[s3new[n+1+k]][1][0,k,ss8ind]
-	   if n-1-k>=0:
-	    ##S9[5+k,n-1-k]=pari[s3[n-1-k]][1][1,k,ss8ind]
-	    S9[5+k,n-1-k]=pari[s3new[n-1-k]][1][1,k,ss8ind]
-	  ##newS9s.append(S9)
-	  ##subtot=sum(S9,axis=0)
-	return newS9s,ss8inds
+	ssp=self.ssp
+	numres=len(ssp.seq)
+	lo,hi=max(0,n0-4),min(numres,n0+M+4)
+	e0,e1=max(0,lo-4),min(numres,hi+4)
+	s8w=ssp.encode_s8(['-']*(e0-lo+4)+self.s8[e0:n0]+list(ss8m)+self.s8[n0+M:e1]+['-']*(hi+4-e1))
+	s3w=S3OF8[s8w[4:hi-lo+4]]
+	s3w[:n0-lo]=ssp.encode_s3(self.s3[lo:n0])
+	s3w[n0+M-lo:]=ssp.encode_s3(self.s3[n0+M:hi])
+	return lo,hi,s8w,s3w
 
     def get_diff_mutation(self,n,ss8m):
-	newS9s,newss8inds=self.backcalcmut(n,ss8m)##,isnew8)
-	N=len(self.ssp.seq)
-	M=len(ss8m)
-	lr=(max(0,n-4),min(n+4+M,N))#only derive for local range
-	backpcs=[sum(newS9s[pcnum][:,lr[0]:lr[1]],axis=0) for pcnum in (0,1)]
-	locsegm=[ss8i for ss8i in ss8m]
-	news8loc=self.s8[lr[0]:n]+locsegm+self.s8[n+M:lr[1]]
-	locpost,oldloc=self.calcpostlik_local(lr,n,newss8inds,news8loc,backpcs)##,verb=True)
+	#local change of the log posterior for writing ss8m at n - the columns to write are kept in
+	#self.mutdelta for apply_mutation, nothing of the individual itself is modified
+	ssp=self.ssp
+	lo,hi,s8w,s3w=self.backcalcmut(n,ss8m)
+	k0,k1=ssp.obsstart[lo],ssp.obsstart[hi]
+	S9w,backpcs,post0ref=ssp.score_window(s8w,s3w,lo,hi,k0,k1)
+	self.mutdelta=lo,hi,S9w,backpcs,k0,k1,post0ref
+	if k1==k0: return -999,0#dont use
+	locpost=log(post0ref).sum()
+	oldloc=log(self.post0ref[k0:k1]).sum()
 	if debug:print 'locpost:',locpost,locpost-oldloc
-	self.newS9s=newS9s
 	return locpost,locpost-oldloc
 
+    def apply_mutation(self,delta):
+	#writes the columns of a get_diff_mutation result, arrays shared with the parent are copied first
+	lo,hi,S9w,backpcs,k0,k1,post0ref=delta
+	self.S9s=self.S9s.copy()
+	self.S9s[:,:,lo:hi]=S9w
+	self.backpcs=self.backpcs.copy()
+	self.backpcs[:,lo:hi]=backpcs
+	if k1>k0:
+	  self.post0ref=self.post0ref.copy()
+	  self.post0ref[k0:k1]=post0ref
+
     def backcalcbothPCs(self):
-	self.backpcs=[]
-	self.S9s=[]
-	for pcnum in (0,1):
-	  pcp,S9p=self.backcalcPCs(pcnum)
-	  self.backpcs.append(pcp)
-	  self.S9s.append(S9p)
-
-    def calcpostlik_local(self,lr,nmut,ss8inds,s8,backpcs,verb=False):
-	allss8='HGIE-TSB'
-	numres=len(self.ssp.seq)
-	if verb:print ''.join(s8)
-	if verb:print [ss8inds[n-1] for n in range(lr[0],lr[1])]
-	if verb:print [self.ss8inds[n-1] for n in range(lr[0],lr[1])]
-	ru=self.ssp.ru
-	tru=(ru<lr[1])&(ru>=lr[0])
-	lru=ru[tru]
-	if len(lru)<1: return -999,0#dont use
-	minru=list(ru).index(min(lru))
-	newru=lru-nmut+4
-	newru-=max(0,4-nmut)#correct for N-term...OK?
-	if verb:print lru,minru,newru
-	##print backpcs
-	predsnew=[pcp[newru] for pcp in backpcs]
-	if verb:print predsnew
-	##predsold=[self.backpcs[pc][ru][minru:minru+len(lru)] for pc in (0,1)]
-	##if verb:print predsold
-	pcsobs=[self.ssp.pcsobsref[pc][minru:minru+len(lru)] for pc in (0,1)]
-	if verb:print pcsobs
-	#NOTE: s8 is local "9mer"
-	sig=array([[self.ssp.ssigs[pcnum,allss8.index(s8[n])] for n in newru] for pcnum in (0,1)])
-	if verb:print sig
-	dev=array([predsnew[pc]-pcsobs[pc] for pc in (0,1)])
-	if verb:print dev
-	dev/=sig
-	if verb:print 'devloc:',dev
-	probsref=exp(-0.5*(array(dev)**2))/sig
-	probs0ref=probsref[0]*probsref[1]
-	if verb:print probs0ref
-	#NOTE: ss8inds has full length
-	priors=array([self.ssp.priors[ss8inds[int(n)-1],n-1] for n in lru+1])
-	if verb:print 'priorsloc:',priors
-	post0ref=probs0ref*priors
-	self.post0refnewdata=post0ref,(minru,minru+len(lru))
-	if verb:print post0ref
-	post0reffirst=self.post0ref[minru:minru+len(lru)]
-	if verb:print post0reffirst
-	return sum(log(post0ref)),sum(log(post0reffirst))
+	self.S9s=self.backcalcS9s()
+	self.backpcs=sum(self.S9s,axis=1)
 
     def calcpostlik(self):
-	allss8='HGIE-TSB'
-	ru=self.ssp.ru
-	predsnew=[pcp[ru] for pcp in self.backpcs]
-	ss8inds=self.ss8inds
-	##sig=array([[self.ssp.ssigs[pcnum,'HSC'.index(self.s3[int(n)-1])] for n in self.ssp.resis] for pcnum in (0,1)])
-	sig=array([[self.ssp.ssigs[pcnum,allss8.index(self.s8[int(n)-1])] for n in self.ssp.resis] for pcnum in (0,1)])
-	dev=array([predsnew[pc]-self.ssp.pcsobsref[pc] for pc in (0,1)])
-	dev/=sig
-	##print 'dev:',dev[:,180:189]
-	probsref=exp(-0.5*(array(dev)**2))/sig
-	probs0ref=probsref[0]*probsref[1]
-	##post0ref=probs0ref*array([self.ssp.priors[ss8inds[int(n)-1],n-1] for n in self.ssp.resis])
-	priors=array([self.ssp.priors[ss8inds[int(n)-1],n-1] for n in self.ssp.resis])
-	##print 'priors:',priors[175:184]
-	##post0ref=probs0ref*sqrt(priors) would this help although not strictly "correct"?
-	post0ref=probs0ref*priors
+	post0ref=self.ssp.calc_post0(self.s8i,self.backpcs)
 	self.post0ref=post0ref
 	self.score=sum(log(post0ref))
 	self.energy=-self.score
@@ -1034,12 +1279,12 @@ class SSopt(GenericIndividual):
 	return Q8,Q3
 
     def init_segments(self):
-	self.segments=Segments(self.s8,self.s3)
+	self.segments=Segments(self.s8,self.s3,self.ssp.rng)
 
     def choose_mutation(self,verb=False):
 	##probs=some numbers
 	probs=(0.3,0.2,0.2,0.05,0.05,0.12,0.08)#tentative assignments
-	ind=selector(probs)
+	ind=selector(probs,self.ssp.rng)
 	##print 'check selector',ind
 	info='coil'
 	flags=['coil','incr','decr','split','del','H2G','C2G']
@@ -1092,25 +1337,32 @@ class SSopt(GenericIndividual):
     def _anal_segments(self,other):
 	self.segments.comparedis(other.segments)
 
-    def initialize_random(self,envi=None):
+    def initialize_random(self,envi=None,calc=True):
 	pri=self.ssp.ss8priors
 	ss3s='HSC'
 	allss8='HGIE-TSB'
 	ss8to3ind={'H':0,'G':0,'I':0,'E':1,'-':2,'T':2,'S':2,'B':2}
-	ss8ind=[fastselector(hstack(([0],pri[:,n]))) for n in range(len(pri[0]))]
+	ss8ind=[fastselector(hstack(([0],pri[:,n])),rng=self.ssp.rng) for n in range(len(pri[0]))]
 	ss8=[allss8[i] for i in ss8ind]
 	ss3=[ss3s[ss8to3ind[s8]] for s8 in ss8]
 	if debug:print 'ss8rand:',''.join(ss8)
 	if debug:print 'ss3rand:',''.join(ss3)
 	new=SSopt(self.ssp,ss8,ss3)
-	new.backcalcbothPCs()
-	new.calcpostlik()
-	new.init_segments() #or consider the energy is OK before initializing segments?
-  	ch3,ch8=new.segments.remedy_disallowed()
+	#calc=False returns the raw draw, see SOPopulation.fill_from_random
+	if calc:new.finalize_random()
 	##q8,q3=new.evaluate()
 	##print 'ener',new.energy,q8,q3
 	return new
 
+    def finalize_random(self,calc=True,remedy=True):
+	if calc:
+	  self.backcalcbothPCs()
+	  self.calcpostlik()
+	if remedy:
+	  self.init_segments() #or consider the energy is OK before initializing segments?
+	  ch3,ch8=self.segments.remedy_disallowed()
+	self.s8i=self.ssp.encode_s8(self.s8)
+
     def init_from_genestr(self,s8):#TODO: update
 	ssp=None;s3=None
 	return SSopt(ssp,s8,s3)
@@ -1121,6 +1373,18 @@ class SSopt(GenericIndividual):
     def getid(self):
 	return ''.join(self.s8)
 
+    def get_hash(self):
+	return self.ssp.hash_s8(self.ssp.encode_s8(self.s8))
+
+    def get_mutation_hash(self,I,ss8):
+	#hash of the individual after writing ss8 at I, updated from self.zhash
+	zkeys=self.ssp.zkeys
+	s8=self.s8
+	h=self.zhash
+	for n in range(I,I+len(ss8)):
+	  h^=zkeys[n][s8[n]]^zkeys[n][ss8[n-I]]
+	return h
+
     def __str__(self):
 	return self.getid()
 
@@ -1128,7 +1392,7 @@ class SSopt(GenericIndividual):
 	M=len(self.s8)
 	both=self,other
 	##inds=numpy.random.random_integers(0,1,M)
-	inds=choose_random_consecutive(M,p=0.2)
+	inds=choose_random_consecutive(M,p=0.2,rng=self.ssp.rng)
 	newss8=[both[inds[i]].s8[i] for i in range(M)]
 	newopt=SSopt(self.ssp,newss8)
 	#might need to remedy newopt before returning?
@@ -1158,9 +1422,11 @@ class SSopt(GenericIndividual):
 	allss8='HGIE-TSB'
 	s8=self.s8
 	M=len(s8)
-	if statlen==None:statlen=len(popul)
-	A=[[ssopt.s8[i] for ssopt in popul[:statlen]] for i in range(M)]
-	C=array([[A[i].count(s) for s in allss8] for i in range(M)])*1.0/statlen
+	if statlen==None and isinstance(popul,SOPopulation):C=popul.class_counts()*1.0/len(popul)
+	else:
+	  if statlen==None:statlen=len(popul)
+	  S8I=array([self.ssp.encode_s8(ssopt.s8) for ssopt in popul[:statlen]])
+	  C=(S8I[:,:,newaxis]==arange(8)).sum(axis=0)*1.0/statlen
 	entrs=[shannon(C[i]) for i in range(M)]
 	spread=exp(-average(entrs))
         ##visprobs(C.transpose())
@@ -1202,52 +1468,63 @@ class Segments8(dict):
             self.segm.append([s3i,previ])
 
 
-class Segments(dict):
+class Segments:
+    #runs of equal 3-state class in s3, kept as parallel arrays ordered by position:
+    #starts, lens and cls (index into 'HSC') - every change of s3 goes through assign
 
-    def __init__(self,s8=None,s3=None):
-       dict.__init__(self)
-       if s8<>None:
-	self.s8=s8
-	self.s3=s3
-	self['H']={}
-	self['S']={}
-	self['C']={}
-	p3=None
-	previ=0
-	sl=1
-	self.segm=[]
-	self._ar=zeros(len(s3),dtype=int)
-	for i,s3i in enumerate(s3):
-	  if s3i==p3:sl+=1
-	  elif p3!=None:
-	    self[p3][previ]=sl
-	    self._ar[previ:previ+sl]=len(self.segm)
-	    self.segm.append([p3,previ])
-	    #reinitialize segment length and previ
-	    sl=1
-	    previ=i
-	  p3=s3i
-	if True: #handle end
-	    self[p3][previ]=sl
-	    self._ar[previ:previ+sl]=len(self.segm)
-	    self.segm.append([p3,previ])
-	if debug:print self.segm
-	##print list(self._ar)
-	if debug:print self
+    def __init__(self,s8=None,s3=None,rng=numpy.random):
+	self.rng=rng
+	if s8<>None:
+	  self.s8=s8
+	  self.s3=s3
+	  codes=S3LUT[fromstring(''.join(s3),dtype=uint8)]
+	  self.starts=concatenate(([0],flatnonzero(codes[1:]<>codes[:-1])+1))
+	  self.lens=diff(append(self.starts,len(s3)))
+	  self.cls=codes[self.starts]
+	  if debug:print self
 
     def get_clone(self):
-	new=Segments()
-	for ss in 'HSC':
-	  new[ss]=self[ss].copy()
+	new=Segments(rng=self.rng)
 	new.s8=self.s8[:]
 	new.s3=self.s3[:]
-	new.segm=[lst[:] for lst in self.segm]
-	new._ar=self._ar.copy()
+	new.starts=self.starts.copy()
+	new.lens=self.lens.copy()
+	new.cls=self.cls.copy()
 	return new
 
+    def run_at(self,i):
+	#index of the run containing residue i
+	return self.starts.searchsorted(i,'right')-1
+
+    def runs(self,ss):
+	#indices of the runs of class ss
+	return flatnonzero(self.cls=='HSC'.index(ss))
+
+    def elem(self,r):
+	return int(self.starts[r]),int(self.lens[r])
+
+    def assign(self,a,b,ss):
+	#sets s3[a:b] to ss and rebuilds the runs from the one holding a-1 to the one holding b
+	if b<=a:return
+	n=len(self.s3)
+	self.s3[a:b]=[ss]*(b-a)
+	r0=self.run_at(max(a-1,0))
+	r1=self.run_at(min(b,n-1))
+	end=self.starts[r1]+self.lens[r1]
+	pieces=[(self.starts[r0],a,self.cls[r0]),(a,b,'HSC'.index(ss)),(b,end,self.cls[r1])]
+	starts=[];ends=[];cls=[]
+	for p0,p1,c in pieces:
+	  if p1<=p0:continue
+	  if cls and cls[-1]==c:ends[-1]=p1
+	  else:
+	    starts.append(p0);ends.append(p1);cls.append(c)
+	self.starts=concatenate((self.starts[:r0],starts,self.starts[r1+1:])).astype(int)
+	self.lens=concatenate((self.lens[:r0],array(ends)-starts,self.lens[r1+1:])).astype(int)
+	self.cls=concatenate((self.cls[:r0],cls,self.cls[r1+1:])).astype(int8)
+
     def modifys8(self,probs,i,changes8):
 	coils='-TSB'
-	prob=rand()
+	prob=self.rng.random_sample()
 	cum=0
 	for j,probj in enumerate(probs):
 	  cum+=probj
@@ -1273,7 +1550,7 @@ subs={('H',1):(0.3,0.45,0.2,0.05),('H',2):(0.2,0.65,0.1,0.05),('S',1):(0.4,0.15,
 	  ss,i,sl=dis
 	  if ss in 'HS':
 	    pdel,pext=stoch[(ss,sl)]
-	    prob=rand()
+	    prob=self.rng.random_sample()
 	    if prob<pdel:
 	      if debug:print 'remedying by delete',ss,i,sl
 	      self.delete_segment(i,ss,'C')
@@ -1295,7 +1572,7 @@ subs={('H',1):(0.3,0.45,0.2,0.05),('H',2):(0.2,0.65,0.1,0.05),('S',1):(0.4,0.15,
 	      elif i==0:delta=1
 	      elif ssp==None:delta=1
 	      else:
-		delta=1-2*int(rand()*2) #random direction: 1 or -1
+		delta=1-2*int(self.rng.random_sample()*2) #random direction: 1 or -1
 	      if debug:print 'remedying by increment',ss,i,delta,ssp,sss
 	      self.increment_segment(i,ss,delta)
 	      s8id={'H':'H','S':'E'}[ss]
@@ -1322,198 +1599,54 @@ subs={('H',1):(0.3,0.45,0.2,0.05),('H',2):(0.2,0.65,0.1,0.05),('S',1):(0.4,0.15,
 
     def _validate_defs(self):
 	   s30=''.join(self.s3)
-	   ##print s30
-	   s3d=self.get_s3_from_dict()
-	   s3s=self.get_s3_from_segm()
-	   s3a=self.get_s3_from_ar()
+	   s3r=self.get_s3_from_runs()
 	   conv8to3={'G':'H', 'H':'H', 'I':'H', 'E':'S', 'B':'C','T':'C', 'S':'C', '-':'C','U':'U'}
 	   s3from8=''.join([conv8to3[x] for x in self.s8])
-	   ##iden=s30==s3d==s3s==s3a
-	   iden=s30==s3d==s3s==s3a==s3from8
+	   canonical=all(self.cls[1:]<>self.cls[:-1]) and self.lens.sum()==len(self.s3)
+	   iden=s30==s3r==s3from8 and canonical
 	   if not iden:
 		print 'warning: not identical'
-		print s30;print s3d;print s3s;print s3a;print s3from8
+		print s30;print s3r;print s3from8
 
     def delete_segment(self,i,ss,target):
-	#assert ss in 'HS' and target=='C'
-	si=self._ar[i]
-	s0c,i0c=self.segm[si]#center segment
-	sl=self[s0c][i0c]
-	for k in range(sl):self.s3[i+k]=target
-	if debug:
-	  print 'delete:',ss,i,sl,si,target,s0c,i0c
-	  print 'delete:',self.segm[si-1:si+2]
-	s0p=None;s0s='none'
-	if si>0:
-	  s0p,i0p=self.segm[si-1]#preceding  segment
-	  slp=self[s0p][i0p]
-	if len(self.segm)>si+1:
-	  s0s,i0s=self.segm[si+1]#subsequent segment
-	  try:sls=self[s0s][i0s]
-	  except KeyError:
-	    print 'this is crashing!!...'
-	    print ''.join(self.s8)
-	    print ''.join(self.s3)
-	  sls=self[s0s][i0s]
-	##print ss,i,sl,s0p,i0p,slp,s0s,i0s,sls,self.segm[si-1:si+2]
-	if s0p==s0s:
-	  if debug:print 'both are coil probably',s0p,s0s
-	  if s0p!=target:
-	    if debug:print 'Warning: sandwiched between non-targets (calling modify and incr)',s0p,target
-	    if debug:print ''.join(self.s8)
-	    if debug:print ''.join(self.s3)
-	    self.modify_segment(i,ss,target)
-	    for k in range(sl-1):self.increment_segment(i,target,1)
-	  else:
-	    if debug:print 'preceding segment equals target',s0p,target,s0s
-	    self[ss].pop(i)
-	    self.segm.pop(si)
-	    self.segm.pop(si)#2nd pop -> two deleted
-	    self[s0s].pop(i0s)
-	    self[s0p][i0p]+=(sl+sls)
-	    self._ar[i:i+sl]-=1
-	    self._ar[i+sl:]-=2
-	    if debug:print 'result delete:',self.segm
-	elif s0p==target:##'C':
-	  self[ss].pop(i)
-	  self.segm.pop(si)
-	  if debug:print 'preceding coil segment extended right',i0p,sl
-	  self[s0p][i0p]+=sl
-	  self._ar[i:]-=1
-	elif s0s==target:##'C':
-	  self[ss].pop(i)
-	  self.segm.pop(si)
-	  if debug:print 'subsequent segment extended left and given new start index',i,sls,sl,s0s,i0s
-	  self[s0s].pop(i0s)#i0s==i+sl
-	  self[s0s][i]=sls+sl
-	  self.segm[si][1]-=sl # after first pop si is now for subsequent segment!
-	  #was: self._ar[i+1:]-=1
-	  self._ar[i+sl:]-=1
-	else:
-	  if debug:print 'nothing special',s0p,s0s,target,sl#below OK???
-	  self[ss].pop(i)
-	  self[target][i]=sl
-	  self.segm[si][0]=target
-
-
-    def decrement_segment_end(self,i,ss,si):
-	self.s3[-1]='C'
-	self[ss][i]-=1
-	end=len(self._ar)-1
-	self['C'][end]=1
-	self.segm.append(['C',end])
-	self._ar[-1]+=1
-
-    def decrement_segment_start(self,i,ss):
-	self.s3[0]='C'
-	sl=self[ss].pop(0)
-	self[ss][i+1]=sl-1
-	self['C'][0]=1
-	self.segm.insert(0,['C',0])
-	self.segm[1][1]=1#added newly
-	self._ar[1:]+=1
+	#i is the start of the run
+	i0c,sl=self.elem(self.run_at(i))
+	if debug:print 'delete:',ss,i,sl,target
+	self.assign(i0c,i0c+sl,target)
 
     def decrement_segment(self,i,ss,delta):
-	si=self._ar[i]
-	s0c,i0c=self.segm[si]#center segment
+	#the neighbouring run (coil at the chain ends) takes over abs(delta) residues of the run at i
+	r=self.run_at(i)
+	i0c,sl=self.elem(r)
 	if delta<0:
-	 if si>0:
-	  s0p,i0p=self.segm[si-1]#preceding  segment
-	  self.increment_segment(i0p,s0p,-delta)
-	 else:
-	  if debug:print 'changing start...',i,ss,si,delta
-	  self.decrement_segment_start(i,s0c)
+	  if r>0:target='HSC'[self.cls[r-1]]
+	  else:target='C'
+	  self.assign(i0c,i0c+min(-delta,sl),target)
 	elif delta>0:
-	 if len(self.segm)>si+1:
-	  s0s,i0s=self.segm[si+1]#subsequent segment
-	  self.increment_segment(i0s,s0s,-delta)
-	 else:
-	  if debug:print 'changing end...',i,ss,si,delta
-	  self.decrement_segment_end(i,s0c,si)
+	  if r<len(self.starts)-1:target='HSC'[self.cls[r+1]]
+	  else:target='C'
+	  self.assign(i0c+sl-min(delta,sl),i0c+sl,target)
 
     def increment_segment(self,i,ss,delta):
-	##sl=self[ss][i]
-	si=self._ar[i]
-	s0c,i0c=self.segm[si]#center segment
-	sl=self[s0c][i0c]
-	if debug:print 'increment:',ss,i,sl,si
-	if debug:print 'increment:',self.segm[si-1:si+2]
-	#NOTE: if abs(delta)>1:increment can exceed one more segment and this is not implemented
-	if delta>0:
-	  s0s,i0s=self.segm[si+1]#subsequent segment
-	  sls=self[s0s][i0s]
-	  if debug:print 'incrementing to right',i,delta,ss,self.segm[si+1]
-	  if sls<=delta:
-	    if debug:print 'increment exceeds right segment',sls,delta,self.segm[si+1]
-	    self.delete_segment(i0s,s0s,s0c)
-	  else:
-	    self.s3[i0s:i0s+delta]=ss#change to target
-	    self[ss][i0c]+=delta #extend center segment length
-	    self[s0s].pop(i0s)
-	    self[s0s][i0s+delta]=sls-delta #decrease subs segm len and move to right
-	    self.segm[si+1][1]+=delta
-	    self._ar[i0s:i0s+delta]-=1
-	elif delta<0:
-	  s0p,i0p=self.segm[si-1]#preceding segment
-	  slp=self[s0p][i0p]
-	  if debug:print 'incrementing to left',i,delta,ss,self.segm[si-1]
-	  if slp<=abs(delta):
-	    if debug:print 'increment exceeds left segment',slp,delta,self.segm[si-1]
-	    self.delete_segment(i0p,s0p,s0c)
-	  else:
-	    self.s3[i0c+delta:i0c]=ss#change to target
-	    self[ss].pop(i0c)
-	    self[ss][i0c+delta]=sl-delta #extend center segment length (delta<0) and move to left
-	    self[s0p][i0p]=slp+delta #decrease prev segm len
-	    self.segm[si][1]+=delta
-	    self._ar[i0c+delta:i0c]+=1
+	#the run at i takes over abs(delta) residues of its neighbour (at most the whole neighbour)
+	r=self.run_at(i)
+	i0c,sl=self.elem(r)
+	if debug:print 'increment:',ss,i,sl,r
+	if delta>0 and r<len(self.starts)-1:
+	  self.assign(i0c+sl,i0c+sl+min(delta,self.lens[r+1]),ss)
+	elif delta<0 and r>0:
+	  self.assign(i0c-min(-delta,self.lens[r-1]),i0c,ss)
 
     def modify_segment(self,i,ss,target):##,delta):
-	si=self._ar[i]
-	s0c,i0c=self.segm[si]#center segment
-	sl=self[s0c][i0c]
-	self.s3[i]=target#easy!
-	if debug:print 'modify:',ss,i,sl,si
-	if i0c<i<i0c+sl-1:
-	  if debug:print 'middle of segment modification',i0c,i,i0c+sl,ss,target
-	  self[s0c][i0c]=i-i0c
-	  self[target][i]=1
-	  self[s0c][i+1]=i0c+sl-i-1
-	  self.segm.insert(si+1,[target,i])
-	  self.segm.insert(si+2,[s0c,i+1])
-	  self._ar[i]+=1
-	  self._ar[i+1:]+=2
-	  #note that the sum of segment lengths is preserved == sl
-	if i0c==i:
-	  #assuming s0p!=target
-	  if debug:print 'left-side segment modification',i0c,ss,target,s0c,si,sl
-	  ##s0p,i0p=self.segm[si-1]#preceding segment
-	  ##if s0p==target:print 'WARNING: prev ss equals target',target
-	  self[s0c].pop(i)
-	  self[target][i]=1
-	  self.segm.insert(si+1,[target,i])
-	  if sl>1:#TJEK OK?!....
-	    self[s0c][i+1]=sl-1
-	    self.segm.insert(si+2,[s0c,i+1])
-	    self._ar[i+1:]+=1
-	  self.segm.pop(si)
-	##if i==i0c+sl-1:
-	elif i==i0c+sl-1:
-	  if debug:print 'right-side segment modification',i,ss,target
-	  ##if s0s==target:print 'WARNING: prev ss equals target',target
-	  self[s0c][i0c]=sl-1
-	  self[target][i]=1
-	  self.segm.insert(si+1,[target,i])
-	  self._ar[i]+=1
-	  self._ar[i+1:]+=1
-	  #note that the sum of segment lengths is preserved == sl
+	if debug:print 'modify:',ss,i,target
+	self.assign(i,i+1,target)
 
     def choose_coil_point(self):
-	coils=self['C'].items()
+	coils=self.runs('C')
 	if len(coils)==0:return None,None
-	n=randint(0,len(coils)-1)
-	i0,sl=coils[n]
-	j=randint(0,sl-1)
+	n=self.rng.randint(len(coils))
+	i0,sl=self.elem(coils[n])
+	j=self.rng.randint(sl)
 	i=i0+j
 	s8i=self.s8[i]
 	coilvals='-TSB'
@@ -1522,23 +1655,28 @@ subs={('H',1):(0.3,0.45,0.2,0.05),('H',2):(0.2,0.65,0.1,0.05),('S',1):(0.4,0.15,
 	if (i>0 and self.s8[i-1]=='E' or i<len(self.s8)-1 and self.s8[i+1]=='E'):
 	  probs=(0.4,0.3,0.3)#bridge should not extend strand?...
 	while s8val==s8i:
-	  ind=selector(probs)
+	  ind=selector(probs,self.rng)
 	  s8val=coilvals[ind]
 	return i,s8val
 
+    def choose_ss(self):
+	#H or S at random among the classes that have runs (None if neither has)
+	hs=self.runs('H')
+	es=self.runs('S')
+	if len(hs)==0 and len(es)==0:return None,None
+	if len(hs)==0 and len(es)>0:return 'S',es
+	elif len(hs)>0 and len(es)==0:return 'H',hs
+	if self.rng.randint(2)==0:return 'H',hs
+	return 'S',es
+
     def choose_incr_point(self):
-	hs=self['H'].items()
-	es=self['S'].items()
-	if len(hs)==0 and len(es)==0:return None,None,None
-	if len(hs)==0 and len(es)>0:ssm='S'
-	elif len(hs)>0 and len(es)==0:ssm='H'
-	else:ssm=randchoice('HS')
-	elems=self[ssm].items()
-	n=randint(0,len(elems)-1)
-	i0,sl=elems[n]
+	ssm,elems=self.choose_ss()
+	if ssm==None:return None,None,None
+	n=self.rng.randint(len(elems))
+	i0,sl=self.elem(elems[n])
 	if i0==0:direc='R'
-	elif int(self._ar[i0])==len(self.segm)-1:direc='L'
-	else:direc=randchoice('LR')
+	elif elems[n]==len(self.starts)-1:direc='L'
+	else:direc='LR'[self.rng.randint(2)]
 	if direc=='R':
 	  i=i0+sl
 	  refi=i0+sl-1
@@ -1550,42 +1688,31 @@ subs={('H',1):(0.3,0.45,0.2,0.05),('H',2):(0.2,0.65,0.1,0.05),('S',1):(0.4,0.15,
 	return i,self.s8[refi],(i0,ssm,direc)
 
     def choose_delete_elem(self):
-	hs=self['H'].items()
-	es=self['S'].items()
-	if len(hs)==0 and len(es)==0:return None,None,None
-	if len(hs)==0 and len(es)>0:ssm='S'
-	elif len(hs)>0 and len(es)==0:ssm='H'
-	else:ssm=randchoice('HS')
-	elems=self[ssm].items()
-	minelem=min(elems,key=lambda x:x[1])
+	ssm,elems=self.choose_ss()
+	if ssm==None:return None,None,None
 	minsl={'S':2,'H':4}#temporarily allow 3-long alpha-helix
-	if minelem[1]>minsl[ssm]+2:return None,None,None #unlikely to benefit from delete...
-	i0,sl=minelem
+	r=elems[self.lens[elems].argmin()]
+	i0,sl=self.elem(r)
+	if sl>minsl[ssm]+2:return None,None,None #unlikely to benefit from delete...
 	coils='-TSB'
 	subs={'H':(0.5,0.27,0.2,0.03),'S':(0.5,0.15,0.2,0.15)}
 	target=''
 	for _ in range(sl):
-	  ind=selector(subs[ssm])
+	  ind=selector(subs[ssm],self.rng)
 	  target+=coils[ind]
 	return i0,target,ssm
 
     def choose_decr_point(self,allowsmall=False):
-	hs=self['H'].items()
-	es=self['S'].items()
-	if len(hs)==0 and len(es)==0:return None,None,None
-	if len(hs)==0 and len(es)>0:ssm='S'
-	elif len(hs)>0 and len(es)==0:ssm='H'
-	else:ssm=randchoice('HS')
-	elems=self[ssm].items()
-	maxelem=max(elems,key=lambda x:x[1])
+	ssm,elems=self.choose_ss()
+	if ssm==None:return None,None,None
 	minsl={'S':2,'H':4}#temporarily allow 3-long alpha-helix
-	if maxelem[1]<minsl[ssm] and not allowsmall:return None,None,None
-	sl=0
-	while sl<minsl[ssm]:
-	  n=randint(0,len(elems)-1)
-	  i0,sl=elems[n]
-	  if allowsmall:break
-	direc=randchoice('LR')
+	if not allowsmall:
+	  #uniform among the runs that are long enough
+	  elems=elems[self.lens[elems]>=minsl[ssm]]
+	  if len(elems)==0:return None,None,None
+	n=self.rng.randint(len(elems))
+	i0,sl=self.elem(elems[n])
+	direc='LR'[self.rng.randint(2)]
 	if direc=='R':
 	  i=i0+sl-1
 	  bi=i+1
@@ -1598,7 +1725,7 @@ subs={('H',1):(0.3,0.45,0.2,0.05),('H',2):(0.2,0.65,0.1,0.05),('S',1):(0.4,0.15,
 	if bases3=='C':
 	  coils='-TSB'
 	  subs={'H':(0.5,0.27,0.2,0.03),'S':(0.65,0.15,0.2,0.0)}
-	  ind=selector(subs[ssm])
+	  ind=selector(subs[ssm],self.rng)
 	  targets8=coils[ind]
 	else:
 	  targets8=d3to8[bases3]
@@ -1606,76 +1733,57 @@ subs={('H',1):(0.3,0.45,0.2,0.05),('H',2):(0.2,0.65,0.1,0.05),('S',1):(0.4,0.15,
 	return i,targets8,(i0,ssm,direc)
 
     def choose_split_point(self):
-	hs=self['H'].items()
-	es=self['S'].items()
 	minsl={'S':2,'H':3}
+	#runs that can be split leaving at least minsl on both sides
+	hs=self.runs('H');hs=hs[self.lens[hs]>minsl['H']*2]
+	es=self.runs('S');es=es[self.lens[es]>minsl['S']*2]
 	if len(hs)==0 and len(es)==0:return None,None,None
-	if len(hs)==0 and len(es)>0:ssm='S'
-	elif len(hs)>0 and len(es)==0:ssm='H'
-	else:
-	  smaxls=max([elem[1]-minsl['S']*2 for elem in self['S'].items()])
-	  hmaxls=max([elem[1]-minsl['H']*2 for elem in self['H'].items()])
-	  if smaxls<1 and hmaxls<1:return None,None,None
-	  elif smaxls>0 and hmaxls<1:
-	    ssm='S'
-	  elif hmaxls>0 and smaxls<1:
-	    ssm='H'
-	  else:
-	    ssm=randchoice('HS')
-	elems=self[ssm].items()
-	maxls=max([elem[1]-minsl[ssm]*2 for elem in elems])
-	if maxls<1:return None,None,None
-	sl=0
-	while sl<minsl[ssm]*2+1:
-	  n=randint(0,len(elems)-1)
-	  i0,sl=elems[n]
-	  ##if allowsmall:break
-	j=randint(minsl[ssm],sl-minsl[ssm]-1)
+	elif len(hs)==0:ssm,elems='S',es
+	elif len(es)==0:ssm,elems='H',hs
+	elif self.rng.randint(2)==0:ssm,elems='H',hs
+	else:ssm,elems='S',es
+	n=self.rng.randint(len(elems))
+	i0,sl=self.elem(elems[n])
+	j=self.rng.randint(minsl[ssm],sl-minsl[ssm])
 	i=i0+j
 	coils='-TSB'
 	subs={'H':(0.27,0.5,0.2,0.03),'S':(0.65,0.15,0.2,0.0)}
-	ind=selector(subs[ssm])
+	ind=selector(subs[ssm],self.rng)
 	return i,coils[ind],ssm
 
     def choose_overwriteH2G(self):
-	hs=self['H'].items()
-	if len(hs)==0:return None,None,None
-	elems=self['H'].items()
-	minls=min([elem[1] for elem in elems])
-	if minls>4:
-	  n=randint(0,len(elems)-1)
-	  i0,sl=elems[n]
-	  direc=randchoice('LR')
+	elems=self.runs('H')
+	if len(elems)==0:return None,None,None
+	lens=self.lens[elems]
+	if lens.min()>4:
+	  n=self.rng.randint(len(elems))
+	  i0,sl=self.elem(elems[n])
+	  direc='LR'[self.rng.randint(2)]
 	  if direc=='L':
 	    i=i0
-	    gsl=[3,min(sl,4),min(sl,5)][selector((0.6,0.3,0.1))]
+	    gsl=[3,min(sl,4),min(sl,5)][selector((0.6,0.3,0.1),self.rng)]
 	    if not 'H' in self.s8[i:i+sl]:return None,None,None
 	  else:
 	    ##i=i0+sl-1
-	    gsl=[3,min(sl,4),min(sl,5)][selector((0.6,0.3,0.1))]
+	    gsl=[3,min(sl,4),min(sl,5)][selector((0.6,0.3,0.1),self.rng)]
 	    ##if not 'H' in self.s8[i-sl+1:i+1]:return None,None,None
 	    if not 'H' in self.s8[i0+sl-gsl:i0+sl]:return None,None,None
 	    i=i0+sl-gsl
 	else:
 	  direc='a'
-	  gsl=999
-	  while gsl>4:
-	    n=randint(0,len(elems)-1)
-	    i,gsl=elems[n]
+	  elems=elems[lens<=4]
+	  n=self.rng.randint(len(elems))
+	  i,gsl=self.elem(elems[n])
 	  if not 'H' in self.s8[i:i+gsl]:return None,None,None
 	return i,'G'*gsl,(gsl,direc)
 
     def choose_overwriteC2G(self):
-	cs=self['C'].items()
-	if len(cs)==0:return None,None,None
-	elems=self['C'].items()
-	minls=min([elem[1] for elem in elems])
-	if minls<3:return None,None,None
-	sl=0
-	while sl<3:
-	  n=randint(0,len(elems)-1)
-	  i0,sl=elems[n]
-	j=randint(0,sl-3)
+	elems=self.runs('C')
+	if len(elems)==0:return None,None,None
+	if self.lens[elems].min()<3:return None,None,None
+	n=self.rng.randint(len(elems))
+	i0,sl=self.elem(elems[n])
+	j=self.rng.randint(sl-2)
 	i=i0+j
 	#NOTE: what if new GGG edges old helix?... -> extend
 	return i,'G'*3,sl
@@ -1727,51 +1835,27 @@ subs={('H',1):(0.3,0.45,0.2,0.05),('H',2):(0.2,0.65,0.1,0.05),('S',1):(0.4,0.15,
 	  for k in (1,2): self.increment_segment(i,'H',1)
 	if False:self._validate_defs()#TAKEBACK for debug!!
 
-    def get_s3_from_dict(self):
-	ds8=array(['u' for _ in range(len(self.s8))],dtype='|S1')
-	for ss in self:
-	  for i in self[ss]:
-	    sl=self[ss][i]
-	    ds8[i:i+sl]=ss
-	return ''.join(ds8)
-
-    def get_s3_from_segm(self):
-	segm=self.segm
-	ds8=array(['u' for _ in range(len(self.s8))],dtype='|S1')
-	s0s,i0s=segm[0] #just in case segm is length one
-	for si in range(len(segm)-1):
-	  s0,i0=segm[si]
-	  s0s,i0s=segm[si+1]
-	  ds8[i0:i0s]=s0
-	ds8[i0s:]=s0s#fix end
-	return ''.join(ds8)
-
-    def get_s3_from_ar(self):#but segm is also used once
-	ds8=array(['u' for _ in range(len(self.s8))],dtype='|S1')
-	sip=0;ip=0
-	for i,si in enumerate(self._ar):
-	  if si!=sip:
-	    ds8[ip:i]=self.segm[sip][0]
-	    sip=si;ip=i
-	ds8[ip:]=self.segm[-1][0]
-	return ''.join(ds8)
+    def get_s3_from_runs(self):
+	return ''.join(['HSC'[c]*l for c,l in zip(self.cls,self.lens)])
 
     def return_disallowed(self):
-	for i in self['H']:
-	  if self['H'][i]<3:return 'H',i,self['H'][i]#too short helix
-	for i in self['S']:
-	  if self['S'][i]<2:return 'S',i,1#too short strand - but might be OK to work with...
-	for i in self['H']:
-	   if self['H'][i]<4:
+	#the first disallowed element along the chain of the lowest category. Repairs change their neighbours,
+	#so this order matters: the former dict based version took them in hash order, which depended on the
+	#edit history, the position order is reproducible and the one of remedy_disallowed_batch
+	starts,lens=self.starts,self.lens
+	h=self.runs('H')
+	s=self.runs('S')
+	short=h[lens[h]<3]
+	if len(short)>0:return 'H',int(starts[short[0]]),int(lens[short[0]])#too short helix
+	short=s[lens[s]<2]
+	if len(short)>0:return 'S',int(starts[short[0]]),1#too short strand - but might be OK to work with...
+	for r in h[lens[h]<4]:
+	     i=starts[r]
 	     for k in range(3):
-		if self.s8[i+k]!='G': return 'G',i,3
-	   ##else:
-	for i in self['H']:
-	     sl=self['H'][i]
+		if self.s8[i+k]!='G': return 'G',int(i),3
+	for r in h:
+	     i,sl=self.elem(r)
 	     segstr=self.s8[i:i+sl]
-	     ##print i,sl,segstr
-	     ##for m in re.finditer(r"G+", segstr): 
-		##if m.end()-m.start()<3:return 'g',i+m.start(),m.end()-m.start()
 	     if 'G' in segstr:
 		#might be a too short G-segment within Helix
 		gi=segstr.index('G')
@@ -1782,14 +1866,11 @@ subs={('H',1):(0.3,0.45,0.2,0.05),('H',2):(0.2,0.65,0.1,0.05),('S',1):(0.4,0.15,
 	return None
 
     def get_disallowed(self):
-	sshort=[]
-	for i in self['S']:
-	  if self['S'][i]<2:sshort.append(i)
-	hshort=[]
-	gonly=[]
-	for i in self['H']:
-	  if self['H'][i]<3:hshort.append(i)
-	  elif self['H'][i]<4:gonly.append(i)
+	h=self.runs('H')
+	s=self.runs('S')
+	sshort=list(self.starts[s[self.lens[s]<2]])
+	hshort=list(self.starts[h[self.lens[h]<3]])
+	gonly=list(self.starts[h[self.lens[h]==3]])
 	return sshort,hshort,gonly
 
     def comparedis(self,other):
@@ -1800,6 +1881,97 @@ subs={('H',1):(0.3,0.45,0.2,0.05),('H',2):(0.2,0.65,0.1,0.05),('S',1):(0.4,0.15,
 	  ss8o=other.s8[i]
 	  if debug:print 'other short',lab[k],ss8o
 
+def find_disallowed_batch(S8):
+  #disallowed elements of a (K,numres) matrix of encoded s8 states, as in Segments.return_disallowed:
+  #category 0 too short H, 1 too short S, 2 three residue H that is not GGG, 3 G shorter than 3 starting
+  #a G stretch inside H. Returns row, run index, category, position and length of every element of the
+  #lowest category found in its row, ordered by position
+  K,N=S8.shape
+  S3=S3OF8[S8].ravel()
+  G=(S8==1).ravel()
+  brk=ones(K*N,dtype=bool)
+  brk[1:]=S3[1:]<>S3[:-1]
+  brk[::N]=True
+  starts=flatnonzero(brk)
+  lens=diff(append(starts,K*N))
+  cls=S3[starts]
+  cat=zeros(len(starts),dtype=int)+4
+  pos=starts.copy();sl=lens.copy()
+  #G stretches: the first one within an H run starts the run's G stretch (G only occurs in H runs)
+  gbrk=G.copy()
+  gbrk[1:]&=~(G[:-1]&~brk[1:])
+  gstarts=flatnonzero(gbrk)
+  gend=G.copy()
+  gend[:-1]&=~(G[1:]&~brk[1:])
+  glens=flatnonzero(gend)-gstarts+1
+  grun=starts.searchsorted(gstarts,'right')-1
+  first=flatnonzero(diff(append(-1,grun)))
+  first=first[glens[first]<3]
+  grun=grun[first]
+  cat[grun]=3;pos[grun]=gstarts[first];sl[grun]=glens[first]
+  cs=concatenate(([0],cumsum(G)))
+  three=(cls==0)&(lens==3)&(cs[starts+3*(lens==3)]-cs[starts]<3)
+  cat[three]=2;pos[three]=starts[three];sl[three]=3
+  cat[(cls==1)&(lens<2)]=1
+  hshort=(cls==0)&(lens<3)
+  cat[hshort]=0
+  pos[(cat<2)]=starts[(cat<2)];sl[(cat<2)]=lens[(cat<2)]
+  row=starts//N
+  low=minimum.reduceat(cat,row.searchsorted(arange(K)))
+  sel=flatnonzero((cat<4)&(cat==low[row]))
+  return row[sel],sel,cat[sel],pos[sel]%N,sl[sel]
+
+def remedy_disallowed_batch(S8,rng=numpy.random,stoch={('H',1):(0.6,0.4),('H',2):(0.1,0.9),('S',1):(0.6,0.4),('G',3):(0.0,1.0)},
+subs={('H',1):(0.3,0.45,0.2,0.05),('H',2):(0.2,0.65,0.1,0.05),('S',1):(0.4,0.15,0.2,0.25)}):
+  #Segments.remedy_disallowed for all rows of a (K,numres) matrix of encoded s8 states at once (in place).
+  #Each pass repairs in every row a leading run of the elements from find_disallowed_batch that the single
+  #version would repair one after the other: G/g repairs never interact, and a too short H or S may follow
+  #one at least 3 runs before it whose repair leaves no disallowed element of its category
+  K,N=S8.shape
+  rows=arange(K)
+  keys=[('H',1),('H',2),('S',1)]
+  pdel=array([stoch[k][0] for k in keys])
+  cumsubs=cumsum([subs[k] for k in keys],axis=1)
+  while len(rows)>0:
+    row,run,cat,pos,sl=find_disallowed_batch(S8[rows])
+    r=rows[row]
+    if len(r)==0:break
+    #too short helix G-only, too short G within H
+    ss8=where(cat==2,1,0)
+    for m in range(3):
+      d=(cat>1)&(m<sl)
+      S8[r[d],pos[d]+m]=ss8[d]
+    hs=cat<2
+    if any(hs):
+      k=where(cat==0,sl-1,2)
+      dele=rng.random_sample(len(r))<pdel[k]
+      #extend into a neighbour, preferably a coil one
+      ssp=where(pos>0,S3OF8[S8[r,maximum(pos-1,0)]],-1)
+      sss=where(pos+sl<N,S3OF8[S8[r,minimum(pos+sl,N-1)]],-1)
+      delta=1-2*(rng.random_sample(len(r))>=0.5)
+      delta[pos==0]=1
+      delta[sss==-1]=-1
+      delta[(sss==2)&(ssp<>2)]=1
+      delta[(ssp==2)&(sss<>2)]=-1
+      #repairs that leave no element behind: delete, or extend into coil unless a single H is left too short
+      quiet=dele|((where(delta<0,ssp,sss)==2)&((cat==1)|(sl==2)))
+      #the leading elements of each row that the single version repairs in this order
+      follows=zeros(len(r),dtype=bool)
+      follows[1:]=(row[1:]==row[:-1])&(run[1:]-run[:-1]>=3)&quiet[:-1]
+      newrow=append(True,row[1:]<>row[:-1])
+      stop=cumsum(~follows)
+      ok=stop==stop[flatnonzero(newrow)][cumsum(newrow)-1]
+      hs&=ok
+      #delete: every residue becomes coil drawn from subs
+      for m in range(2):
+	d=flatnonzero(hs&dele&(m<sl))
+	coil=(rng.random_sample(len(d))[:,None]>=cumsubs[k[d]]).sum(axis=1)
+	S8[r[d],pos[d]+m]=4+minimum(coil,3)
+      e=flatnonzero(hs&~dele)
+      S8[r[e],where(delta[e]<0,pos[e]-1,pos[e]+sl[e])]=where(cat[e]==0,0,3)
+    rows=unique(r)
+  return S8
+
 def getCSIpreds(ssp,bmrid):
   buf=initfil2('csi3output/bmr%s.out'%bmrid)[1:]
   sub3={'C':'C','H':'H','B':'S'}
@@ -1829,6 +2001,39 @@ def get_score(pr,p0):
 
 class SOPopulation(Population):
 
+    counts=None#per-residue class counts (numres,8), built on first use
+    fracs=None#class probabilities (numres,8) replacing the counts in summarize_as_probs
+
+    def class_counts(self):
+	#kept up to date by append, pop and item assignment
+	if self.counts is None:
+	  S8I=array([obj.ssp.encode_s8(obj.s8) for obj in self])
+	  self.counts=(S8I[:,:,newaxis]==arange(8)).sum(axis=0)
+	return self.counts
+
+    def append(self,obj):
+	list.append(self,obj)
+	if self.counts is not None:
+	  s8i=obj.ssp.encode_s8(obj.s8)
+	  self.counts[arange(len(s8i)),s8i]+=1
+
+    def pop(self,i=-1):
+	obj=list.pop(self,i)
+	if self.counts is not None:
+	  s8i=obj.ssp.encode_s8(obj.s8)
+	  self.counts[arange(len(s8i)),s8i]-=1
+	return obj
+
+    def __setitem__(self,i,obj):
+	if self.counts is not None:
+	  #only the residues where the two individuals differ
+	  old=self[i].ssp.encode_s8(self[i].s8)
+	  new=obj.ssp.encode_s8(obj.s8)
+	  d=flatnonzero(old<>new)
+	  self.counts[d,old[d]]-=1
+	  self.counts[d,new[d]]+=1
+	list.__setitem__(self,i,obj)
+
     def derive_stats(self,cnt):
 	eners=array([obj.energy for obj in self])
 	##genestd=self.getspjread()
@@ -1836,6 +2041,20 @@ class SOPopulation(Population):
 	self.trueprobs=trueprobs
 	print 'average energy: %9.3f %9.3f %8.4f %8.5f %7.4f %4d %3d'%(average(eners),min(eners),std(eners),trueprobs,genestd,cnt,len(eners)),
 	print self[0].getid()
+	return min(eners),fracs
+
+    def has_converged(self,history,convwin,convtol):
+	#converged when the best energy has not improved and the per-residue class
+	#frequencies have moved less than convtol (mean total variation) over the last convwin checks.
+	#Off by default (convwin=None): within the usual budget (limitfac 75) the best energy still improves,
+	#e.g. convwin=10 stops runs only with budgets several times larger
+	if convwin==None or len(history)<=convwin:return False
+	ener0,fracs0=history[-convwin-1]
+	ener1,fracs1=history[-1]
+	if ener1<ener0:return False
+	change=average(0.5*sum(abs(fracs1-fracs0),axis=1))
+	if debug:print 'convergence check:',change,convtol
+	return change<convtol
 
     def summarize_as_probs(self,dovis=True):
 	allss8='HGIE-TSB'
@@ -1845,12 +2064,13 @@ class SOPopulation(Population):
 	obj=self[0]
         segm8=Segments8(obj.s8)
         visSS8max(segm8,obj.ssp.mini,obj.ssp.maxi)
-	trueprobs,genestd,fracs=obj.get_class_stats(self)
+	if self.fracs is None:trueprobs,genestd,fracs=obj.get_class_stats(self)
+	else:fracs=self.fracs
 	probs=fracs##.transpose()
 	##ANS=avenscorr(obj.ssp.params,fracs.transpose(),len(obj.ssp.seq))#-4)
 	##ss8priors,post0=guesss8s(obj.ssp.params,obj.ssp.resis,obj.ssp.pcsobsref,fracs.transpose(),obj.ssp.ssigs)
 	##post=post0/sum(post0,axis=0)
-	ru=list(obj.ssp.ru)
+	obsslot=obj.ssp.obsslot
 	allconfdigits='';allconfdigits3='';matches='';outdata=[];alls8maxs='';alls3maxs=''
 	pid=obj.ssp.bmrid
 	outfiles=[open(fname+'_'+pid+'.txt','w') for fname in ['probs8','probs3','max8','max3','short8','short3']]
@@ -1875,9 +2095,9 @@ class SOPopulation(Population):
 	  outfiles[0].write(' %6.4f %6.4f %6.4f %6.4f %6.4f %6.4f %6.4f %6.4f\n'%tuple(pri))
 	  pri3=[sum([pri[j] for j in indss3[k]]) for k in 'HSC']
 	  outfiles[1].write(' %6.4f %6.4f %6.4f\n'%tuple(pri3))
-	  if i in ru:
+	  if obsslot[i]>=0:
 	    ##pti=pot[ru.index(i)]
-	    p0i=obj.post0ref[ru.index(i)]
+	    p0i=obj.post0ref[obsslot[i]]
 	  else:
 	    ##pti=[-9]*8
 	    p0i=0.000
@@ -1934,69 +2154,130 @@ class SOPopulation(Population):
 	  outfiles[n].close()
 	return testdata
 
+    def fill_from_random(self,num,cls):
+	objs=[cls.initialize_random(self.envi,calc=False) for i in range(num)]
+	self.calculate_fitness_batch(objs)
+	self.remedy_batch(objs)
+	for obj in objs:
+	  obj.finalize_random(calc=False,remedy=False)
+	  self.append(obj)
+
+    def remedy_batch(self,objs):
+	#repairs the disallowed elements of a list of individuals together, see remedy_disallowed_batch.
+	#Pays off for random draws, which have many such elements; the few crossover children of a breed
+	#mini-batch are quicker to repair one by one in propose_child
+	if len(objs)==0:return
+	ssp=objs[0].ssp
+	S8I=array([ssp.encode_s8(obj.s8) for obj in objs])
+	remedy_disallowed_batch(S8I,ssp.rng)
+	s8s=array(list('HGIE-TSB'))[S8I]
+	s3s=array(list('HSC'))[S3OF8[S8I]]
+	for k,obj in enumerate(objs):
+	  obj.s8[:]=s8s[k].tolist()
+	  obj.s3[:]=s3s[k].tolist()
+	  obj.s8i=S8I[k]
+	  obj.init_segments()
+
+    def calculate_fitness_batch(self,objs):
+	#scores a list of individuals in one pass - same result as obj.calculate_fitness() for each
+	if len(objs)==0:return
+	ssp=objs[0].ssp
+	S8I=array([ssp.encode_s8(obj.s8) for obj in objs])
+	S3I=array([ssp.encode_s3(obj.s3) for obj in objs])
+	eners,S9,post0=ssp.calc_energies(S8I,S3I,full=True)
+	for k,obj in enumerate(objs):
+	  obj.s8i=S8I[k]
+	  obj.S9s=S9[k]
+	  obj.backpcs=sum(S9[k],axis=1)
+	  obj.post0ref=post0[k]
+	  obj.score=-eners[k]
+	  obj.energy=eners[k]
+
+    def mergewith(self,other):
+	incommon=0
+	seen=set(obj.get_hash() for obj in self)
+	for obj in other:
+	  id=obj.get_hash()
+	  if not id in seen:
+	    self.append(obj)
+	    seen.add(id)
+	  else:incommon+=1
+	print 'individuals in common:',incommon
+
+    def propose_child(self,selrats,probs,size):
+	flags=['coil','incr','decr','split','del','H2G','C2G']
+	#find mates (only one in case of mutation)
+	i=self.selectNormal(selrats[0],size)
+	obji=self[i]
+	#find breeding operation - and breed mates
+	rn=self.rng.uniform(0.0,1.0)
+	psum=0.0
+	for j in range(len(probs)):
+	  psum+=probs[j]
+	  if rn<psum:break
+	child=None;mutdata=None
+	if j==0:
+	  #---mutation---
+	  ind,I,ss8,info=obji.choose_mutation()##verb=False)
+	  locpost,locdiff=obji.get_diff_mutation(I,ss8)
+	  if debug:print 'mutation:',ind,I,ss8,info,flags[ind]
+	  childid=obji.get_mutation_hash(I,ss8)
+	  #keep the local results - obji may receive other proposals in the same batch
+	  mutdata=ind,I,ss8,info,-locdiff,obji.mutdelta
+	  repi=i
+	elif j==1:
+	  #---crossover---(reproduce)
+	  onum=i
+	  while onum==i:onum=self.selectNormal(selrats[1],size)
+	  objo=self[onum]
+	  child=obji.crossover(objo)
+	  if debug:print 'crossover(bi):',child
+	  if obji.energy>=objo.energy:repi=i
+	  else:repi=onum
+	elif j==2:
+	  #---multicrossover---(non-biological reproduction)
+	  repi=-1;objo=self[-1]
+	  child=objo.multicrossover(self,selrats[1],size)
+	  if debug:print 'multicrossover:',child
+	if j>0:
+	  child.init_segments()
+	  ch3,ch8=child.segments.remedy_disallowed()
+	  childid=child.get_hash()
+	return j,obji,self[repi],child,childid,mutdata
+
     def breed(self,limitfac=100.0,expandfac=1.0,temperature=0.3,probs=(0.6,0.3,0.1),
-	      growthmode='replace',selrats=(0.5,2.0),sortnum=10):
+	      growthmode='replace',selrats=(0.5,2.0),sortnum=10,batchsize=8,convwin=None,convtol=0.02):
 	children=SOPopulation()
 	cnt=0;numrep=0
 	size=len(self)#or maybe place inside loop?
-	dct={}
 	flags=['coil','incr','decr','split','del','H2G','C2G']
-	self.iddct=dct
-	for obj in self:dct[obj.getid()]=obj
-	print 'breeding population',size,limitfac,temperature,growthmode
-	while cnt<size*limitfac and len(children)<size*expandfac:
-	  #find mates (only one in case of mutation)
-	  i=self.selectNormal(selrats[0],size)
-	  obji=self[i]
-	  ##print 'breeding object',i##,onum
-	  #find breeding operation - and breed mates
-	  rn=uniform(0.0,1.0)
-	  psum=0.0;onum=None
-	  for j in range(len(probs)):
-	    psum+=probs[j]
-	    if rn<psum:break
-	  prevener=obji.energy
-	  if j==0:
-	    #---mutation---
-    	    ##child=obji.mutate()#consider multiple mutations?
-	    ind,I,ss8,info=obji.choose_mutation()##verb=False)
-	    locpost,locdiff=obji.get_diff_mutation(I,ss8)
-	    enerdiff=-locdiff;childener='mut'
-	    if debug:print 'mutation:',ind,I,ss8,info,flags[ind]
-	    ##testscore=locdiff+obji.score
-	    ##printr'testing sum for sumpostlik:',testscore,locdiff,flags[I],ss8
-	    ##success=obji.evaluate_local_observed(i,ss8)
-	    childid=''.join(obji.segments.get_s8_mutation(flags[ind],ind,I,ss8))
-	    repi=i
-	  elif j==1:
-	    #---crossover---(reproduce)
-	    onum=i
-	    while onum==i:onum=self.selectNormal(selrats[1],size)
-	    objo=self[onum]
-	    prevenero=objo.energy
-	    child=obji.crossover(objo)
-	    child.init_segments()
-	    if debug:print 'crossover(bi):',child
-  	    ch3,ch8=child.segments.remedy_disallowed()
-	    if prevener>=prevenero:repi=i
-	    else:repi=onum
-	    childid=child.getid()
-	  elif j==2:
-	    #---multicrossover---(non-biological reproduction)
-	    onum=-1;repi=-1;objo=self[-1]
-	    child=objo.multicrossover(self,selrats[1],size)
-	    child.init_segments()
-	    if debug:print 'multicrossover:',child
-  	    ch3,ch8=child.segments.remedy_disallowed()
-	    childid=child.getid()
-	  #consider acceptance of child
-	  if childid in dct:
-	    pass##dct[childid]+=1
-	    ##print 'note child allready used',childid,dct[childid],cnt
-	    ##print 'note child allready used',childid,cnt
-	  else:
-	   if j>0:
-		child.calculate_fitness()
+	#64 bit hashes of all individuals seen so far (children are not revisited)
+	seen=set()
+	self.seen=seen
+	for obj in self:
+	  obj.zhash=obj.get_hash()
+	  seen.add(obj.zhash)
+	history=[]#(best energy,class frequencies) at each statistics point
+	converged=False
+	print 'breeding population',size,limitfac,temperature,growthmode,batchsize
+	while cnt<size*limitfac and len(children)<size*expandfac and not converged:
+	  #propose a mini-batch of children from the current population
+	  numprop=int(min(batchsize,ceil(size*limitfac-cnt)))
+	  batch=[self.propose_child(selrats,probs,size) for _ in range(numprop)]
+	  #the crossover children are scored together in one pass
+	  self.calculate_fitness_batch([prop[3] for prop in batch if prop[0]>0 and not prop[4] in seen])
+	  for j,obji,target,child,childid,mutdata in batch:
+	   cnt+=1
+	   #consider acceptance of child
+	   if childid in seen:continue
+	   #the individual to be replaced may have moved (sorting) or been replaced earlier in the batch
+	   try:repi=self.index(target)
+	   except ValueError:continue
+	   prevener=obji.energy
+	   if j==0:
+		ind,I,ss8,info,enerdiff,mutdelta=mutdata
+		childener='mut'
+	   else:
 		childener=child.energy
 		enerdiff=childener-prevener
 		if debug:print 'crossover',j,enerdiff
@@ -2004,76 +2285,246 @@ class SOPopulation(Population):
 	   if enerdiff>0:
 	    ptest=exp(-(enerdiff)/temperature)
 	    if repi==0:ptest=-999#to ensure that very best individual survives!
-           if ptest>uniform(0.0,1.0):
-	    ##print 'breedinfo: using',j,i,onum,enerdiff,childener,prevener,ptest
+	   if ptest>self.rng.uniform(0.0,1.0):
 	    if j==0:
-		child=obji.get_clone(need_segments=True) #remember to update backpcs
+		child=obji.get_clone(need_segments=True)
 		child.segments.execute_mutation(flags[ind],ind,I,ss8,info)
-		##child.calculate_fitness()#sets energy
-		child.S9s=obji.newS9s #child is clone
-		post0refnew,ranges=obji.post0refnewdata
-		child.post0ref[ranges[0]:ranges[1]]=post0refnew
+		child.s8i[I:I+len(ss8)]=child.ssp.encode_s8(ss8)
+		child.apply_mutation(mutdelta)
 		child.energy=prevener+enerdiff
+		if isnan(child.energy):child.calculate_fitness()#inf-inf for a parent with zero prior
 	    if debug:
 	      q8,q3=child.evaluate()
-	      print 'breedinfo: using',j,i,'repi'+str(repi),onum,enerdiff,childener,prevener,ptest,q8*1000,q3*1000
+	      print 'breedinfo: using',j,'repi'+str(repi),enerdiff,childener,prevener,ptest,q8*1000,q3*1000
 	      print 'newss:',child,childener
-	    dct[childid]=child
+	    child.zhash=childid
+	    seen.add(childid)
 	    numrep+=1
-	    if True:
-	        if growthmode=='replace':
-		  self[repi]=child 
-	        elif growthmode=='append':
-		  if j==0:self[repi]=child
-		  else:self.append(child) #doesnt improve result
-		if numrep%sortnum==0:
-		  self.sort('energy')
-		  self.derive_stats(cnt)
-	   ##else:print 'breedinfo: rejecting',j,i,onum,childener,prevener,ptest
-	  cnt+=1
-
-    def multi_breed(self,pops,limitfac=100):
+	    if growthmode=='replace':
+	      self[repi]=child
+	    elif growthmode=='append':
+	      if j==0:self[repi]=child
+	      else:self.append(child) #doesnt improve result
+	    if numrep%sortnum==0:
+	      self.sort('energy')
+	      history.append(self.derive_stats(cnt))
+	      if self.has_converged(history,convwin,convtol):
+		print 'population converged after',cnt,'proposals'
+		converged=True
+		break
+
+    def multi_breed(self,pops,limitfac=100,keep=30):
 	print 'merging populations',len(pops)
 	##for popul in pops:popul.breed() must be breed before
 	merged=pops[0]
 	for i in range(1,len(pops)):merged.mergewith(pops[i])
 	merged.sort('energy')
 	merged.derive_stats(-1)
-	merged.cull(30)
-	merged.breed(limitfac=limitfac)
+	if keep!=None:merged.cull(keep)
+	if limitfac>0:merged.breed(limitfac=limitfac)
 	return merged
 
 
-def predict8ss(bmrid,seq,resis,pc1s,pc2s,zsco,dotest=False,dovis=False):
-  ssp=SSparameters(bmrid)
+def breed_population(ssopt,seed=None,limitfac=75):
+  #one independent GA run started from ssopt (module level so that it can run in a process pool)
+  #the seed individual's segments (and so all clones of it) draw from the generator they were made with
+  rng=ssopt.ssp.rng
+  segrng=ssopt.segments.rng
+  if seed!=None:
+    ssopt.ssp.rng=numpy.random.RandomState(seed)
+    ssopt.segments.rng=ssopt.ssp.rng
+  popul=SOPopulation();popul.envi=ssopt.ssp
+  popul.rng=ssopt.ssp.rng
+  popul.fill_from_random(25,ssopt)
+  popul.append(ssopt)
+  popul.breed(limitfac=limitfac,growthmode='append')
+  popul.cull(len(popul)-100)
+  popul.seen=None#not needed after breeding - avoid sending it back from the pool
+  #leave the caller's generators as they were
+  ssopt.ssp.rng=rng
+  ssopt.segments.rng=segrng
+  return popul
+
+def _breed_population_star(args):
+  return breed_population(*args)
+
+def breed_populations(ssopt,npop,nproc=None,limitfac=75):
+  #runs npop independent populations, each with its own seed, in a pool of nproc processes
+  seeds=[ssopt.ssp.rng.randint(2**31-1) for _ in range(npop)]
+  jobs=[(ssopt,seed,limitfac) for seed in seeds]
+  if nproc==None:nproc=min(npop,multiprocessing.cpu_count())
+  if nproc>1:
+    pool=multiprocessing.Pool(nproc)
+    pops=pool.map(_breed_population_star,jobs)
+    pool.close()
+    pool.join()
+    #individuals come back with their own copies of the parameters
+    for popul in pops:
+      popul.envi=ssopt.ssp
+      for obj in popul:obj.ssp=ssopt.ssp
+  else:pops=[_breed_population_star(job) for job in jobs]
+  return pops
+
+def temper_replica(ssp,s8,temperature,numsteps,seed,sampleint=0):
+  #numsteps Metropolis steps at temperature from the state s8 with the mutation moves of the GA
+  #(module level so that it can run in a process pool): returns the final state and energy and
+  #the states visited every sampleint steps
+  flags=['coil','incr','decr','split','del','H2G','C2G']
+  rng=ssp.rng
+  ssp.rng=numpy.random.RandomState(seed)
+  ssopt=SSopt(ssp,s8[:])
+  ssopt.calculate_fitness()
+  ssopt.init_segments()
+  samples=[]
+  for step in range(numsteps):
+    ind,I,ss8,info=ssopt.choose_mutation()
+    locpost,locdiff=ssopt.get_diff_mutation(I,ss8)
+    enerdiff=-locdiff
+    ptest=999
+    if enerdiff>0:ptest=exp(-enerdiff/temperature)
+    if not isfinite(locpost):ptest=0#never move to a state with zero prior (infinite energy)
+    if ptest>ssp.rng.uniform(0.0,1.0):
+      ssopt.segments.execute_mutation(flags[ind],ind,I,ss8,info)
+      ssopt.s8i[I:I+len(ss8)]=ssp.encode_s8(ss8)
+      ssopt.apply_mutation(ssopt.mutdelta)
+      if isfinite(ssopt.energy):ssopt.energy+=enerdiff
+      else:ssopt.calculate_fitness()#started from infinite energy, the move may have left it
+    if sampleint>0 and (step+1)%sampleint==0:samples.append(ssopt.s8[:])
+  ssp.rng=rng
+  return ssopt.s8,ssopt.energy,samples
+
+def draw_finite_state(ssopt,maxtries=100):
+  #remedied random individual drawn from the priors with finite energy, the best decoded
+  #assignment of ssp.decode_beam if maxtries draws all give some residue zero prior
+  ssp=ssopt.ssp
+  for i in range(maxtries):
+    new=ssopt.initialize_random(calc=False)
+    new.finalize_random(calc=False)
+    new.calculate_fitness()
+    if isfinite(new.energy):return new
+  S8I,cost,marg=ssp.decode_beam(256)
+  new=SSopt(ssp,['HGIE-TSB'[i] for i in S8I[0]])
+  new.calculate_fitness()
+  return new
+
+_temper_ssp=None
+
+def _temper_init(ssp):
+  #each pool process receives the parameters once
+  global _temper_ssp
+  _temper_ssp=ssp
+
+def _temper_job(args):
+  return temper_replica(_temper_ssp,*args)
+
+def temper_population(ssopt,numrep=8,tmin=0.3,tmax=3.0,numrounds=25,swapsteps=50,sampleint=5,nproc=1,keep=100):
+  #parallel tempering alternative to breed_population: numrep replicas of ssopt on a geometric
+  #temperature ladder tmin..tmax make swapsteps moves each per round (one replica per process with
+  #nproc>1), then neighbouring temperatures exchange their states. The distinct states visited by
+  #the coldest replica make up the returned population
+  ssp=ssopt.ssp
+  temps=tmin*(tmax/tmin)**(arange(numrep)/max(numrep-1.0,1.0))
+  #the replicas start from ssopt unless its energy is infinite (remedy_disallowed can leave a residue
+  #in a state of zero prior), then each from its own finite-energy draw
+  start=SSopt(ssp,ssopt.s8[:])
+  start.calculate_fitness()
+  states=[];eners=[]
+  for k in range(numrep):
+    if not isfinite(start.energy):start=draw_finite_state(ssopt)
+    states.append(start.s8[:]);eners.append(start.energy)
+  sampled=set()
+  if nproc==None:nproc=min(numrep,multiprocessing.cpu_count())
+  pool=None
+  if nproc>1:pool=multiprocessing.Pool(nproc,_temper_init,(ssp,))
+  print 'parallel tempering',numrep,numrounds,swapsteps,' '.join(['%.3f'%T for T in temps])
+  numswap=0
+  for rnd in range(numrounds):
+    jobs=[(states[k],temps[k],swapsteps,ssp.rng.randint(2**31-1),sampleint*(k==0)) for k in range(numrep)]
+    if pool!=None:results=pool.map(_temper_job,jobs)
+    else:results=[temper_replica(ssp,*job) for job in jobs]
+    for k,(s8,ener,samples) in enumerate(results):
+      states[k]=s8;eners[k]=ener
+      for s in samples:sampled.add(''.join(s))
+    #replica exchange between neighbouring temperatures, alternating the pairs
+    for k in range(rnd%2,numrep-1,2):
+      delta=(1.0/temps[k]-1.0/temps[k+1])*(eners[k]-eners[k+1])
+      if delta>=0 or exp(delta)>ssp.rng.uniform(0.0,1.0):
+	states[k],states[k+1]=states[k+1],states[k]
+	eners[k],eners[k+1]=eners[k+1],eners[k]
+	numswap+=1
+  if pool!=None:
+    pool.close()
+    pool.join()
+  print 'tempering done: energies',' '.join(['%.3f'%e for e in eners]),'exchanges',numswap,'sampled',len(sampled)
+  objs=[SSopt(ssp,list(s)) for s in sampled]
+  popul=SOPopulation();popul.envi=ssp
+  popul.rng=ssp.rng
+  popul.calculate_fitness_batch(objs)
+  objs=[obj for obj in objs if isfinite(obj.energy)]
+  objs.sort(key=operator.attrgetter('energy'))
+  for obj in objs[:keep]:
+    obj.init_segments()
+    popul.append(obj)
+  return popul
+
+def decode_population(ssp,width=256,keep=100):
+  #deterministic alternative to the stochastic engines: the hypotheses left in the beam of
+  #ssp.decode_beam make up the population, best first, its marginals give the class probabilities
+  S8I,cost,marg=ssp.decode_beam(width)
+  print 'beam decoding',width,'hypotheses',len(cost),'best cost %.3f'%cost[0]
+  objs=[SSopt(ssp,['HGIE-TSB'[i] for i in row]) for row in S8I[:keep]]
+  popul=SOPopulation();popul.envi=ssp
+  popul.rng=ssp.rng
+  popul.calculate_fitness_batch(objs)
+  objs.sort(key=operator.attrgetter('energy'))
+  for obj in objs:
+    obj.init_segments()
+    popul.append(obj)
+  popul.fracs=marg
+  return popul
+
+def predict8ss(bmrid,seq,resis,pc1s,pc2s,zsco,dotest=False,dovis=False,npop=1,nproc=None,seed=None,engine='ga',beamseed=False):
+  ssp=SSparameters(bmrid,seed)
   ssp.dotest=dotest
   if dotest:ssp.set_observed()
   else:ssp.set_input(seq,resis,pc1s,pc2s,zsco)
   ssp.initparameters(usesimple=False)
   ssp.make_guess()
   if dotest:trueprobs_priors=ssp.evaluate_priors()
-  ss8max,ss3max=getmaxss(ssp.ss8priors)
-  ssopt=SSopt(ssp,ss8max,ss3max)
-  ssopt.backcalcbothPCs()
-  ssopt.init_segments()
-  ch3,ch8=ssopt.segments.remedy_disallowed()
+  if engine=='meanfield':
+    numit,change=ssp.refine_priors(convtol=1e-4)
+    print 'mean-field refinement:',numit,'iterations, last change %.2e'%change
+  if beamseed:
+    #start from the decoded assignment, which has no disallowed elements
+    S8I,cost,marg=ssp.decode_beam(256)
+    ssopt=SSopt(ssp,['HGIE-TSB'[i] for i in S8I[0]])
+    ssopt.backcalcbothPCs()
+    ssopt.init_segments()
+  else:
+    ss8max,ss3max=getmaxss(ssp.ss8priors)
+    ssopt=SSopt(ssp,ss8max,ss3max)
+    ssopt.backcalcbothPCs()
+    ssopt.init_segments()
+    ch3,ch8=ssopt.segments.remedy_disallowed()
   optlik=ssopt.calcpostlik()
   if dotest:q8max,q3max=ssopt.evaluate('max')
-  comb=[]
-  ##comb=SOPopulation();popul.envi=ssp
   T_0=time.time()
-  ##for i in range(3):
-  for i in [0]:
+  if engine=='meanfield':
+    #no sampling: the refined posterior gives the class probabilities, its remedied maxima the s8
     popul=SOPopulation();popul.envi=ssp
-    popul.fill_from_random(25,ssopt)
+    popul.rng=ssp.rng
     popul.append(ssopt)
-    popul.breed(limitfac=75,growthmode='append')
-    popul.cull(len(popul)-100)
-    ##comb.append(popul)
-  ##popul=comb
-  ##merged=popul.multi_breed(comb)
-  ##q8breed,q3breed=merged[0].evaluate('breed')
-  ##trueprobs_breed=merged.trueprobs
+    popul.fracs=ssp.ss8priors.transpose()
+    if dotest:popul.trueprobs=ssp.evaluate_priors()
+  elif engine=='beam':popul=decode_population(ssp)
+  elif engine=='pt':
+    #parallel tempering instead of the genetic algorithm
+    popul=temper_population(ssopt,nproc=nproc)
+  elif npop>1:
+    #independent restarts merged into one set for the class statistics
+    comb=breed_populations(ssopt,npop,nproc)
+    popul=comb[0].multi_breed(comb,limitfac=0,keep=None)
+  else:popul=breed_population(ssopt)
   print 'final s8:',bmrid,''.join(popul[0].s8)
   testdata=popul.summarize_as_probs(dovis)
   if dotest:
@@ -2151,6 +2602,48 @@ def w2logp(x,T=293.15):
 
 pK0 = {"n":8.23, "D":3.86, "E":4.34, "H":6.45, "C":8.49, "K":10.34, "R":13.9, "Y":9.76, "c":3.55}
 
+def fit_hill(pHs, titration, pK, nH, maxiter=200, tol=1e-10):
+  #least squares fit of fun(pH,pK,nH) to each row of titration (N,len(pHs)) like curve_fit,
+  #by Levenberg-Marquardt steps taken for all rows at once from the starting values pK, nH
+  pK = np.array(pK, dtype=float)
+  nH = np.array(nH, dtype=float)
+  def hill(pK, nH):
+    with np.errstate(over='ignore'):
+      return 1. / (1. + 10 ** (nH[:,np.newaxis] * (pHs - pK[:,np.newaxis])))
+  f = hill(pK, nH)
+  cost = ((f - titration) ** 2).sum(axis=1)
+  lam = np.zeros(len(pK)) + 1e-3
+  done = np.zeros(len(pK), dtype=bool)
+  for it in range(maxiter):
+    g = np.log(10) * f * (1 - f)
+    JpK = g * nH[:,np.newaxis]
+    JnH = g * (pK[:,np.newaxis] - pHs)
+    r = f - titration
+    a11 = (JpK ** 2).sum(axis=1)
+    a12 = (JpK * JnH).sum(axis=1)
+    a22 = (JnH ** 2).sum(axis=1)
+    b1 = (JpK * r).sum(axis=1)
+    b2 = (JnH * r).sum(axis=1)
+    d11 = a11 * (1 + lam)
+    d22 = a22 * (1 + lam)
+    det = d11 * d22 - a12 ** 2
+    ok = det > 0
+    det[~ok] = 1
+    dpK = np.where(ok, -(d22 * b1 - a12 * b2) / det, 0)
+    dnH = np.where(ok, -(d11 * b2 - a12 * b1) / det, 0)
+    newf = hill(pK + dpK, nH + dnH)
+    newcost = ((newf - titration) ** 2).sum(axis=1)
+    better = ok & (newcost < cost) & ~done
+    pK = np.where(better, pK + dpK, pK)
+    nH = np.where(better, nH + dnH, nH)
+    f[better] = newf[better]
+    cost = np.where(better, newcost, cost)
+    lam = np.where(better, lam / 10, lam * 10)
+    #a row is done when its accepted step is negligible or no step improves it any more
+    done |= (better & (np.abs(dpK) + np.abs(dnH) < tol)) | (lam > 1e12)
+    if done.all(): break
+  return pK, nH
+
 def calc_pkas_from_seq(seq=None, T=293.15, Ion=0.1):
   #pH range
   pHs = np.arange(1.99, 10.01, 0.15)
@@ -2174,23 +2667,22 @@ def calc_pkas_from_seq(seq=None, T=293.15, Ion=0.1):
   chargesempty = np.zeros(pos.shape[0])
   if len(neg): chargesempty[neg] = -1
 
-  pK0s = [pK0[c] for c in sites]
-  nH0s = [0.9 for c in sites]
+  pK0s = np.array([pK0[c] for c in sites])
+  nH0s = np.array([0.9 for c in sites])
 
   titration = np.zeros((N,len(pHs)))
   smallN = min(2 * cutoff+1, len(pos))
-  smallI = np.diag(np.ones(smallN))
 
-  alltuples =  [[int(c) for c in np.binary_repr(i, smallN)]
-                for i in range(2 ** (smallN))]
-  gmatrix = [np.zeros((smallN, smallN)) for p in range(len(pHs))]
+  #all protonation microstates of a window (2**smallN, smallN), computed once
+  alltuples = np.array([[int(c) for c in np.binary_repr(i, smallN)]
+                for i in range(2 ** (smallN))], dtype=float)
 
   #perform iterative fitting.........................
   for icycle in range(ncycles):
     ##print (icycle)
 
     if icycle == 0:
-      fractionhold = np.array([[fun(pHs[p], pK0s[i], nH0s[i]) for i in range(N)] for p in range(len(pHs))])
+      fractionhold = fun(pHs[:,np.newaxis], pK0s, nH0s)
     else:
       fractionhold = titration.transpose()
 
@@ -2201,20 +2693,21 @@ def calc_pkas_from_seq(seq=None, T=293.15, Ion=0.1):
       resi = smallmatrixpos(ires, cutoff, N)
 #    print ires, resi, (ileft, iright) 
 
-      for p in range(len(pHs)):
-  
-        fraction = fractionhold[p].copy()
-        fraction[ileft - 1 : iright] = 0
-        charges = chargesempty + fraction  
-        ww0 = np.diag(np.dot(ww, charges) * 2) 
-        gmatrixfull =  ww + ww0 + pHs[p] * I - np.diag(pK0s) 
-        gmatrix[p] = gmatrixfull[ileft - 1 : iright, ileft - 1 : iright]
-
-      E_all = np.array([sum([10 ** -(gmatrix[p] * np.outer(c,c)).sum() for c in alltuples]) for p in range(len(pHs))])
-      E_sel = np.array([sum([10 ** -(gmatrix[p] * np.outer(c,c)).sum() for c in alltuples if c[resi-1] == 1]) for p in range(len(pHs))])
-      titration[ires-1] = E_sel/E_all
-    sol=np.array([curve_fit(fun, pHs, titration[p], [pK0s[p], nH0s[p]])[0] for p in range(len(pK0s))])
-    (pKs, nHs) = sol.transpose()
+      #charges outside the window at all pH values (len(pHs),N)
+      fraction = fractionhold.copy()
+      fraction[:, ileft - 1 : iright] = 0
+      charges = chargesempty + fraction
+      win = slice(ileft - 1, iright)
+      #energy c.G.c of microstate c: the pH independent couplings plus the diagonal,
+      #which enters linearly as c*c==c
+      gdiag = (np.dot(charges, ww.transpose()) * 2)[:, win] + pHs[:,np.newaxis] - pK0s[win]
+      Ecoup = (np.dot(alltuples, ww[win, win]) * alltuples).sum(axis=1)
+      logw = -(Ecoup + np.dot(gdiag, alltuples.transpose()))
+      #fraction of the weight 10**logw in the protonated states of the site, via log-sum-exp
+      logw -= logw.max(axis=1)[:,np.newaxis]
+      weights = 10 ** logw
+      titration[ires-1] = np.dot(weights, alltuples[:, resi-1]) / weights.sum(axis=1)
+    (pKs, nHs) = fit_hill(pHs, titration, pK0s, nH0s)
     ##print (sol)
 
   dct={}
@@ -2821,28 +3314,36 @@ R NE 85.6 91.5 5.9
 R NG 71.2 93.2 22'''
 
 def initcorrcomb():
+    #combination corrections keyed directly by (atn,neipos,centgroup,neigroup)
     datc=string.split(tablecombdevs,'\n')
     buf=[string.split(lin) for lin in datc]
     dct={}
     for lin in buf:
       atn=lin[0]
-      if not atn in dct:dct[atn]={}
       neipos=string.atoi(lin[1])
       centgroup=lin[2]
       neigroup= lin[3]
-      key=(neipos,centgroup,neigroup)#(k,l,m)
-      segment=lin[4]
-      dct[atn][segment]=key,eval(lin[-2])
+      key=(atn,neipos,centgroup,neigroup)#(k,l,m)
+      if key in dct:
+	#segments with the same key all apply
+	print 'warning: duplicate combination correction',key,lin[4]
+	dct[key]+=eval(lin[-2])
+      else:dct[key]=eval(lin[-2])
     return dct
 	
-TEMPCORRS=gettempkoeff()
+#the POTENCI tables are parsed once, here, and are read-only (see also POTENCITABLES)
+TEMPCORRS=freezetable(gettempkoeff())
 ##dct[atn][aa]=eval(lin[1+j])
-CENTSHIFTS=initcorcents()
+CENTSHIFTS=freezetable(initcorcents())
 ##dct[aai][atnj]=eval(vals[1+j])
-NEICORRS =initcorneis()
+NEICORRS =freezetable(initcorneis())
 ##dct[aai][atn]=[eval(vals[2+j]) for j in range(4)]
-COMBCORRS=initcorrcomb()
-##dct[atn][segment]=key,eval(lin[-1])
+COMBCORRS=freezetable(initcorrcomb())
+##dct[(atn,neipos,centgroup,neigroup)]=eval(lin[-2])
+#group labels (Gly,Pro,Arom,Aliph,pos,neg) of the residue types, anything else is polar (p)
+PENTGROUPS={}
+for _gr,_lab in zip(['G','P','FYW','LIVMCA','KR','DE'],'GPra+-'):
+  for _aa in _gr:PENTGROUPS[_aa]=_lab
 
 def predPentShift(pent,atn):
     aac=pent[2]
@@ -2853,28 +3354,92 @@ def predPentShift(pent,atn):
 	if aai in NEICORRS:
 	  corr=NEICORRS[aai][atn][i]
 	  sh+=corr
-    groups=['G','P','FYW','LIVMCA','KR','DE']##,'NQSTHncX']
-    labels='GPra+-p' #(Gly,Pro,Arom,Aliph,pos,neg,polar)
-    grstr=''
-    for i in range(5):
-	aai=pent[i]
-	found=False
-	for j,gr in enumerate(groups):
-	  if aai in gr:
-	    grstr+=labels[j]
-	    found=True
-	    break
-	if not found:grstr+='p'#polar
+    grstr=''.join([PENTGROUPS.get(aai,'p') for aai in pent])
     centgr=grstr[2]
-    for segm in COMBCORRS[atn]:
-	key,combval=COMBCORRS[atn][segm]
-        neipos,centgroup,neigroup=key#(k,l,m)
-	if centgroup==centgr and grstr[2+neipos]==neigroup:
+    for neipos in (-2,-1,1,2):
+	neigroup=grstr[2+neipos]
+	key=(atn,neipos,centgr,neigroup)
+	if key in COMBCORRS:
 	 if (centgr,neigroup)<>('p','p') or pent[2] in 'ST':
 	  #pp comb only used when center is Ser or Thr!
-	  sh+=combval
+	  sh+=COMBCORRS[key]
     return sh
 	
+POTENCIATNS=['C','CA','CB','HA','H','N','HB']
+#integer codes of the pentapeptide letters: standard residues, then the chain ends, anything else is 22
+POTENCICODES=dict([(aa,i) for i,aa in enumerate(AAstandard+'nc')])
+
+def initpotenciarrays():
+    #dense versions of CENTSHIFTS (atom,aa), NEICORRS (atom,neighbour,code), the residue groups of
+    #predPentShift (code), COMBCORRS (atom,neighbour,centre group,neighbour group) and TEMPCORRS (atom,aa),
+    #with the neighbours in the order +2,+1,-1,-2 of predPentShift
+    allneipos=[2,1,-1,-2]
+    labels='GPra+-p'
+    cent=zeros((7,20))
+    nei=zeros((7,4,23))
+    tempk=zeros((7,20))
+    for a,atn in enumerate(POTENCIATNS):
+      for aa,c in POTENCICODES.items():
+	if aa in CENTSHIFTS:
+	  sh=CENTSHIFTS[aa][atn]
+	  if sh==None:cent[a,c]=nan
+	  else:cent[a,c]=sh
+	  if atn in TEMPCORRS:tempk[a,c]=TEMPCORRS[atn][aa]/1000
+	if aa in NEICORRS:
+	  for q in range(4):
+	    if NEICORRS[aa][atn][q]!=None:nei[a,q,c]=NEICORRS[aa][atn][q]
+    grp=zeros(23,dtype=int)+labels.index('p')#polar
+    for aa,c in POTENCICODES.items():
+      grp[c]=labels.index(PENTGROUPS.get(aa,'p'))
+    comb=zeros((7,4,7,7))
+    for (atn,neipos,centgroup,neigroup),combval in COMBCORRS.items():
+      comb[POTENCIATNS.index(atn),allneipos.index(neipos),labels.index(centgroup),labels.index(neigroup)]=combval
+    return cent,nei,grp,comb,tempk
+
+POTCENT,POTNEI,POTGRP,POTCOMB,POTTEMPK=freezetable(list(initpotenciarrays()))
+
+# base shifts and temperature coefficients of potenci_array by sequence, shared by all entries and
+# conditions (temperatures) of a run
+RCSHIFTCACHE=LRUCache(1000)
+
+def potenci_array(seq,temperature=298):
+    #random coil shifts (numres,7) in the atom order of POTENCIATNS with the temperature correction
+    #(not for HB), the same as predPentShift+gettempcorr but for the whole sequence at once.
+    #nan where no prediction is made: terminal and non-standard residues, Gly CB/HB and Pro H
+    key=''.join(seq)
+    tabs=RCSHIFTCACHE.get(key)
+    if tabs is None:
+      tabs=calc_potenci_base(key)
+      for tab in tabs:tab.flags.writeable=False
+      RCSHIFTCACHE.put(key,tabs)
+    base,tempk=tabs
+    return base+tempk*(temperature-298)
+
+def calc_potenci_base(seq):
+    #shifts of potenci_array at 298 K and the temperature coefficients of the residues (both (numres,7))
+    numres=len(seq)
+    codes=array([POTENCICODES.get(aa,22) for aa in ['n']+list(seq)+['c']],dtype=int)
+    #pentapeptides of residues 1..numres-2
+    win=codes[arange(max(numres-2,0))[:,newaxis]+arange(5)]
+    cen=win[:,2]
+    cenaa=minimum(cen,19)
+    sh=POTCENT[:,cenaa]
+    for q,neipos in enumerate((2,1,-1,-2)):
+      sh=sh+POTNEI[:,q,win[:,2+neipos]]
+    gr=POTGRP[win]
+    #pp comb only used when center is Ser or Thr!
+    polar=POTGRP[22]
+    isST=(cen==POTENCICODES['S'])|(cen==POTENCICODES['T'])
+    for q,neipos in enumerate((2,1,-1,-2)):
+      use=(gr[:,2]!=polar)|(gr[:,2+neipos]!=polar)|isST
+      sh=sh+POTCOMB[:,q,gr[:,2],gr[:,2+neipos]]*use
+    sh[:,cen>=20]=nan
+    base=zeros((numres,7))+nan
+    base[1:numres-1]=sh.transpose()
+    tempk=zeros((numres,7))
+    tempk[1:numres-1]=POTTEMPK[:,cenaa].transpose()
+    return base,tempk
+
 def gettempcorr(aai,atn,tempdct,temp):
     return tempdct[atn][aai]/1000*(temp-298)
 
@@ -2900,6 +3465,12 @@ def get_phshifts():
 	    dct[nresn][atn]=shdn
     return dct
 
+PHSHIFTS=freezetable(get_phshifts())
+##dct[resn][atn]=shd, neighbours as resn+'p' and resn+'s'
+
+POTENCITABLES=FrozenDict(cent=CENTSHIFTS,nei=NEICORRS,comb=COMBCORRS,temp=TEMPCORRS,ph=PHSHIFTS,
+			 centarr=POTCENT,neiarr=POTNEI,grouparr=POTGRP,combarr=POTCOMB,temparr=POTTEMPK)
+
 def initfilcsv(filename):
   file=open(filename,'r')
   buffer=file.readlines()
@@ -2941,7 +3512,7 @@ def read_csv_pkaoutput(seq,temperature,ion,name=None):
 
 def getphcorrs(seq,temperature,pH,ion,pkacsvfilename=None):
 	bbatns=['C','CA','CB','HA','H','N','HB']
-        dct=get_phshifts()
+        dct=PHSHIFTS
 	Ion=max(0.0001,ion)
 	pkadct=read_csv_pkaoutput(seq,temperature,ion,pkacsvfilename)
 	if pkadct==None:
@@ -2989,30 +3560,20 @@ def getphcorrs(seq,temperature,pH,ion,pkacsvfilename=None):
 	return outdct
 
 def getpredshifts(seq,temperature,pH,ion,usephcor=True,pkacsvfile=None,identifier=''):
-        tempdct=gettempkoeff()
-        bbatns =['C','CA','CB','HA','H','N','HB']
+        bbatns =POTENCIATNS
 	if usephcor:
 	  phcorrs=getphcorrs(seq,temperature,pH,ion,pkacsvfile)
 	else:phcorrs={}
+	shifts=potenci_array(seq,temperature)
 	shiftdct={}
 	for i in range(1,len(seq)-1):
 	  if seq[i] in AAstandard:#else: do nothing
-	    res=str(i+1)
-	    trip=seq[i-1]+seq[i]+seq[i+1]
 	    phcorr=None
 	    shiftdct[(i+1,seq[i])]={}
-	    for at in bbatns:
-	      if not (trip[1],at) in [('G','CB'),('G','HB'),('P','H')]:
-		if i==1:
-		  pent='n'+     trip+seq[i+2]
-		elif i==len(seq)-2:
-		  pent=seq[i-2]+trip+'c'
-		else:
-		  pent=seq[i-2]+trip+seq[i+2]
-	        shp=predPentShift(pent,at)
-		if shp<>None:
-		 if not (at in ('CA','CB') and seq[i]=='C'):
-	          if at<>'HB':shp+=gettempcorr(trip[1],at,tempdct,temperature)
+	    for j,at in enumerate(bbatns):
+	      if not isnan(shifts[i,j]):
+		shp=float(shifts[i,j])
+		if not (at in ('CA','CB') and seq[i]=='C'):
 		  if at in phcorrs and i in phcorrs[at]:
 		     phdata=phcorrs[at][i]
 		     resi=phdata[0]
@@ -3073,6 +3634,7 @@ def potenci(seq,pH=7.0,temp=298,ion=0.1,pkacsvfile=None,doreturn=True):
     #------------- write output nicely is SHIFTY format -----------------------$
     writeOutput(name,shiftdct)
     print 'chemical shift succesfully predicted, see output:',name
+    if VERB:print 'random coil shift cache:',RCSHIFTCACHE
     if doreturn: return shiftdct
 
 histdct_flattened=(2.0737054913103337e-10, 0.029518200092680934, 0.97048179969994852, 8.9102609389174977e-10, 0.049071251975264775, 0.95092874713370923, 3.6911845844839106e-09, 0.079951554923860677, 0.92004844138495467, 1.4645276032946968e-08, 0.12682756718735982, 0.87317241816736413, 5.5170502882584017e-08, 0.19418179262213037, 0.80581815220736663, 1.9535866625876679e-07, 0.28408625538027543, 0.71591354926105832, 6.4415744419331008e-07, 0.39341966288684982, 0.60657969295570613, 0.52492556339882823, 0.24358165501654738, 0.2314927815846245, 5.5564750876404044e-06, 0.62885124891949329, 0.37114319460541911, 2.1057352549240146e-05, 0.61171750797158275, 0.38826143467586793, 3.0971176979542517e-05, 0.51981670536451852, 0.48015232345850201, 7.915310450907783e-05, 0.61884065214048178, 0.38108019475500915, 0.00045690835118482965, 0.79503735616235505, 0.20450573548646017, 0.00037479162478264302, 0.35106708082817562, 0.64855812754704179, 0.00095386218989570288, 0.57450903465177372, 0.4245371031583306, 0.0020603975788089112, 0.61761448046266132, 0.38032512195852974, 0.10697471251615311, 0.740936476567855, 0.15208881091599186, 0.19327399498223335, 0.66933460014069035, 0.13739140487707624, 0.012958657581034067, 0.8553594104147666, 0.13168193200419931, 0.091851181267882026, 0.77756153682517193, 0.13058728190694613, 0.22921634513601896, 0.70560705274133872, 0.065176602122642202, 0.17138260006224124, 0.74739765730864161, 0.081219742629117173, 0.39611931387854205, 0.53348400777148219, 0.070396678349975719, 0.32077386008589764, 0.67887372861950723, 0.00035241129459517807, 0.34547036052878238, 0.53173852579655434, 0.12279111367466328, 0.15654016376325999, 0.84329817825782072, 0.00016165797891921677, 0.609236196608406, 0.39071653468646333, 4.7268705130734661e-05, 0.56507190622112824, 0.43487160797697183, 5.6485801899947119e-05, 0.72211884215624933, 0.27786639061478047, 1.4767228970310703e-05, 0.89076020079356311, 0.1092234770391385, 1.6322167298468004e-05, 0.9651593658187213, 0.034836824638462209, 3.8095428165094679e-06, 0.98971313476752076, 0.010286035965388558, 8.2926709062859595e-07, 0.96981453223812519, 0.03018366029636706, 1.8074655077167692e-06, 0.9800419677234179, 0.019957137967335396, 8.9430924670088857e-07, 0.9866363147631777, 0.013363233763595815, 4.5147322651919685e-07, 1.9109838135778465e-10, 0.023630638204507205, 0.97636936160439436, 8.2442113579148138e-10, 0.039442231792554197, 0.96055776738302479, 3.4371676755121813e-09, 0.064675160889006281, 0.93532483567382607, 1.3771494331934358e-08, 0.10360311557528777, 0.89639687065321794, 5.2622165192033297e-08, 0.16089625102505495, 0.83910369635277982, 1.8996806314544746e-07, 0.23997930062335224, 0.76002050940858468, 6.4159584961185574e-07, 0.34040915035607228, 0.65959020804807811, 1.6142671821825171e-06, 0.3656723330296458, 0.63432605270317199, 7.9306224762809292e-06, 0.42167471692381381, 0.57831735245370997, 1.4331997234628106e-05, 0.62168294461968965, 0.37830272338307569, 8.5079831053122454e-05, 0.35116882723558307, 0.64874609293336394, 0.00023739564627928063, 0.60858211393349881, 0.39118049042022185, 0.00027350017133546272, 0.35110265425567283, 0.64862384557299169, 0.0013094397503175168, 0.80436154464227105, 0.19432901560741142, 0.0011593081625392108, 0.6181721553663625, 0.38066853647109822, 0.0017483116290761852, 0.60143525528397734, 0.39681643308694647, 0.062346515643269242, 0.67173435620272981, 0.26591912815400082, 0.12117764676552746, 0.79268160196400617, 0.086140751270466262, 0.025364944414347012, 0.96071846892327084, 0.013916586662382227, 0.1253815227369563, 0.86842714038053614, 0.0061913368825075822, 0.035564561379828476, 0.71161999636365836, 0.25281544225651315, 0.05127083074821575, 0.94697591712442863, 0.0017532521273556747, 0.33683647246616599, 0.66246322641254274, 0.00070030112129126204, 0.20613528440390783, 0.7931944731511591, 0.00067024244493308304, 0.25475130826701098, 0.74500186152316994, 0.00024683020981902096, 0.38096153535572541, 0.618941435995089, 9.7028649185720704e-05, 0.4380554386001887, 0.56186912046014503, 7.5440939666278716e-05, 0.72201381857408975, 0.27782597825880734, 0.00016020316710293287, 0.46415121975875845, 0.53580664263808608, 4.2137603155417023e-05, 0.83863471128469635, 0.16135044999873116, 1.483871657248392e-05, 0.9127086014213116, 0.087279403938147634, 1.1994640540753855e-05, 0.95968276815616971, 0.040313147387399932, 4.0844564303048067e-06, 0.97959790349402753, 0.020400561247868244, 1.5352581042162526e-06, 0.98243937381474755, 0.017559637299381859, 9.8888587070698638e-07, 0.98837030712191354, 0.01162919912319507, 4.9375489140841599e-07, 1.7586070645157005e-10, 0.018919495073917988, 0.98108050475022135, 7.6114140518621012e-10, 0.031681081386595179, 0.96831891785226343, 1.5738979951325724e-09, 0.025765327484998785, 0.97423467094110328, 1.2883779943905633e-08, 0.084325190757747803, 0.91567479635847215, 4.9822664459746072e-08, 0.13253373783046729, 0.86746621234686827, 1.938707366951566e-07, 0.21307266355241578, 0.78692714257684759, 6.3126935162206797e-07, 0.29139135982217446, 0.70860800890847397, 3.1778932524635995e-06, 0.35119759109025267, 0.64879923101649484, 7.3222033521025827e-06, 0.62630845676289149, 0.37368422103375648, 3.5011493538620542e-05, 0.51981460507542765, 0.48015038343103372, 7.1272798885618945e-05, 0.15284352413112626, 0.84708520306998814, 0.00015475183905515138, 0.72141337200465983, 0.27843187615628495, 0.00027694019364964242, 0.43099593807618158, 0.56872712173016882, 0.0005940761539064874, 0.47400377256513898, 0.52540215128095458, 0.002552483169753832, 0.70714312419390568, 0.29030439263634056, 0.048136277614296952, 0.81499045482398769, 0.13687326756171533, 0.090692589975098353, 0.65142724668963636, 0.25788016333526537, 0.03745858302666627, 0.74951793816703616, 0.21302347880629754, 0.029535710506623215, 0.88648086977008478, 0.083983419723291999, 0.10213292270407413, 0.89080113308337361, 0.0070659442125522078, 0.08366492548264258, 0.8370359658293498, 0.079299108688007519, 0.24465858755181566, 0.7531436066998346, 0.0021978057483498241, 0.33657682568722619, 0.66195257374585037, 0.0014706005669234679, 0.40230659369205496, 0.59710432564384208, 0.00058908066410307588, 0.29238446867227558, 0.70719027286905833, 0.00042525845866613841, 0.40491597418577552, 0.59490669737192015, 0.00017732844230438293, 0.56505048739799879, 0.4348551243437338, 9.4388258267336206e-05, 0.56506660125667107, 0.4348675253489056, 6.5873394423309603e-05, 0.7958164435359204, 0.2041498156516921, 3.3740812387630269e-05, 0.68409674991869873, 0.31588289954646637, 2.0350534834945435e-05, 0.94542022483429133, 0.054570363018285849, 9.4121474229599436e-06, 0.92863027799932507, 0.071360647917449158, 9.0740832258402936e-06, 0.93479652168789862, 0.065197320514038481, 6.1577980629425805e-06, 0.98484176376230692, 0.015157164952703448, 1.071284989674963e-06, 0.98799996363359788, 0.011999396959327391, 6.3940707466488445e-07, 1.6165617676271101e-10, 0.015153116260222027, 0.98484688357812189, 7.0147936153724939e-10, 0.025440079913643904, 0.97455991938487674, 2.9521305956832856e-09, 0.042107899156463249, 0.95789209789140617, 1.2002430192798381e-08, 0.068446641981493875, 0.93155334601607587, 3.9989238031081283e-08, 0.23965735406034891, 0.76034260595041314, 1.8473809999672171e-07, 0.17690531070607751, 0.82309450455582256, 1.1311414665106574e-06, 0.45493338944441802, 0.54506547941411554, 3.5240316153704533e-06, 0.60512861536107743, 0.39486786060730722, 9.7525092748002545e-06, 0.72682822772674927, 0.27316201976397597, 2.0861086226669762e-05, 0.6859466903146072, 0.31403244859916624, 5.332729240920751e-05, 0.18829335186004104, 0.81165332084754971, 0.00025945729180097395, 0.47416247745093659, 0.52557806525726247, 0.00035725454767968995, 0.43592108982262995, 0.56372165562969045, 0.0010897843172447664, 0.38177825445219243, 0.6171319612305628, 0.0018591181203997816, 0.53394779913297052, 0.46419308274662957, 0.0045928219568831148, 0.57925391139005111, 0.41615326665306585, 0.031283424727716821, 0.74633416562103239, 0.22238240965125072, 0.10385850320845873, 0.85922689359944548, 0.036914603192095684, 0.11120289139689665, 0.77022201413565816, 0.11857509446744517, 0.043321716017784687, 0.83349499849331521, 0.12318328548890009, 0.21041134479899304, 0.69754328950803046, 0.092045365692976513, 0.2123196322567944, 0.7625253259234076, 0.0251550418197981, 0.3312304844007723, 0.64398429234572929, 0.024785223253498315, 0.3273376571679506, 0.67177221993330294, 0.00089012289874644697, 0.48962085422104135, 0.50979569087113141, 0.00058345490782740013, 0.46406754194472771, 0.53571004668683031, 0.00022241136844202664, 0.47346135887494539, 0.5263113326065374, 0.00022730851851715877, 0.56504995961065041, 0.43485471816581145, 9.5322223538082067e-05, 0.92115472651613373, 0.078767563857399928, 7.7709626466389205e-05, 0.88629770933571506, 0.11368043186533899, 2.185879894596154e-05, 0.83862783079609726, 0.16134912621625858, 2.3042987644162106e-05, 0.96631295876816758, 0.033681673271623441, 5.3679602088754854e-06, 0.838644851080249, 0.16135240086071348, 2.7480590375089156e-06, 0.98440741136075338, 0.015591207496872617, 1.3811423740147136e-06, 0.98108244712858661, 0.018916289515771071, 1.2633556422733213e-06, 1.4846190684672449e-10, 0.01214339852203244, 0.98785660132950559, 6.4556439373447552e-10, 0.02042954543601691, 0.97957045391841868, 2.7259985755764897e-09, 0.033928854284672787, 0.96607114298932861, 1.1142560576130246e-08, 0.055447698327182209, 0.94455229053025735, 1.0107812694009762e-07, 0.35119867166374696, 0.64880122725812617, 1.654000159869412e-07, 0.13820873971878719, 0.86179109488119687, 2.3223672356741317e-06, 0.35119789154988373, 0.64879978608288058, 2.4408824174268045e-06, 0.36573819315220912, 0.63425936596537358, 7.2097582121844249e-06, 0.063374404788280117, 0.93661838545350773, 3.0386781128102376e-05, 0.071776381334351963, 0.92819323188451985, 6.5650760385645707e-05, 0.08959463451860368, 0.91033971472101072, 0.00044744139811345109, 0.47407331930863594, 0.52547923929325069, 0.00067487507718573005, 0.38193683059140787, 0.61738829433140652, 0.045779702813143329, 0.56370292717454962, 0.39051737001230707, 0.026856114715831315, 0.74405154428792653, 0.22909234099624223, 0.035269922704626547, 0.81429749900443538, 0.15043257829093798, 0.048924812447079517, 0.76558794795279728, 0.18548723960012309, 0.079046798759930509, 0.87600002175553215, 0.04495317948453733, 0.096444017823476252, 0.8349974619163345, 0.068558520260189354, 0.19376178818706802, 0.76688445204086342, 0.039353759772068501, 0.18454410738301449, 0.81036436229132403, 0.005091530325661486, 0.28381399090869897, 0.68256051372628801, 0.033625495365013074, 0.32660290681419762, 0.64137363863754115, 0.032023454548261152, 0.36082178603061182, 0.61944782985149038, 0.01973038411789782, 0.55761760296151508, 0.44175649223864227, 0.00062590479984271999, 0.55656155484308267, 0.44309188757699419, 0.00034655757992309489, 0.47465596158444351, 0.5251025551443339, 0.00024148327122261258, 0.81529190442053157, 0.18454043976402412, 0.00016765581544424501, 0.89404820563457432, 0.10585342570845434, 9.8368656971371839e-05, 0.94785806600754141, 0.052104185674751766, 3.7748317706797921e-05, 0.83863502030838277, 0.16135050945383145, 1.4470237785757608e-05, 0.94231374952028113, 0.057674745437563832, 1.1505042155123695e-05, 0.9230730445097739, 0.076915559070109427, 1.139642011672311e-05, 0.98243351081584129, 0.017564541661950692, 1.9475222079740559e-06, 0.98569633242627486, 0.014302471968853316, 1.1956048718005995e-06, 1.36240635668259e-10, 0.0097385449777252827, 0.99026145488603401, 5.9340775954517885e-10, 0.01641098147654356, 0.9835890179300486, 2.5125697989399905e-09, 0.02732901032883624, 0.9726709871585939, 3.9446330598836948e-08, 0.17154075963781867, 0.82845920091585068, 1.6504487039990168e-07, 0.35119864919870936, 0.64880118575642032, 2.1344063721831815e-07, 0.1558616494389477, 0.84413813712041508, 2.2998920896228269e-06, 0.21300195540160005, 0.78699574470631029, 4.5359774978689756e-06, 0.097684860082922875, 0.90231060393957918, 1.499302138667569e-05, 0.40355941577024274, 0.59642559120837046, 3.0550408219921344e-05, 0.26516747696249077, 0.73480197262928926, 7.9715726522888093e-05, 0.19987691221010465, 0.8000433720633725, 0.00023722907701973362, 0.43101305814738139, 0.56874971277559883, 0.00066614456557445014, 0.51948652140013785, 0.4798473340342877, 0.046027174247046672, 0.49590637009413346, 0.45806645565881976, 0.057860713654857072, 0.66793220408137521, 0.27420708226376761, 0.028272367394338957, 0.75065193623726156, 0.22107569636839949, 0.036174255405063901, 0.72381951305071224, 0.24000623154422374, 0.074301679440815213, 0.7596978145870138, 0.16600050597217098, 0.10088294103963727, 0.84696143117085221, 0.052155627789510592, 0.15153295257912125, 0.79177271768957602, 0.056694329731302603, 0.16258775171205039, 0.78487693995163177, 0.052535308336317817, 0.30110694619777884, 0.69518335856616831, 0.0037096952360529539, 0.39164241310540737, 0.59625305434697995, 0.012104532547612675, 0.41870766798824777, 0.58001704689659284, 0.0012752851151593718, 0.48371653941491172, 0.51543918103731157, 0.00084427954777679742, 0.52190589673625576, 0.47763978531906004, 0.00045431794468420123, 0.49624968038443801, 0.50342281692885249, 0.00032750268670954889, 0.59544595576665271, 0.40433564200905803, 0.00021840222428923535, 0.89028496661588385, 0.1096241807748886, 9.0852609227485534e-05, 0.88760593168518243, 0.11234214495144711, 5.192336337035488e-05, 0.76460113373795835, 0.23537062864316166, 2.8237618879884617e-05, 0.9285295070485976, 0.071458360491606879, 1.2132459795584331e-05, 0.96713858224879545, 0.03285533272768458, 6.0850235199357034e-06, 0.9073905786752221, 0.092596587895467833, 1.283342930992485e-05, 0.96023262996968806, 0.039763215133852226, 4.1548964598639039e-06, 1.249460449550858e-10, 0.0078166157623807755, 0.99218338411267315, 5.4493784644288464e-10, 0.013189767582097526, 0.98681023187296457, 4.1046417517442006e-09, 0.039074179331734717, 0.96092581656362352, 5.7494043326152375e-08, 0.21882271798998215, 0.78117722451597449, 2.5511722740456355e-07, 0.35119861756541404, 0.64880112731735862, 4.599285302560988e-07, 0.29394179850740626, 0.70605774156406342, 2.2129124459681669e-06, 0.26517499137431694, 0.73482279571323705, 3.8534353451592905e-06, 0.10737338509950629, 0.89262276146514852, 1.7683866271391761e-05, 0.43110770745363519, 0.56887460868009343, 3.5597241834713196e-05, 0.19988573117960604, 0.80007867157855916, 6.5297850503057936e-05, 0.28245446610122588, 0.71748023604827116, 0.00025963522600652424, 0.43596365935187936, 0.56377670542211411, 0.00055629085636108022, 0.45216340899019891, 0.54728030015344009, 0.0011350170661250966, 0.5137607624461642, 0.48510422048771068, 0.012020945557803323, 0.62907855606863516, 0.35890049837356147, 0.0069552027468725254, 0.68284458437285678, 0.31020021288027061, 0.055921114734906352, 0.76235421097882172, 0.18172467428627198, 0.070118303391193959, 0.82022372185086045, 0.10965797475794549, 0.10214531120142367, 0.7953445321949375, 0.1025101566036388, 0.15660989240593035, 0.78964544141622484, 0.053744666177844874, 0.21502193493428201, 0.75718693435163997, 0.027791130714078106, 0.31085898742543339, 0.65152769006198941, 0.037613322512577166, 0.36271872557927254, 0.62807257947832196, 0.0092086949424054591, 0.46811728543474374, 0.53037785806420867, 0.0015048565010475092, 0.50987561748906873, 0.46555137209677477, 0.024573010414156545, 0.63361890611508076, 0.36571833095040768, 0.00066276293451154661, 0.66071512117548392, 0.33898487843992936, 0.00030000038458678053, 0.88366574495923411, 0.11610730419318148, 0.00022695084758433308, 0.86392095832233629, 0.13599444881463338, 8.4592863030316664e-05, 0.88628043827939951, 0.11367821660389803, 4.1345116702401145e-05, 0.93970992205548809, 0.060265658278344798, 2.4419666167040562e-05, 0.96209674471090179, 0.037891461227038382, 1.1794062059785199e-05, 0.94788907403898592, 0.052105890200234789, 5.0357607793574558e-06, 0.98065622512876816, 0.019340428830497556, 3.3460407343359303e-06, 0.94694421969391585, 0.053048860846764551, 6.9194593196676287e-06, 1.1452663474520966e-10, 0.0062799794920764271, 0.99372002039339691, 2.853257157209107e-09, 0.060532214515358576, 0.93946778263138431, 1.6214598025741835e-08, 0.13529329344145699, 0.86470669034394498, 2.1189337446152076e-08, 0.21300244077085834, 0.78699753803980421, 7.3955721368779058e-08, 0.10027259913410227, 0.89972732691017632, 2.7127367296178246e-07, 0.051350744882100251, 0.94864898384422691, 1.1373150305372755e-06, 0.13970426155079299, 0.86029460113417644, 5.6386873784185915e-06, 0.10737319341021356, 0.89262116790240809, 9.1443181671856631e-06, 0.1958725816555755, 0.80411827402625724, 3.0780835544700696e-05, 0.23623548224942459, 0.76373373691503066, 0.018866399425582821, 0.20327052027286135, 0.77786308030155582, 0.00016186564366182682, 0.39934577771479773, 0.60049235664154044, 0.00055400522477567474, 0.50935418305662183, 0.49009181171860233, 0.0011543244279179205, 0.60305481615717316, 0.39579085941490899, 0.0093830174487906804, 0.65711480876058237, 0.33350217379062697, 0.02712460037708728, 0.68364712401760941, 0.28922827560530329, 0.071627369982289954, 0.76713459519396177, 0.16123803482374829, 0.039927699342942116, 0.83843027544955162, 0.12164202520750628, 0.14656321780515202, 0.74588950576415913, 0.10754727643068876, 0.16376035719753274, 0.78848118510568288, 0.047758457696784468, 0.19493473739530479, 0.77867060244504371, 0.026394660159651598, 0.36120498883352231, 0.61929368977117705, 0.019501321395300596, 0.33948133935494107, 0.63170375299979131, 0.028814907645267729, 0.51829821941476095, 0.47954661106164709, 0.0021551695235920544, 0.58059215907068418, 0.40958113371002164, 0.0098267072192940765, 0.71672312276462669, 0.28251674384286046, 0.00076013339251280619, 0.77942164030452332, 0.22019157835612072, 0.00038678133935605036, 0.86461414507544643, 0.13515840341285848, 0.00022745151169498992, 0.87144894223037694, 0.12842333294968455, 0.0001277248199384536, 0.92979811341202045, 0.070152932060478179, 4.895452750144501e-05, 0.95126278805944253, 0.048711574494744239, 2.563744581323103e-05, 0.97227436758017605, 0.02771292781793892, 1.2704601884907007e-05, 0.98237127145535186, 0.01762364926357245, 5.0792810756628159e-06, 0.9883308747746975, 0.011666609041297193, 2.51618400519803e-06, 0.98235119700233953, 0.017645933714761562, 2.8692828988985315e-06, 6.150922647499844e-10, 0.02960697961527442, 0.97039301976963332, 3.901427491963202e-09, 0.072655969185578692, 0.92734402691299378, 2.1823351141247776e-08, 0.15984300523259043, 0.84015697294405844, 1.6425441738108356e-08, 0.11919570971067156, 0.88080427386388671, 9.7614611940378502e-08, 0.26517555229964312, 0.73482435008574487, 5.701319637312147e-07, 0.28035220426049173, 0.71964722560754446, 9.3319247507560906e-07, 0.082751612748402772, 0.91724745405912222, 3.5530676313383773e-06, 0.097684956098771203, 0.90231149083359752, 1.0912076402876782e-05, 0.16873535134981291, 0.8312537365737841, 2.3104211625557428e-05, 0.19200984631769741, 0.8079670494706771, 8.8396020164666851e-05, 0.25937649579303113, 0.74053510818680424, 0.00022977833115246573, 0.31406919157580399, 0.68570103009304362, 0.00051050879418069637, 0.45177723595921199, 0.54771225524660727, 0.013015917668960585, 0.50585204409539097, 0.48113203823564832, 0.026157531993968221, 0.63914270022932174, 0.33469976777671007, 0.016468280264379884, 0.71817991354020883, 0.26535180619541132, 0.061697392653401247, 0.76286893962150992, 0.17543366772508873, 0.062288225164186743, 0.84915493858483237, 0.088556836250980861, 0.080077719163564112, 0.86570864472610753, 0.054213636110328381, 0.125712880508489, 0.82960477806789368, 0.04468234142361735, 0.23580485020524711, 0.72863832476703816, 0.035556825027714609, 0.27782924455626395, 0.70394011219599584, 0.01823064324774025, 0.36138756245183318, 0.62576757838464525, 0.012844859163521632, 0.55509185834700769, 0.44218026106753838, 0.0027278805854539867, 0.59550747330712761, 0.39558043292726031, 0.0089120937656120107, 0.68655511497381561, 0.31247299230750236, 0.00097189271868207243, 0.7954393293525992, 0.20405307501303099, 0.00050759563436990134, 0.90561026643893916, 0.094181793366656483, 0.00020794019440424204, 0.93326029567241164, 0.06663937315513993, 0.00010033117244839944, 0.97155646884745128, 0.028393540482592489, 4.9990669956191124e-05, 0.98709918457349344, 0.01287555978671461, 2.5255639792054125e-05, 0.96891974492996114, 0.031069474141213794, 1.0780928825086651e-05, 0.96761573797445677, 0.032376688412043095, 7.5736135001059529e-06, 0.90094551641916587, 0.099050763302711287, 3.7202781226453157e-06, 0.99133691074756192, 0.0086613359312496859, 1.7533211885125555e-06, 9.6097254311358254e-11, 0.0040664325175955333, 0.99593356738630712, 4.2020893703699151e-10, 0.0068795779582577097, 0.99312042162153336, 3.9879837830057039e-09, 0.063374861452971831, 0.93662513455904439, 3.0080683037737539e-08, 0.077439687097355894, 0.92256028282196101, 7.7186008207421418e-08, 0.039974282905150094, 0.96002563990884171, 3.6885786560369713e-07, 0.076875499296983479, 0.92312413184515085, 7.7055439693921474e-07, 0.069475346224996848, 0.9305238832206062, 2.3788787821454687e-06, 0.12468665514378201, 0.87531096597743596, 6.8106732164348888e-06, 0.1427741686108622, 0.85721902071592138, 2.5733347849939136e-05, 0.16308427171890702, 0.83688999493324312, 6.6605014300140638e-05, 0.31161863783095967, 0.68831475715474022, 0.00018680201424775851, 0.38941372835540933, 0.61039946963034297, 0.00061803537808386767, 0.55393249902621355, 0.44544946559570259, 0.0054109434599216352, 0.5330160712634614, 0.46157298527661689, 0.0097375594561176539, 0.68569116673948893, 0.30457127380439342, 0.0039141582307427852, 0.72897239469063568, 0.2671134470786215, 0.028926609312672959, 0.77915329683199297, 0.19192009385533398, 0.053433332039870884, 0.8452765375847382, 0.10129013037539092, 0.064694683146133941, 0.85436453433854931, 0.080940782515316792, 0.13413179047744975, 0.81527466221209133, 0.050593547310458876, 0.17498194500100919, 0.79836342861812759, 0.026654626380863269, 0.30176405042849586, 0.68253987551331341, 0.015696074058190668, 0.44444174379002854, 0.53878282121133103, 0.016775434998640436, 0.56975274670981035, 0.41169688556828721, 0.018550367721902401, 0.62105948045207948, 0.37692692092350022, 0.0020135986244202821, 0.73838910877870134, 0.26044982141749318, 0.0011610698038053676, 0.84383025163554393, 0.15567813415622619, 0.00049161420822986111, 0.89605580056509737, 0.10369808792428638, 0.00024611151061605928, 0.94064348769367923, 0.059228702074037368, 0.00012781023228344892, 0.97198351665198623, 0.02796355948371226, 5.2923864301402124e-05, 0.98155001689620114, 0.018424084485191394, 2.589861860750302e-05, 0.98846266666253302, 0.01152586885723272, 1.1464480234292309e-05, 0.98167521430374161, 0.018316614933378158, 8.1707628801724633e-06, 0.99179140859534576, 0.008205852149880663, 2.7392547735057506e-06, 0.99230972099150416, 0.0076883440461310909, 1.9349623647716529e-06, 9.9365586388011134e-10, 0.0370197924262224, 0.96298020658012173, 3.263280530733794e-09, 0.047037725201323412, 0.95296227153539603, 9.9735532843536177e-09, 0.056541359702757379, 0.94345863032368926, 1.3430512891640197e-08, 0.059870119660389826, 0.94012986690909728, 5.3626335247782195e-08, 0.049400900691735312, 0.95059904568192943, 1.8251676122974967e-07, 0.12256942989678073, 0.87743038758645808, 5.2922450677873055e-07, 0.076875486968713325, 0.92312398380677985, 1.8404048442577517e-06, 0.12432874015114775, 0.875669419444008, 6.2614999735686165e-06, 0.14538888263629424, 0.85460485586373214, 2.1023550747395797e-05, 0.18484238552335236, 0.81513659092590041, 0.0063906682531892755, 0.22131768840776816, 0.77229164333904254, 0.00017232974892336268, 0.31131130515430244, 0.68851636509677416, 0.0084904521815259079, 0.49659432357304756, 0.49491522424542644, 0.013467487739868876, 0.507855321126509, 0.47867719113362212, 0.011177896815878621, 0.67098380378005851, 0.31783829940406289, 0.018719412343690768, 0.71070604571793838, 0.27057454193837094, 0.029818801988092305, 0.81987452935681904, 0.15030666865508854, 0.043634440046455995, 0.85188345323689274, 0.10448210671665126, 0.071265570563405545, 0.86336657885860391, 0.065367850577990577, 0.090578007986616166, 0.8572150282070562, 0.052206963806327632, 0.17442474222818516, 0.76673152015876533, 0.058843737613049507, 0.33994821113117157, 0.64376032368387026, 0.016291465184958123, 0.41266805186909161, 0.56313808378591601, 0.024193864344992419, 0.56348149705322992, 0.43025977856840303, 0.00625872437836712, 0.68925181451467832, 0.3082279318432869, 0.0025202536420348394, 0.80676473084094369, 0.19209395330517381, 0.0011413158538825963, 0.88637676130418119, 0.1130178461429087, 0.00060539255291009798, 0.927608488602367, 0.072146921450505927, 0.00024458994712709065, 0.93409735164382557, 0.065778820831101786, 0.00012382752507264516, 0.95955613130039441, 0.040384600727647969, 5.9267971957485057e-05, 0.97011376253539017, 0.029863451160091054, 2.2786304518811963e-05, 0.97785636843210832, 0.022133673016754722, 9.9585511369828196e-06, 0.98883089378959566, 0.011162923574077121, 6.1826363272136429e-06, 0.99132115144217314, 0.0086752529754306317, 3.5955823961140894e-06, 0.99391937637817918, 0.0060787241602671032, 1.8994615537603742e-06, 2.1883111168533595e-10, 0.097685303159883413, 0.90231469662128561, 1.9619342309380787e-09, 0.024935516727982106, 0.97506448131008361, 3.5286318780874051e-09, 0.076875527381861097, 0.92312446908950707, 1.1174111479027537e-08, 0.021193277834474996, 0.97880671099141348, 3.9014624280688761e-08, 0.027700502337816992, 0.97229945864755873, 1.9855753294600787e-07, 0.056732691047394423, 0.94326711039507272, 5.5649301216555306e-07, 0.094581880780753844, 0.90541756272623397, 2.1048608818736715e-06, 0.10587348637527356, 0.89412440876384458, 6.3394180477664409e-06, 0.1480302505364014, 0.85196341004555076, 1.7495901445102562e-05, 0.17312172990195959, 0.82686077419659532, 0.0049196783937341055, 0.2536698512655457, 0.74141047034072016, 0.0045293250465165205, 0.34508495218051799, 0.65038572277296547, 0.00048661010877909847, 0.45371542150162869, 0.54579796838959216, 0.0071844113231145897, 0.46167355915152009, 0.53114202952536527, 0.005889581720519464, 0.60056175055146765, 0.39354866772801289, 0.010782119472985954, 0.70945947440517587, 0.27975840612183822, 0.01642973426724444, 0.82006011621068664, 0.16351014952206883, 0.041788042636438386, 0.85815102554979483, 0.10006093181376677, 0.06441789360108971, 0.85876918013974235, 0.076812926259168024, 0.1083871738371005, 0.82396050886044858, 0.067652317302450873, 0.24327610456501764, 0.71505255245120514, 0.041671342983777108, 0.33455571864246691, 0.62408368863533703, 0.041360592722195916, 0.4376036981926188, 0.55108443115460148, 0.0113118706527797, 0.61343631730047987, 0.36718281992332857, 0.019380862776191631, 0.74969640877153532, 0.24368332139839324, 0.0066202698300714558, 0.85119990263626566, 0.14753869354684521, 0.0012614038168891181, 0.91305101156710244, 0.086394045069231262, 0.00055494336366611167, 0.94159826524719181, 0.058182865450185708, 0.00021886930262248174, 0.96696107098195949, 0.032927434102496211, 0.00011149491554430661, 0.95834583136945961, 0.041604247394788012, 4.9921235752383312e-05, 0.96462998331574712, 0.035350763692445421, 1.9252991807457744e-05, 0.98934203780505781, 0.010648728623461537, 9.2335714806298587e-06, 0.98241227853886326, 0.017582582526883196, 5.1389342535582088e-06, 0.9931869095510869, 0.0068095909833367435, 3.4994655764008678e-06, 0.99244970892018214, 0.0075473668794043521, 2.9242004134331896e-06, 3.339859439043867e-10, 0.0096885070803255629, 0.9903114925856884, 6.6121992840305402e-10, 0.039974285964173864, 0.96002571337460618, 5.7939805196932679e-09, 0.056732701983391663, 0.94326729222262784, 1.293760096272363e-08, 0.022056853662269983, 0.97794313340012906, 3.0749706047563064e-08, 0.0392496563128246, 0.96075031293746938, 1.2920621726186205e-07, 0.04977673026423924, 0.95022314052954349, 4.0424534540435191e-07, 0.056144245701243024, 0.94385535005341159, 1.3477013411494762e-06, 0.091401519396331718, 0.90859713290232713, 4.0981074768474016e-06, 0.089326336031237741, 0.91066956586128545, 1.8237107152639052e-05, 0.1740783281776366, 0.82590343471521077, 0.0038803579363370817, 0.18514876347033832, 0.81097087859332462, 0.00013533082420921915, 0.31868429584681496, 0.68118037332897585, 0.0065781577655604339, 0.39487189693243979, 0.5985499453019999, 0.012532913921255872, 0.50637085192594344, 0.48109623415280062, 0.01536184158953059, 0.53909519798637417, 0.4455429604240953, 0.0051958393538176079, 0.66977335234010082, 0.32503080830608172, 0.015235236726309416, 0.78053866575827613, 0.2042260975154144, 0.038499342715402084, 0.82466179329259126, 0.1368388639920067, 0.08425963752955834, 0.80963694495948102, 0.10610341751096065, 0.12191915369695405, 0.79141298491078516, 0.086667861392260737, 0.22601809958995775, 0.73642314957685306, 0.037558750833189151, 0.32756897296451915, 0.64823811415012966, 0.02419291288535114, 0.44785970630845934, 0.5258832162877094, 0.026257077403831305, 0.61337403998392526, 0.38035221696858235, 0.0062737430474923347, 0.79559588376442836, 0.20095333978995925, 0.0034507764456123725, 0.84284029889699708, 0.15540294105933913, 0.0017567600436638351, 0.93424840284558153, 0.065115603521040649, 0.00063599363337777368, 0.94134185197668685, 0.058422887925821496, 0.00023526009749169207, 0.9666607629679429, 0.033233937014115193, 0.00010530001794187947, 0.98350184818462183, 0.016454121011921057, 4.403080345709061e-05, 0.98772145143229284, 0.012260272830276267, 1.8275737430953548e-05, 0.99106996043374562, 0.0089206302010749125, 9.4093651794501396e-06, 0.99271879949982789, 0.0072760267255096494, 5.1737746624565255e-06, 0.99500086432646317, 0.0049959565442079202, 3.1791293289832205e-06, 0.99413373450184239, 0.0058634524709917264, 2.8130271657988598e-06, 1.4890074595651799e-10, 0.056732702303652287, 0.94326729754744687, 5.5164699221405322e-10, 0.0054754415857801572, 0.99452455786257288, 1.6855214298597994e-09, 0.015671207920404839, 0.98432879039407373, 6.3441770089935905e-09, 0.051350758486430906, 0.94864923516939204, 2.4237545120856208e-08, 0.036720221326562538, 0.96327975443589242, 9.9809191992937716e-08, 0.066937067907946388, 0.93306283228286169, 3.5070831958991804e-07, 0.060125873813705412, 0.93987377547797502, 1.4107925778350402e-06, 0.06489431342917816, 0.93510427577824407, 0.0042461469762375631, 0.11437218166870533, 0.88138167135505718, 1.469222381146675e-05, 0.17250839273092008, 0.82747691504526844, 4.4989382244150631e-05, 0.17401496905303238, 0.82594004156472345, 0.00012918933912872213, 0.27215846728718202, 0.7277123433736894, 0.0031919472999223496, 0.36601536672116297, 0.63079268597891469, 0.0088518902292733757, 0.39965455862973115, 0.59149355114099544, 0.0086857091673266263, 0.53029596667999723, 0.46101832415267618, 0.0081001904119084676, 0.62337957179697701, 0.36852023779111459, 0.01796662965674432, 0.72294789834748074, 0.25908547199577486, 0.03036864014526687, 0.77337723160873328, 0.19625412824599966, 0.045280776900217222, 0.80584766031253818, 0.14887156278724464, 0.1079457271478957, 0.8020894941362412, 0.089964778715863017, 0.23833738414678105, 0.71604810718646128, 0.045614508666757772, 0.32946417908479775, 0.64924454644743579, 0.021291274467766488, 0.53905579612338017, 0.44198968296084262, 0.018954520915777207, 0.59742330889998618, 0.38780499192689893, 0.014771699173114914, 0.79456694214993939, 0.19966950131706829, 0.0057635565329923139, 0.88375940901024241, 0.11098341778069606, 0.0052571732090615081, 0.903451493353706, 0.0959012287837505, 0.00064727786254343048, 0.96367159898140298, 0.036067038447164058, 0.00026136257143289087, 0.98275802786434341, 0.017140331617144153, 0.00010164051851241006, 0.98577611361797401, 0.014180183366550192, 4.3703015475690965e-05, 0.98791129714047454, 0.012067984414869278, 2.0718444656275322e-05, 0.99412999128844415, 0.0058617103010831116, 8.2984104727447807e-06, 0.99377704428800751, 0.0062178635519437699, 5.0921600487546242e-06, 0.99507421822732978, 0.0049219087753953842, 3.8729972747183382e-06, 0.99389431209247481, 0.006102067798638167, 3.6201088870785132e-06, 1.3436663246182434e-10, 0.051350758805309378, 0.94864924106032411, 3.0245333555268103e-10, 0.034830021882150085, 0.9651699778153966, 1.6293431669884804e-09, 0.045584883390177723, 0.95441511498047915, 5.7935011524760405e-09, 0.0094072243189571164, 0.99059276988754164, 2.2920191518573447e-08, 0.034830021094373775, 0.96516995598543476, 7.1552742834805665e-08, 0.021878552531952946, 0.97812137591530424, 2.4066169516794339e-07, 0.041384826584195365, 0.95861493275410947, 9.1208389540814795e-07, 0.098191497692471347, 0.90180759022363333, 3.7366780764952134e-06, 0.097684938162729204, 0.90231132515919432, 1.3322018292023556e-05, 0.11010237579519749, 0.88988430218651049, 4.4816354764194115e-05, 0.18457279033563193, 0.81538239330960383, 0.00012953164247918807, 0.22809125560451687, 0.77177921275300398, 0.00043620745611727978, 0.3562993175278219, 0.64326447501606077, 0.0030147186049377028, 0.37121379078132843, 0.62577149061373394, 0.0031459523393467916, 0.54958558651158618, 0.4472684611490671, 0.0062650069699376719, 0.50384295133666768, 0.48989204169339479, 0.016546717599393645, 0.71056431338426873, 0.27288896901633775, 0.053285192434476346, 0.63106070864449748, 0.3156540989210263, 0.065835201188771772, 0.79376529836335186, 0.14039950044787641, 0.13616974495645434, 0.81543121262958773, 0.048399042413957975, 0.2175380165935713, 0.70686029889198354, 0.075601684514445128, 0.38976360615743039, 0.56761044406685002, 0.042625949775719561, 0.48429319255322578, 0.49849349271620019, 0.017213314730574213, 0.65577844118514184, 0.33645207752045642, 0.0077694812944017625, 0.81328991779179638, 0.18213927858367787, 0.0045708036245257289, 0.90155922851848225, 0.096272735785017216, 0.0021680356965005066, 0.91640021854328324, 0.082813337815603849, 0.00078644364111294686, 0.9700403361305322, 0.029691524984771501, 0.0002681388846962445, 0.98137240893801769, 0.018521136275595661, 0.00010645478638659134, 0.97974481001879721, 0.020214428991367224, 4.07609898355343e-05, 0.98917056485208699, 0.0108132405303822, 1.6194617530872471e-05, 0.98619159540055856, 0.013799264712834254, 9.1398866072316556e-06, 0.99671927679643746, 0.0032764685165851859, 4.2546869772530814e-06, 0.99595685930891742, 0.004039215597667763, 3.9250934147206801e-06, 0.96762031774846635, 0.032376841652539595, 2.840598993960128e-06, 7.2097396335411564e-11, 0.029194492376581511, 0.97080550755132111, 4.0179039697768676e-10, 0.049025365025077261, 0.95097463457313236, 9.5066065405223261e-10, 0.028181215348281424, 0.97181878370105801, 3.7831465448186402e-09, 0.02603511334043445, 0.97396488287641891, 1.2897453100992321e-08, 0.033226557647600172, 0.96677342945494671, 5.5540205241171822e-08, 0.035987832474261745, 0.96401211198553305, 2.4998164072527338e-07, 0.042044199734704649, 0.95795555028365453, 8.1670004618803465e-07, 0.055895756937254425, 0.94410342636269939, 3.5557183280460435e-06, 0.095593906464581158, 0.90440253781709079, 1.185475439547221e-05, 0.098620850863316845, 0.9013672943822878, 0.0032133768311381028, 0.16074310494565341, 0.83604351822320844, 0.0032911711794620145, 0.21529142647254981, 0.78141740234798807, 0.0067920595635109242, 0.29794333851398391, 0.69526460192250528, 0.0034341497501990908, 0.39114545017058466, 0.60542040007921616, 0.0034709908480684542, 0.44876614745630133, 0.54776286169563015, 0.0038885669818436775, 0.59253241363734921, 0.40357901938080715, 0.026798279846251247, 0.6874529842694449, 0.28574873588430377, 0.046865210150335936, 0.74658326805472752, 0.20655152179493647, 0.050973212054560915, 0.73820502975669444, 0.21082175818874463, 0.11582050725305687, 0.7975136432918819, 0.086665849455061283, 0.23845744267710173, 0.73405434168222672, 0.027488215640671592, 0.38642095964740025, 0.58414770015039585, 0.02943134020220398, 0.59032075382646843, 0.39956750147623415, 0.010111744697297306, 0.7188743196947609, 0.27129834517111084, 0.009827335134128222, 0.8880468278643705, 0.10514287521247102, 0.006810296923158439, 0.89523876139976111, 0.10220887125492693, 0.0025523673453119598, 0.93299311307193045, 0.066093774773800032, 0.00091311215426958592, 0.96948075560435842, 0.030215852435740143, 0.00030339195990135022, 0.98743151006175234, 0.012457602960085305, 0.00011088697816232922, 0.98863307660542143, 0.011327620194609483, 3.9303199969077409e-05, 0.99192771052491746, 0.0080567176245565537, 1.5571850525886394e-05, 0.9915449244966672, 0.0084473735206991758, 7.701982633683089e-06, 0.98896457303458574, 0.01103034209933974, 5.0848660745897837e-06, 0.99739916086639624, 0.0025977259776725765, 3.113155931097272e-06, 0.9959521110731242, 0.0040442348735576072, 3.6540533181947174e-06, 4.4199695987302964e-11, 0.00079135070310652029, 0.9992086492526937, 2.2304041455284082e-10, 0.015230278483834668, 0.9847697212931249, 6.8854433767571221e-10, 0.015230278476744913, 0.9847697208347107, 2.8192807958977872e-09, 0.027144862577934682, 0.9728551346027845, 1.0778809988163945e-08, 0.031080299962911805, 0.96891968925827832, 4.8193427306082821e-08, 0.031456581535049252, 0.96854337027152348, 1.807015419342082e-07, 0.031182021533312645, 0.96881779776514543, 7.5681741952125855e-07, 0.071778508130552518, 0.92822073505202796, 2.5644348903010699e-06, 0.084181389562409448, 0.91581604600270017, 1.0818550821281452e-05, 0.10868723168293189, 0.89130194976624688, 0.0035761069920280547, 0.13210190469280431, 0.8643219883151676, 0.00012820012897510902, 0.20853946141899798, 0.791332338452027, 0.00039227128709937755, 0.27635328768831097, 0.72325444102458969, 0.0040385455059335235, 0.33566501172958918, 0.66029644276447741, 0.0036193142363509698, 0.45968037923984117, 0.53670030652380785, 0.019002973720688467, 0.5081988933496111, 0.4727981329297003, 0.016204891781588775, 0.71500761241990485, 0.26878749579850642, 0.042688688205912047, 0.71454471112403395, 0.2427666006700539, 0.1382598686175068, 0.77437668498850887, 0.087363446393984384, 0.12441612787888208, 0.73407528189227178, 0.14150859022884615, 0.31785277970529957, 0.61153787636852763, 0.070609343926172824, 0.45274998924439597, 0.49360944632781095, 0.053640564427793115, 0.55663135865760371, 0.40947694225532671, 0.033891699087069516, 0.79868554174638928, 0.18237089641179172, 0.018943561841819025, 0.84486569202216188, 0.14752370666445122, 0.0076106013133868094, 0.91693074199889102, 0.080284369619351315, 0.0027848883817575515, 0.93265969205335908, 0.066400902707302881, 0.00093940523933805028, 0.95821883063149993, 0.041428769783705847, 0.00035239958479424047, 0.9774688774728677, 0.022424697623625742, 0.00010642490350651342, 0.98300434716428664, 0.016952531015567419, 4.3121820145886123e-05, 0.98810034637639721, 0.01188169543503511, 1.7958188567716007e-05, 0.98737955654446385, 0.012612013242308748, 8.430213227496385e-06, 0.99709656907768007, 0.0028977155863713871, 5.7153359486050302e-06, 0.98712043664391691, 0.012875836995233881, 3.7263608491763499e-06, 0.9970893397129047, 0.0029074249700652114, 3.2353170301639181e-06, 4.3888955063189543e-11, 0.00069907988458812315, 0.99930092007152294, 1.1754043539367822e-10, 0.000724357199774671, 0.99927564268268498, 6.1289453853422841e-10, 0.0080144137737966602, 0.99198558561330874, 2.4333146707723345e-09, 0.02770050335113769, 0.97229949421554762, 8.8905864030767153e-09, 0.034098665837255612, 0.965901325272158, 4.0007630845511952e-08, 0.024013869669660209, 0.975986090322709, 1.7184897608261227e-07, 0.063748025836775649, 0.93625180231424832, 6.9712268733252152e-07, 0.039086123597828377, 0.96091317927948428, 2.5831802294727531e-06, 0.05848385440586986, 0.94151356241390061, 1.0526998699058674e-05, 0.10979251231594027, 0.89019696068536069, 3.4459274098236631e-05, 0.15284915124105034, 0.84711638948485146, 0.0044856204022698971, 0.21748054175923309, 0.77803383783849689, 0.00038571747310749794, 0.25769559343018633, 0.74191868909670622, 0.011963826053637832, 0.40972025970841741, 0.57831591423794482, 0.011437298748728635, 0.43569843754256626, 0.55286426370870512, 0.0089947583370318662, 0.6184467122975541, 0.37255852936541406, 0.035309177334161806, 0.60325080739663639, 0.36144001526920166, 0.040297966404177196, 0.63886293029668306, 0.32083910329913978, 0.10125893136242717, 0.71551602800859582, 0.18322504062897702, 0.223448691256009, 0.58317905835789197, 0.19337225038609901, 0.34548155099428157, 0.58009718165983104, 0.07442126734588736, 0.43013936485315829, 0.53680438414769005, 0.033056250999151639, 0.61905110162159371, 0.33782031038761423, 0.043128587990792062, 0.75968307867829277, 0.21924063889519718, 0.021076282426509937, 0.85766715474075783, 0.13445440720263788, 0.0078784380566042384, 0.90288678811449841, 0.093749511328208177, 0.0033637005572933125, 0.96811646495403314, 0.030678495898637168, 0.0012050391473296292, 0.95089363517350589, 0.048786315463027113, 0.0003200493634669237, 0.97573817535568441, 0.024145168815375446, 0.00011665582894015838, 0.99367518240783481, 0.0062853602086005173, 3.9457383564631756e-05, 0.99114421679596987, 0.0088351856626138828, 2.0597541416095451e-05, 0.98326681111255509, 0.016722843872560747, 1.03450148842026e-05, 0.99220181813099639, 0.0077916831060220303, 6.4987629815080154e-06, 0.98241270058943386, 0.017582590080472613, 4.7093300936084676e-06, 0.99712459543069476, 0.0028714745167780892, 3.9300525271690069e-06, 2.7378520631881889e-11, 0.018323631138197263, 0.98167636883442433, 1.2052212251421604e-10, 0.012152853843749001, 0.98784714603572887, 4.7293100527401347e-10, 0.015447597425960255, 0.98455240210110873, 2.3770398395229041e-09, 0.013518639561767774, 0.9864813580611923, 7.8637346462345538e-09, 0.033483469953700086, 0.96651652218256523, 3.5647561754668079e-08, 0.026723682033058294, 0.9732762823193799, 1.4844428637083042e-07, 0.034387486461628987, 0.96561236509408466, 6.0889521621561119e-07, 0.042638615750026365, 0.95736077535475739, 2.1224683916353647e-06, 0.097169346848809554, 0.90282853068279878, 9.4610359789014307e-06, 0.051350272980832536, 0.94864026598318862, 0.0049279203459382456, 0.14032102283869916, 0.85475105681536268, 0.00012291526472504904, 0.15959566862730168, 0.84028141610797324, 0.00043392494435007972, 0.23511412741233956, 0.76445194764331037, 0.011874908686974274, 0.33813438856531086, 0.64999070274771487, 0.0072754448510199445, 0.40313396290282921, 0.58959059224615096, 0.021887809915287919, 0.58394471380190371, 0.39416747628280835, 0.032295125140880981, 0.49707772923103155, 0.47062714562808733, 0.074250520848829632, 0.66937988124340253, 0.25636959790776775, 0.1099557710066984, 0.68905229273932522, 0.20099193625397641, 0.19159918058635889, 0.71760025897447011, 0.090800560439171021, 0.42917814742742499, 0.55048271740748989, 0.020339135165085273, 0.51832997904470879, 0.4593390027965169, 0.02233101815877454, 0.57265786634794857, 0.40591679127907632, 0.021425342372975154, 0.82240898436026277, 0.15277251440782993, 0.024818501231907313, 0.86864798604493454, 0.12154538284049969, 0.0098066311145658461, 0.93836792759720689, 0.057772409501247034, 0.0038596629015461925, 0.96660059357272565, 0.032110039952553335, 0.0012893664747210358, 0.96312795810933927, 0.036452955712746496, 0.00041908617791427548, 0.97942566613234527, 0.020450651737463313, 0.00012368213019137324, 0.9917480209001196, 0.0082068355725797709, 4.5143527300700856e-05, 0.99655519962274208, 0.0034238180679699425, 2.0982309288017537e-05, 0.99722361082503641, 0.0027652958623038217, 1.1093312659843271e-05, 0.99787731128663626, 0.0021163825452772747, 6.3061680865358122e-06, 0.99775001773541105, 0.0022449764528887466, 5.0058117001726669e-06, 0.9934580702019119, 0.0065309506133623433, 1.0979184725732311e-05, 1.7511407197797245e-11, 0.00022175643672111715, 0.9997782435457675, 6.9504524600977934e-11, 0.009246530576511024, 0.99075346935398434, 4.7326191949812714e-10, 0.020394776296029635, 0.97960522323070853, 1.6481905805489844e-09, 0.006183412077557863, 0.99381658627425162, 7.4661109877518518e-09, 0.031456582816191458, 0.96854340971769759, 3.3062905832505243e-08, 0.042044208854881547, 0.95795575808221256, 1.6292748863877625e-07, 0.024897488666784786, 0.97510234840572663, 5.5029117087644341e-07, 0.039107851461809104, 0.96089159824701997, 2.7196647548860221e-06, 0.062809030530917118, 0.93718824980432802, 1.1264414578094582e-05, 0.086039056972500028, 0.91394967861292198, 3.2859306410116049e-05, 0.10422421809251206, 0.8957429226010778, 0.0075239783960994455, 0.17950087585610025, 0.81297514574780028, 0.00041462532727106041, 0.25490163266672039, 0.7446837420060084, 0.0097942997080261596, 0.29396480311563605, 0.69624089717633775, 0.020116220796997084, 0.37928862346267783, 0.60059515574032507, 0.029684742810971144, 0.54827932642773602, 0.42203593076129275, 0.045373111520344275, 0.67509149981043781, 0.27953538866921779, 0.056440911995126582, 0.62258486931532042, 0.32097421868955284, 0.067054063161592389, 0.77405834410019403, 0.15888759273821346, 0.16059537517490682, 0.74155202126060504, 0.097852603564488147, 0.27688185792734227, 0.59190136025604712, 0.13121678181661051, 0.4881873237408641, 0.45397359461573883, 0.057839081643396968, 0.7289080071501608, 0.2445199924432194, 0.026572000406619858, 0.81789665319636884, 0.1573605185546515, 0.024742828248979696, 0.78582066612439938, 0.20158561113891454, 0.012593722736686163, 0.96249124557469046, 0.032678827686928716, 0.004829926738380951, 0.95445948645458389, 0.04407233773830041, 0.0014681758071157095, 0.97946770234799052, 0.02010093181615474, 0.00043136583585478948, 0.98130479288638905, 0.018532484487115006, 0.00016272262649596838, 0.98162352424793353, 0.018313794767152655, 6.2680984913820494e-05, 0.98575174919864261, 0.014224144867249884, 2.4105934107445664e-05, 0.99652195739581984, 0.0034610116781912952, 1.70309259889367e-05, 0.97276885264424784, 0.027222894546339853, 8.2528094122116463e-06, 0.99695740758510432, 0.0030342932228727597, 8.2991920229771441e-06, 0.99446164937779757, 0.0055269535040442571, 1.1397118157986199e-05, 1.4187068837724371e-11, 0.00016054974935304818, 0.99983945023645981, 5.715327212215367e-11, 0.021193278070079785, 0.97880672187276696, 3.2999678230222699e-10, 0.029728955965103266, 0.97027104370490003, 1.5979272319802827e-09, 0.058484005387143365, 0.94151599301492939, 7.1179770126793832e-09, 0.034830021644765251, 0.96516997123725778, 2.4371933812835587e-08, 0.033594794856526007, 0.96640518077154014, 1.1942460612760051e-07, 0.050868191962605856, 0.94913168861278807, 5.884704560091193e-07, 0.052456570500484724, 0.94754284102905928, 2.8410714601984615e-06, 0.077374795730142401, 0.92262236319839741, 9.3211675545631986e-06, 0.11782901767715663, 0.88216166115528882, 3.9345881457697885e-05, 0.10586954353028988, 0.89409111058825241, 0.0001405174272693304, 0.20967228324452339, 0.79018719932820725, 0.00054998713503999442, 0.2301343614117039, 0.7693156514532562, 0.0012577130436678496, 0.35075699996733722, 0.64798528698899494, 0.028674514115622787, 0.44135027504055413, 0.52997521084382315, 0.0097800513521887865, 0.51474881366893599, 0.47547113497887511, 0.032067924665140454, 0.6052776622641477, 0.36265441307071189, 0.0950402629788107, 0.52662013986132783, 0.37833959715986143, 0.058359927550077247, 0.65123852594302745, 0.29040154650689526, 0.30676510578518651, 0.511511494855586, 0.18172339935922752, 0.39807812005322452, 0.47131611518985894, 0.13060576475691657, 0.69469774016045083, 0.26731493814817442, 0.037987321691374823, 0.61569958793272406, 0.3230686221530723, 0.061231789914203603, 0.72417678120376272, 0.24150383528473066, 0.034319383511506589, 0.91453093874707181, 0.072185692130575421, 0.01328336912235286, 0.94061063280727397, 0.054632533887668429, 0.0047568333050575827, 0.95769458075676495, 0.040201562542849685, 0.0021038567003853945, 0.9627929884309181, 0.036590237600538186, 0.00061677396854360668, 0.96993609453164731, 0.029857981925494666, 0.00020592354285794284, 0.99409111054581212, 0.0058435971952659543, 6.5292258921788846e-05, 0.99566306061244092, 0.0043017670863138048, 3.5172301245249531e-05, 0.98665977709230013, 0.01332140114790183, 1.882175979812223e-05, 0.99726662916713416, 0.0027211872188618036, 1.2183614004143976e-05, 0.93972420864926431, 0.060266574508937097, 9.216841798684859e-06, 0.98591063450261096, 0.014053864888318803, 3.5500609070171877e-05, 1.5722910771986251e-11, 0.00015924225241121373, 0.99984075773186587, 5.4960143058987886e-11, 0.030003593882343266, 0.96999640606269655, 2.6307862914140925e-10, 0.011630614333934525, 0.9883693854029868, 1.2982856773412406e-09, 0.039974285938707624, 0.96002571276300674, 5.4748242528577134e-09, 0.023663936054151687, 0.976336058471024, 3.1316150502647088e-08, 0.027235915413429776, 0.97276405327041982, 1.1321209554098173e-07, 0.042595620639255725, 0.95740426614864882, 5.9795690136218268e-07, 0.017438173155925336, 0.98256122888717334, 2.4649363394370085e-06, 0.053907602548449743, 0.94608993251521079, 7.216653795107126e-06, 0.098960216184005897, 0.90103256716219904, 4.5191500880007834e-05, 0.10229605010773089, 0.89765875839138898, 0.00010975898091841597, 0.14466735403110442, 0.85522288698797722, 0.00038007082176860416, 0.27872926403735859, 0.72089066514087285, 0.0011900061186975064, 0.35078077855185269, 0.64802921532944968, 0.02805540116460423, 0.45341211080212007, 0.51853248803327578, 0.010764024114413793, 0.45329345171126378, 0.53594252417432242, 0.065488732167637911, 0.65519001976821012, 0.27932124806415198, 0.072212199387054393, 0.72245576876949025, 0.20533203184345539, 0.13561030828027243, 0.80012275719790971, 0.06426693452181792, 0.38372846175915604, 0.47988228303541325, 0.13638925520543058, 0.43719277419040659, 0.33645757754889161, 0.22634964826070161, 0.62347075615045644, 0.28788873833801987, 0.088640505511523623, 0.58109227420307807, 0.351371950279949, 0.067535775516973026, 0.79400292795233607, 0.18105297486625949, 0.024944097181404411, 0.9139607174946488, 0.072762585910215269, 0.013276696595135992, 0.95135494406111376, 0.043067632291405651, 0.0055774236474804657, 0.92596556385245343, 0.071261042931099375, 0.0027733932164471053, 0.97306551752294235, 0.026275716114251176, 0.00065876636280652915, 0.98640080969260957, 0.013347995496412926, 0.00025119481097760158, 0.99161869525162583, 0.0082682879375069861, 0.00011301681086729397, 0.98789635835861556, 0.01206780192785129, 3.5839713533250897e-05, 0.99694085974943014, 0.0030367468212366923, 2.2393429333304457e-05, 0.99800256657017805, 0.0019865525553096376, 1.0880874512223259e-05, 0.99821633293335454, 0.0017763860429823425, 7.2810236631001788e-06, 0.99826454295271017, 0.0017301106657655668, 5.3463815241317353e-06, 1.4776740137602711e-11, 0.00013414022858605908, 0.99986585975663733, 4.6300513708786933e-11, 0.01965426030242572, 0.9803457396512737, 2.6234330573059661e-10, 0.00036238377872868313, 0.99963761595892808, 1.613504112766891e-09, 0.00089109455206720872, 0.99910890383442863, 6.1096903584786802e-09, 0.013689582780224219, 0.98631041111008544, 3.806569167025583e-08, 0.017161748835659331, 0.98283821309864894, 1.0076978395624472e-07, 0.019654258322780158, 0.98034564090743592, 4.9559954932050257e-07, 0.044953909537167498, 0.95504559486328322, 2.2987489996242469e-06, 0.013030469946320946, 0.98696723130467956, 7.397591693764927e-06, 0.1464892998856431, 0.85350330252266304, 4.3292944525184965e-05, 0.19050426515518376, 0.80945244190029109, 0.019035109959053019, 0.08789496116983575, 0.89306992887111114, 0.00064689527722181612, 0.23608992967694434, 0.76326317504583385, 0.048395461253001142, 0.29795587884907565, 0.6536486598979232, 0.0046861036728838915, 0.50318430900855238, 0.49212958731856371, 0.01122471857926274, 0.49987869011216157, 0.4888965913085756, 0.12382094198014931, 0.52409996588084928, 0.3520790921390014, 0.1605005119790715, 0.53524899187843811, 0.30425049614249033, 0.20965967811493125, 0.59162113930744409, 0.19871918257762458, 0.29276594099134395, 0.54074079047904344, 0.16649326852961249, 0.49837013587232309, 0.38353883809910699, 0.11809102602856991, 0.69088569763685714, 0.21267847220991304, 0.096435830153229818, 0.63999631213235397, 0.24626620284270148, 0.11373748502494455, 0.72830635497980567, 0.16814838193316983, 0.10354526308702455, 0.92298165842769053, 0.064574005138227406, 0.012444336434082095, 0.95846926195585125, 0.035124991936709524, 0.0064057461074392376, 0.96505439295829154, 0.032290985104160036, 0.0026546219375483543, 0.97242160835875646, 0.026726080921534993, 0.00085231071970847565, 0.98862713876212316, 0.011117265350910083, 0.00025559588696679353, 0.99229982509509329, 0.0075737021569505401, 0.00012647274795616972, 0.97319556615527103, 0.026748499746583349, 5.593409814555021e-05, 0.99710974235865635, 0.002864451988807614, 2.5805652536018087e-05, 0.99759973342109121, 0.0023843118993613281, 1.5954679547526123e-05, 0.9969172245390302, 0.0030674155400210357, 1.5359920948821713e-05, 0.99874827087156437, 0.0012470212936870357, 4.7078347486403233e-06, 9.7450028416373407e-12, 7.9407963503867098e-05, 0.9999205920267511, 5.543497048108002e-11, 0.00017476716041905143, 0.99982523278414592, 1.6522628019573371e-10, 0.00020487056732963453, 0.99979512926744407, 1.1004130796729861e-09, 0.00054552057801935685, 0.99945447832156764, 4.3147419317708209e-09, 0.031764233305951857, 0.9682357623793062, 4.4183598096215622e-08, 0.032724381013353274, 0.96727557480304871, 1.0213216506373892e-07, 0.032724379117022202, 0.96727551875081275, 4.6748150228075886e-07, 0.034830005610293577, 0.96516952690820412, 2.8944680850101307e-06, 0.053907579393366038, 0.94608952613854891, 6.8401858457495187e-06, 0.051350407563475607, 0.94864275225067862, 4.2288229609097081e-05, 0.15284795455060832, 0.84710975721978254, 0.045890069806887993, 0.10594910963041623, 0.84816082056269582, 0.0004039828679425948, 0.27248430824822867, 0.7271117088838287, 0.0014317249600511064, 0.50059847338920349, 0.49796980165074534, 0.0031682920577561806, 0.32875625853129753, 0.66807544941094632, 0.14007213011769412, 0.39525784810192865, 0.46467002178037708, 0.060335162020955097, 0.5107642673509557, 0.42890057062808923, 0.068901196818126897, 0.69698801831644763, 0.23411078486542539, 0.12448441105338233, 0.47900749804456111, 0.39650809090205658, 0.33672714414871358, 0.32392575399099149, 0.33934710186029493, 0.63664263410065269, 0.22270520952530348, 0.14065215637404377, 0.27610128479574603, 0.53120942822384698, 0.19268928698040699, 0.74549517920020447, 0.19124096346480865, 0.063263857334986989, 0.87030326117595458, 0.10304207426413499, 0.026654664559910449, 0.93537072989748393, 0.051417751173010354, 0.013211518929505771, 0.90809120890068074, 0.085373083665776825, 0.0065357074335423357, 0.9565376945801991, 0.04122098491339371, 0.0022413205064071603, 0.95807364609933843, 0.040962242784464434, 0.00096411111619706068, 0.92099342804345152, 0.078753771290981531, 0.00025280066556699032, 0.992442566968611, 0.0074065361038368879, 0.00015089692755214875, 0.99572231550936152, 0.0042148468997504377, 6.2837590888111967e-05, 0.99134726004376938, 0.0085586688949944659, 9.4071061236363082e-05, 0.99802897803884261, 0.0019550608975151362, 1.5961063642100496e-05, 0.99327938162255047, 0.0066798092837178948, 4.0809093731748351e-05, 0.9986311122982684, 0.0013626115141493135, 6.2761875822913219e-06, 6.7388632162049671e-12, 4.9364762207106814e-05, 0.99995063523105399, 4.2433006481895921e-11, 0.051350758810030234, 0.94864924114753679, 1.7257304034797493e-10, 0.00019236307682332141, 0.99980763675060369, 7.5234801343775437e-10, 0.051350758773575561, 0.9486492404740765, 4.9803189007011353e-09, 0.00090208264868298982, 0.9990979123709981, 2.4009290881476715e-08, 0.030858820153509676, 0.9691411558371994, 1.2528099340963286e-07, 0.034830017529144795, 0.96516985718986181, 5.2063787722667725e-07, 0.067315410303138395, 0.93268406905898438, 1.4129672385283775e-06, 0.11416757860757935, 0.88583100842518214, 6.0682881578408014e-06, 0.026351816486843552, 0.97364211522499866, 3.7386115182993796e-05, 0.046899702306341141, 0.95306291157847589, 8.016968117097043e-05, 0.24985439330176415, 0.75006543701706485, 0.00034565980934394023, 0.58441035377936745, 0.41524398641128868, 0.0011304260154092413, 0.31656987858998814, 0.68229969539460267, 0.0035604164419432553, 0.64111987709890883, 0.35531970645914801, 0.0091238402813121691, 0.61324298895716323, 0.37763317076152447, 0.12806014139478231, 0.689873329307228, 0.18206652929798983, 0.046441352413898636, 0.37057007675116349, 0.58298857083493782, 0.29705346121765586, 0.30481103947455324, 0.39813549930779096, 0.32875701438496641, 0.25300690037021911, 0.41823608524481454, 0.58872081446699387, 0.26077382736263455, 0.1505053581703715, 0.8091949032455994, 0.088963618072826628, 0.10184147868157394, 0.8273979804226429, 0.10612569427653497, 0.066476325300822092, 0.79151970053582321, 0.17532851569116747, 0.033151783773009404, 0.90960582233468579, 0.077780021785032058, 0.012614155880282082, 0.92994619328513295, 0.065061260660114972, 0.0049925460547520645, 0.90948288095894547, 0.087490697758068184, 0.0030264212829863866, 0.97536224692630613, 0.023522644634195223, 0.001115108439498745, 0.95494297937251682, 0.043568029563507277, 0.001488991063975965, 0.99252839457658693, 0.0072906289943522121, 0.00018097642906096838, 0.99371392777951295, 0.0061739244113479192, 0.00011214780913929365, 0.996387276765903, 0.0035649814270718389, 4.7741807025164776e-05, 0.99591720423002128, 0.0040425840764449416, 4.0211693533666997e-05, 0.99824821565752853, 0.0017388410567994045, 1.2943285671922303e-05, 0.99858038976050756, 0.0014116878842659047, 7.9223552264642187e-06)
@@ -4113,47 +4675,71 @@ def lineplot2dpcs2(resi,pc1s,pc2s,cols,ID):
 ##ID='19482'
 ##ID='15086'
 ##ID='15179'
-ID=sys.argv[1]
-plot2d=False
-
-# default value for minAIC
-minAIC = 5.0
-
-if len(sys.argv)>2:
-  opt=sys.argv[2]
-  if opt=='1':pass
-  elif opt=='2':plot2d=True
-  ##else:raise SystemExit,'please specify 1d(1 or omit) or 2d(2)'
-  else:
-      # overwrite default value for minAIC
-      # setting it very high - e.g. 999 will bypass re-referencing
-      minAIC = eval(opt)
-
-# get the chemical shift data
-# and transform to Z-scores and CheSPI components (PCs)
-sg=getCheZODandPCs(ID, minAIC=minAIC)
-
-inc=0
-if not PLOT12:
-  clf()
-  inc=202
-if True:
-  # process all data, plot everything and store in text output files
-  subplot(513-inc)
-  resi,pc1s,pc2s,cols,zsco=viscolentry(ID)
-  savecolors(resi,cols)
-  title('CheSPI color plot for: %s'%ID)
-  if plot2d:lineplot2dpcs2(resi,pc1s,pc2s,cols,ID)
-  axis([resi[0],resi[-1]+0.0,0,16])
-  subplot(514-inc)
-  probs=getprobs(pc1s,pc2s)
-  visprobs(resi,probs,ID,seq=sg.seq)
-  title('CheSPI populations for: %s'%ID)
-  axis([resi[0],resi[-1]+0.0,0,1])
-  gencolpml(ID)##,delta=98+44)##,'3ezb')
-  subplot(515-inc)
-  predict8ss(ID,sg.seq,resi,pc1s,pc2s,zsco,dovis=False) 
-  title('CheSPI DSSP secondary structure 8-class predictions for: %s'%ID)
-tight_layout()
-savefig('cheSPIplot%s.pdf'%ID)
-show()
+def popoption(argv,name,default=None,conv=int):
+  #removes "name value" from argv and returns the converted value
+  if not name in argv:return default
+  k=argv.index(name)
+  val=conv(argv[k+1])
+  del argv[k:k+2]
+  return val
+
+if __name__=='__main__':
+  argv=sys.argv[:]
+  # number of independent GA populations for the 8-state prediction (run in parallel)
+  npop=popoption(argv,'--npop',1)
+  # seed for the random number generator of the GA (reproducible 8-state predictions)
+  seed=popoption(argv,'--seed',None)
+  # optimiser for the 8-state prediction: ga (genetic algorithm), pt (parallel tempering), beam (deterministic decoder)
+  # or meanfield (iterated posterior, no sampling)
+  engine=popoption(argv,'--engine','ga',conv=str)
+  # directory keeping the sequence dependent parameter tables between runs
+  S8CACHEDIR=popoption(argv,'--cachedir',None,conv=str)
+  # skip the stochastic optimisation, same as --engine beam
+  if '--no-ga' in argv:
+    argv.remove('--no-ga')
+    engine='beam'
+
+  ID=argv[1]
+  plot2d=False
+
+  # default value for minAIC
+  minAIC = 5.0
+
+  if len(argv)>2:
+    opt=argv[2]
+    if opt=='1':pass
+    elif opt=='2':plot2d=True
+    ##else:raise SystemExit,'please specify 1d(1 or omit) or 2d(2)'
+    else:
+        # overwrite default value for minAIC
+        # setting it very high - e.g. 999 will bypass re-referencing
+        minAIC = eval(opt)
+
+  # get the chemical shift data
+  # and transform to Z-scores and CheSPI components (PCs)
+  sg=getCheZODandPCs(ID, minAIC=minAIC)
+
+  inc=0
+  if not PLOT12:
+    clf()
+    inc=202
+  if True:
+    # process all data, plot everything and store in text output files
+    subplot(513-inc)
+    resi,pc1s,pc2s,cols,zsco=viscolentry(ID)
+    savecolors(resi,cols)
+    title('CheSPI color plot for: %s'%ID)
+    if plot2d:lineplot2dpcs2(resi,pc1s,pc2s,cols,ID)
+    axis([resi[0],resi[-1]+0.0,0,16])
+    subplot(514-inc)
+    probs=getprobs(pc1s,pc2s)
+    visprobs(resi,probs,ID,seq=sg.seq)
+    title('CheSPI populations for: %s'%ID)
+    axis([resi[0],resi[-1]+0.0,0,1])
+    gencolpml(ID)##,delta=98+44)##,'3ezb')
+    subplot(515-inc)
+    predict8ss(ID,sg.seq,resi,pc1s,pc2s,zsco,dovis=False,npop=npop,seed=seed,engine=engine)
+    title('CheSPI DSSP secondary structure 8-class predictions for: %s'%ID)
+  tight_layout()
+  savefig('cheSPIplot%s.pdf'%ID)
+  show()
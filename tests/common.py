@@ -0,0 +1,42 @@
+#shared helpers of the regression tests: cheSPI4c imported as a module and synthetic entries
+import os
+import sys
+import matplotlib
+matplotlib.use('Agg')
+import numpy
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import cheSPI4c
+
+def synthetic_entry(numres=80,seed=7,gaps=((30,34),(55,66))):
+  #random sequence with two helical and one strand-like stretch of PCs; the residues in gaps
+  #(and the chain ends) have no shifts
+  rs=numpy.random.RandomState(seed)
+  seq=''.join([cheSPI4c.AAstandard[i] for i in rs.randint(0,20,numres)])
+  resis=numpy.arange(2,numres)
+  pc1=rs.normal(0,2,len(resis));pc2=rs.normal(0,2,len(resis))
+  pc1[10:25]-=7;pc2[10:25]+=3
+  pc1[40:50]+=6;pc2[40:50]-=2
+  zsco=rs.uniform(4,14,len(resis))
+  keep=numpy.ones(len(resis),dtype=bool)
+  for lo,hi in gaps:keep[lo:hi]=False
+  return seq,resis[keep],pc1[keep],pc2[keep],zsco[keep]
+
+def synthetic_parameters(numres=80,seed=1,entry=7,**kw):
+  #SSparameters (GA seed seed) set up as in predict8ss for the synthetic entry of seed entry
+  seq,resis,pc1,pc2,zsco=synthetic_entry(numres,entry,**kw)
+  ssp=cheSPI4c.SSparameters('synth',seed)
+  ssp.set_input(seq,resis,pc1,pc2,zsco)
+  ssp.initparameters(usesimple=False)
+  ssp.make_guess()
+  return ssp
+
+def seed_individual(ssp):
+  #the remedied maximum of the priors, the starting individual of predict8ss
+  ss8max,ss3max=cheSPI4c.getmaxss(ssp.ss8priors)
+  ssopt=cheSPI4c.SSopt(ssp,ss8max,ss3max)
+  ssopt.backcalcbothPCs()
+  ssopt.init_segments()
+  ssopt.segments.remedy_disallowed()
+  ssopt.calculate_fitness()
+  return ssopt
@@ -0,0 +1,31 @@
+import unittest
+from numpy import arange, log
+from common import cheSPI4c, synthetic_parameters
+
+class DecodeBeamTest(unittest.TestCase):
+
+    def setUp(self):
+	self.ssp=synthetic_parameters()
+	self.S8I,self.cost,self.marg=self.ssp.decode_beam(64)
+
+    def test_no_zero_prior_states(self):
+	pri=self.ssp.pritab
+	n=arange(len(self.ssp.seq))
+	self.assertFalse((pri[self.S8I[0],n]==0).any())
+	self.assertEqual((self.marg*(pri.T==0)).max(),0.0)
+
+    def test_cost_is_energy_with_unobserved_priors(self):
+	ssp=self.ssp
+	n=arange(len(ssp.seq))
+	unobs=ssp.obsslot<0
+	ener=ssp.calc_energies(self.S8I[:1])[0]-log(ssp.pritab[self.S8I[0],n][unobs]).sum()
+	self.assertAlmostEqual(self.cost[0],ener,places=6)
+
+    def test_decoded_states_allowed(self):
+	for row in self.S8I[:5]:
+	  ssopt=cheSPI4c.SSopt(self.ssp,['HGIE-TSB'[i] for i in row])
+	  ssopt.init_segments()
+	  self.assertEqual(ssopt.segments.return_disallowed(),None)
+
+if __name__=='__main__':
+  unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+from numpy import array, exp, isfinite, log
+from common import cheSPI4c, seed_individual, synthetic_parameters
+
+ALLSS8='HGIE-TSB'
+
+def reference_energy(ssp,s8,s3):
+  #-sum of the log posterior of the observed residues, residue by residue as in the original backcalcPCs
+  #and calcpostlik (residues outside the chain are coil)
+  inds=[ALLSS8.index(x) for x in s8]+[4]*4
+  energy=0.0
+  for k,n in enumerate(ssp.ru):
+    post=ssp.priors[inds[n],n]
+    for pcnum in (0,1):
+      pari=ssp.params[pcnum]
+      N=pari[s3[n]][1]
+      pc=pari['S8'][inds[n],n]
+      for q in range(4):pc+=N[0,q,inds[n-1-q]]+N[1,q,inds[n+1+q]]
+      sig=ssp.ssigs[pcnum,inds[n]]
+      post*=exp(-0.5*((pc-ssp.pcsobsref[pcnum][k])/sig)**2)/sig
+    energy-=log(post)
+  return energy
+
+class EnergyTest(unittest.TestCase):
+
+    def setUp(self):
+	self.ssp=synthetic_parameters()
+	#random individuals drawn from the priors and repaired as in the GA, with finite energy
+	seed=seed_individual(self.ssp)
+	self.objs=[]
+	while len(self.objs)<10:
+	  obj=seed.initialize_random()
+	  obj.calculate_fitness()
+	  if isfinite(obj.energy):self.objs.append(obj)
+
+    def test_calcpostlik(self):
+	for obj in self.objs:
+	  ref=reference_energy(self.ssp,obj.s8,obj.s3)
+	  self.assertTrue(isfinite(ref))
+	  self.assertAlmostEqual(obj.energy,ref,places=8)
+
+    def test_calc_energies(self):
+	S8I=array([self.ssp.encode_s8(obj.s8) for obj in self.objs])
+	eners=self.ssp.calc_energies(S8I)
+	for k,obj in enumerate(self.objs):
+	  self.assertAlmostEqual(eners[k],obj.energy,places=8)
+
+    def test_score_window(self):
+	#the posterior terms of any window equal those of the full calculation
+	ssp=self.ssp
+	numres=len(ssp.seq)
+	for obj in self.objs:
+	  s8pad=concat_coil(obj.s8i)
+	  s3i=ssp.encode_s3(obj.s3)
+	  for lo,hi in ((0,10),(5,25),(30,31),(numres-7,numres)):
+	    k0,k1=ssp.obsstart[lo],ssp.obsstart[hi]
+	    S9w,backpcs,post0=ssp.score_window(s8pad[lo:hi+8],s3i[lo:hi],lo,hi,k0,k1)
+	    self.assertTrue(abs(S9w-obj.S9s[:,:,lo:hi]).max()<1e-10)
+	    self.assertTrue(abs(post0-obj.post0ref[k0:k1]).max()<=1e-10*abs(obj.post0ref[k0:k1]).max())
+
+def concat_coil(s8i):
+  #states padded with four coil residues at both ends, the window layout of score_window
+  return array([4]*4+list(s8i)+[4]*4,dtype=s8i.dtype)
+
+if __name__=='__main__':
+  unittest.main()
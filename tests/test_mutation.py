@@ -0,0 +1,57 @@
+import unittest
+from numpy import isfinite
+from common import cheSPI4c, seed_individual, synthetic_parameters
+
+FLAGS=['coil','incr','decr','split','del','H2G','C2G']
+
+def mutate(ssopt):
+  #proposes a mutation and applies it with the local energy change; False if it was not applied
+  ind,I,ss8,info=ssopt.choose_mutation()
+  locpost,locdiff=ssopt.get_diff_mutation(I,ss8)
+  if not isfinite(locpost):return False
+  ssopt.segments.execute_mutation(FLAGS[ind],ind,I,ss8,info)
+  ssopt.s8i[I:I+len(ss8)]=ssopt.ssp.encode_s8(ss8)
+  ssopt.apply_mutation(ssopt.mutdelta)
+  ssopt.energy-=locdiff
+  return True
+
+class MutationTest(unittest.TestCase):
+
+    def setUp(self):
+	self.ssp=synthetic_parameters(entry=3)
+	self.ssopt=seed_individual(self.ssp)
+	self.assertTrue(isfinite(self.ssopt.energy))
+
+    def test_incremental_energies(self):
+	#the local updates of get_diff_mutation/apply_mutation agree with a full recompute
+	ssopt=self.ssopt
+	numdone=0
+	for step in range(300):
+	  if not mutate(ssopt):continue
+	  numdone+=1
+	  full=cheSPI4c.SSopt(self.ssp,ssopt.s8[:])
+	  full.calculate_fitness()
+	  self.assertEqual(''.join(ssopt.s3),''.join(full.s3))
+	  self.assertTrue((ssopt.s8i==full.s8i).all())
+	  self.assertAlmostEqual(ssopt.energy,full.energy,places=6)
+	  self.assertTrue(abs(ssopt.S9s-full.S9s).max()<1e-10)
+	  self.assertTrue(abs(ssopt.post0ref-full.post0ref).max()<=1e-10*full.post0ref.max())
+	self.assertTrue(numdone>100)
+
+    def test_clone_unchanged(self):
+	#clones share the arrays with their parent until they are written
+	parent=self.ssopt
+	s8=parent.s8[:]
+	energy=parent.energy
+	S9s=parent.S9s.copy();post0ref=parent.post0ref.copy()
+	for k in range(20):
+	  child=parent.get_clone(need_segments=True)
+	  child.energy=parent.energy
+	  while not mutate(child):pass
+	self.assertEqual(parent.s8,s8)
+	self.assertEqual(parent.energy,energy)
+	self.assertTrue((parent.S9s==S9s).all())
+	self.assertTrue((parent.post0ref==post0ref).all())
+
+if __name__=='__main__':
+  unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+from common import cheSPI4c, seed_individual, synthetic_parameters
+
+def summary(popul):
+  return [(''.join(obj.s8),round(obj.energy,8)) for obj in popul]
+
+class ParallelTest(unittest.TestCase):
+    #a seeded run gives the same populations whatever the number of processes
+
+    def breed(self,nproc):
+	ssopt=seed_individual(synthetic_parameters(seed=11))
+	return [summary(popul) for popul in cheSPI4c.breed_populations(ssopt,2,nproc,limitfac=5)]
+
+    def temper(self,nproc):
+	ssopt=seed_individual(synthetic_parameters(seed=11))
+	return summary(cheSPI4c.temper_population(ssopt,numrep=4,numrounds=3,nproc=nproc))
+
+    def test_breed_populations(self):
+	pops=self.breed(1)
+	self.assertNotEqual(pops[0],pops[1])
+	self.assertEqual(pops,self.breed(2))
+
+    def test_temper_population(self):
+	self.assertEqual(self.temper(1),self.temper(2))
+
+if __name__=='__main__':
+  unittest.main()
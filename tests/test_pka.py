@@ -0,0 +1,75 @@
+import unittest
+import numpy as np
+from scipy.optimize import curve_fit
+from common import cheSPI4c
+from cheSPI4c import W, a, b, cutoff, fun, ncycles, smallmatrixlimits, smallmatrixpos, w2logp
+
+def reference_pkas(seq, T=293.15, Ion=0.1):
+  #the original calc_pkas_from_seq: microstates summed one by one, fitted by curve_fit
+  pHs = np.arange(1.99, 10.01, 0.15)
+  pK0 = {"n":8.23, "D":3.86, "E":4.34, "H":6.45, "C":8.49, "K":10.34, "R":13.9, "Y":9.76, "c":3.55}
+  pos = np.array([i for i in range(len(seq)) if seq[i] in pK0.keys()])
+  N = pos.shape[0]
+  I = np.diag(np.ones(N))
+  sites = ''.join([seq[i] for i in pos])
+  neg = np.array([i for i in range(len(sites)) if sites[i] in 'DEYc'])
+  l = np.array([abs(pos - pos[i]) for i in range(N)])
+  tmp = W(a + np.sqrt(l) * b, Ion)
+  tmp[I == 1] = 0
+  ww = w2logp(tmp, T) / 2
+  chargesempty = np.zeros(N)
+  if len(neg): chargesempty[neg] = -1
+  pK0s = [pK0[c] for c in sites]
+  nH0s = [0.9 for c in sites]
+  titration = np.zeros((N, len(pHs)))
+  smallN = min(2 * cutoff + 1, N)
+  alltuples = [[int(c) for c in np.binary_repr(i, smallN)] for i in range(2 ** smallN)]
+  for icycle in range(ncycles):
+    if icycle == 0:
+      fractionhold = np.array([[fun(pHs[p], pK0s[i], nH0s[i]) for i in range(N)] for p in range(len(pHs))])
+    else:
+      fractionhold = titration.transpose()
+    for ires in range(1, N + 1):
+      (ileft, iright) = smallmatrixlimits(ires, cutoff, N)
+      resi = smallmatrixpos(ires, cutoff, N)
+      gmatrix = []
+      for p in range(len(pHs)):
+        fraction = fractionhold[p].copy()
+        fraction[ileft - 1 : iright] = 0
+        charges = chargesempty + fraction
+        gmatrixfull = ww + np.diag(np.dot(ww, charges) * 2) + pHs[p] * I - np.diag(pK0s)
+        gmatrix.append(gmatrixfull[ileft - 1 : iright, ileft - 1 : iright])
+      E_all = np.array([sum([10 ** -(g * np.outer(c, c)).sum() for c in alltuples]) for g in gmatrix])
+      E_sel = np.array([sum([10 ** -(g * np.outer(c, c)).sum() for c in alltuples if c[resi - 1] == 1]) for g in gmatrix])
+      titration[ires - 1] = E_sel / E_all
+    sol = np.array([curve_fit(fun, pHs, titration[p], [pK0s[p], nH0s[p]])[0] for p in range(N)])
+    (pKs, nHs) = sol.transpose()
+  return dict([(i - 1, (pKs[p], nHs[p], seq[i])) for p, i in enumerate(pos)])
+
+class PkaTest(unittest.TestCase):
+
+    def test_fit_hill(self):
+	#fit_hill finds the curve_fit solution for each row, including curves that are not Hill curves
+	pHs = np.arange(1.99, 10.01, 0.15)
+	rs = np.random.RandomState(0)
+	pK0 = rs.uniform(3, 11, 20)
+	nH0 = rs.uniform(0.5, 1.2, 20)
+	titration = 0.6 * fun(pHs, pK0[:,np.newaxis], nH0[:,np.newaxis]) + 0.4 * fun(pHs, pK0[:,np.newaxis] + rs.uniform(-2, 2, (20, 1)), 1.0)
+	pKs, nHs = cheSPI4c.fit_hill(pHs, titration, pK0, np.zeros(20) + 0.9)
+	for p in range(20):
+	  ref = curve_fit(fun, pHs, titration[p], [pK0[p], 0.9])[0]
+	  self.assertAlmostEqual(pKs[p], ref[0], places=5)
+	  self.assertAlmostEqual(nHs[p], ref[1], places=5)
+
+    def test_calc_pkas_from_seq(self):
+	for seq, T, Ion in (('nMKDEHHYCRKAESTGc', 293.15, 0.1), ('nDEDEKKHc', 310.0, 0.02), ('nACDc', 298.0, 0.1)):
+	  res = cheSPI4c.calc_pkas_from_seq(seq, T, Ion)
+	  ref = reference_pkas(seq, T, Ion)
+	  self.assertEqual(sorted(res), sorted(ref))
+	  for i in ref:
+	    self.assertEqual(res[i][2], ref[i][2])
+	    self.assertAlmostEqual(res[i][0], ref[i][0], places=4)
+	    self.assertAlmostEqual(res[i][1], ref[i][1], places=4)
+
+if __name__=='__main__':
+  unittest.main()
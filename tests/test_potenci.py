@@ -0,0 +1,44 @@
+import unittest
+from numpy import isnan
+from numpy.random import RandomState
+from common import cheSPI4c
+
+def random_sequence(numres,seed):
+  return ''.join([cheSPI4c.AAstandard[i] for i in RandomState(seed).randint(0,20,numres)])
+
+class PotenciArrayTest(unittest.TestCase):
+
+    def check_against_pentapeptides(self,seq,temperature):
+	#potenci_array gives the shifts of predPentShift with the temperature correction of gettempcorr
+	shifts=cheSPI4c.potenci_array(seq,temperature)
+	tempdct=cheSPI4c.gettempkoeff()
+	pseq='n'+seq+'c'
+	for i in range(1,len(seq)-1):
+	  pent=pseq[i-1:i+4]
+	  for a,at in enumerate(cheSPI4c.POTENCIATNS):
+	    if (seq[i],at) in [('G','CB'),('G','HB'),('P','H')]:
+	      self.assertTrue(isnan(shifts[i,a]))
+	      continue
+	    shp=cheSPI4c.predPentShift(pent,at)
+	    if at<>'HB':shp+=cheSPI4c.gettempcorr(seq[i],at,tempdct,temperature)
+	    self.assertAlmostEqual(shifts[i,a],shp,places=10)
+	self.assertTrue(isnan(shifts[[0,-1]]).all())
+
+    def test_pentapeptides(self):
+	for seed in range(3):
+	  self.check_against_pentapeptides(random_sequence(60,seed),298)
+
+    def test_temperature_series(self):
+	#the cached base shifts are shared between temperatures
+	seq=random_sequence(40,5)
+	for temperature in (278,298,310.5):
+	  self.check_against_pentapeptides(seq,temperature)
+
+    def test_result_is_a_copy(self):
+	seq=random_sequence(20,6)
+	shifts=cheSPI4c.potenci_array(seq,300)
+	shifts[:]=0
+	self.assertFalse((cheSPI4c.potenci_array(seq,300)==0).all())
+
+if __name__=='__main__':
+  unittest.main()
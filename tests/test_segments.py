@@ -0,0 +1,38 @@
+import unittest
+from numpy import arange, array, bincount, fromstring, uint8, zeros
+from numpy.random import RandomState
+from common import cheSPI4c
+
+def encode(s8):
+  return cheSPI4c.S8LUT[fromstring(''.join(s8),dtype=uint8)]
+
+def segments(s8,rng):
+  s3=['HSC'[c] for c in cheSPI4c.S3OF8[encode(s8)]]
+  return cheSPI4c.Segments(list(s8),s3,rng)
+
+class RemedyDisallowedTest(unittest.TestCase):
+
+    def test_first_along_chain(self):
+	seg=segments('H-EHEHHBHETSB',RandomState(0))
+	self.assertEqual(seg.return_disallowed(),('H',0,1))
+	seg=segments('--EHHH---HHHHHH-',RandomState(0))
+	self.assertEqual(seg.return_disallowed(),('S',2,1))
+
+    def test_single_and_batch_agree(self):
+	#both repair paths give the same distribution of repaired states
+	s8='H-EHEHHBHETSB'
+	num=4000
+	rng=RandomState(0)
+	single=zeros((len(s8),8))
+	for k in range(num):
+	  seg=segments(s8,rng)
+	  seg.remedy_disallowed()
+	  self.assertEqual(seg.return_disallowed(),None)
+	  single[arange(len(s8)),encode(seg.s8)]+=1
+	S8=array([encode(s8)]*num)
+	cheSPI4c.remedy_disallowed_batch(S8,rng)
+	batch=array([bincount(S8[:,n],minlength=8) for n in range(len(s8))])
+	self.assertTrue(abs(single-batch).max()<0.05*num)
+
+if __name__=='__main__':
+  unittest.main()
@@ -0,0 +1,21 @@
+import unittest
+from numpy import isfinite
+from common import cheSPI4c, seed_individual, synthetic_parameters
+
+class TemperPopulationTest(unittest.TestCase):
+
+    def test_finite_energies(self):
+	#the remedied maximum of this entry leaves a residue with zero prior (infinite energy)
+	ssp=synthetic_parameters(seed=4,entry=4)
+	ssopt=seed_individual(ssp)
+	self.assertFalse(isfinite(ssopt.energy))
+	popul=cheSPI4c.temper_population(ssopt,numrounds=3)
+	self.assertTrue(len(popul)>0)
+	for obj in popul:
+	  ener=obj.energy
+	  obj.calculate_fitness()
+	  self.assertTrue(isfinite(ener))
+	  self.assertAlmostEqual(ener,obj.energy,places=6)
+
+if __name__=='__main__':
+  unittest.main()